@@ -4,107 +4,220 @@ Training Analytics - Analyze dog training progress over time
 Reads detection logs and provides insights on training effectiveness
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
+import sys
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
 
+# Cold-start reference: matplotlib is only imported by the chart worker
+STARTED = time.perf_counter()
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent / 'src'))
+
+from event_archive import ARCHIVE_AVAILABLE, EventArchive
+from event_store import EventStore, import_csv
+from charts import CHART_PROFILES, ChartRenderer
+from rollups import EventCounts, RollupCache
+
 
 class TrainingAnalytics:
     """Analyze dog training progress from zone violation logs"""
 
-    def __init__(self, log_file='logs/detections.csv'):
+    def __init__(self, log_file='logs/detections.csv', db_file='logs/events.db',
+                 since=None, until=None, archive_dir='data/archive', zone=None, camera=None):
         self.log_file = Path(log_file)
-        self.df = None
+        self.db_file = Path(db_file)
+        self.archive_dir = Path(archive_dir)
+        self.zone = zone
+        self.camera = camera
+
+        # Rollups are per day, so the range is whole days
+        self.start_day = since.date() if since else None
+        self.end_day = until.date() if until else None
+
+        self.store = None
+        self.archive = None
+        self.rollups = None
+        self.times = None  # event times, only loaded for zone/camera filters
+        self.total = None
+        self.renderer = None
+
+    def day_range(self):
+        """[start, end) datetimes of the analysed days (None = open)"""
+        start = datetime.combine(self.start_day, datetime.min.time()) if self.start_day else None
+        end = datetime.combine(self.end_day, datetime.min.time()) if self.end_day else None
+        return start, end
 
     def load_data(self):
-        """Load detection logs"""
-        if not self.log_file.exists():
-            print(f"❌ Arquivo de log não encontrado: {self.log_file}")
+        """Open the event store and fold new events into the rollups"""
+        if self.total is not None:
+            return self.total > 0
+
+        if not self.db_file.exists() and not self.log_file.exists():
+            print(f"❌ Arquivo de log não encontrado: {self.db_file}")
             print("Execute o detector primeiro para gerar dados.")
             return False
 
         try:
-            self.df = pd.read_csv(self.log_file)
-            self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
-            self.df['date'] = self.df['timestamp'].dt.date
-            self.df['hour'] = self.df['timestamp'].dt.hour
-            self.df['day_of_week'] = self.df['timestamp'].dt.day_name()
+            self.store = EventStore(self.db_file)
+            if self.log_file.exists():
+                import_csv(self.store.connection, self.log_file)  # no-op once imported
+
+            if self.archive_dir.exists():
+                if ARCHIVE_AVAILABLE:
+                    self.archive = EventArchive(self.archive_dir)
+                else:
+                    print("⚠️  pyarrow não instalado - eventos arquivados ignorados")
+                    print("Instale com: pip install pyarrow")
+
+            rollups = RollupCache(self.store.connection)
+            new_events = rollups.update()
+            if self.zone is None and self.camera is None:
+                self.rollups = rollups
+            else:
+                # The rollups have no zone/camera: count the matching events instead
+                self.times = self.filtered_times()
+                self.rollups = EventCounts(self.times)
+            self.total = sum(count for _, count in self.rollups.daily(self.start_day, self.end_day))
 
-            print(f"✅ Carregados {len(self.df)} registros de detecção")
-            return True
+            print(f"✅ Carregados {self.total} registros de detecção ({new_events} novos)")
+            return self.total > 0
 
         except Exception as e:
             print(f"❌ Erro ao carregar logs: {e}")
             return False
 
+    def filtered_times(self):
+        """Times of the events matching zone/camera in the day range, oldest first"""
+        start, end = self.day_range()
+        times = []
+        if self.archive is not None:
+            # Only the partitions in range and only the timestamp column are read
+            table = self.archive.read(start, end, columns=['timestamp'],
+                                      zone=self.zone, camera=self.camera)
+            times.extend(table.column('timestamp').to_pylist())
+        times.extend(datetime.fromisoformat(event['timestamp']) for event in self.store.query(
+            start, end, zone=self.zone, camera=self.camera, columns=['timestamp']))
+        return sorted(times)
+
+    def latest_detections(self, n):
+        """Times of the n most recent events in range, oldest first"""
+        if self.times is not None:
+            return self.times[-n:]
+
+        start, end = self.day_range()
+        times = [datetime.fromisoformat(event['timestamp'])
+                 for event in self.store.latest(n, start, end)]
+        if len(times) < n and self.archive is not None:
+            times = self.archive.latest_timestamps(n - len(times), start, end) + times
+        return times
+
+    def first_detection(self):
+        """Time of the first event in range"""
+        if self.times is not None:
+            return self.times[0]
+
+        start, end = self.day_range()
+        if self.archive is not None:
+            first = self.archive.first_timestamp(start, end)
+            if first is not None:
+                return first
+        events = self.store.query(start, end, limit=1, columns=['timestamp'])
+        if events:
+            return datetime.fromisoformat(events[0]['timestamp'])
+        return self.rollup_day(0)
+
+    def rollup_day(self, index):
+        """
+        Midnight of a day with events, from the rollups
+
+        Fallback when the range's events were archived but the archive cannot
+        be read (pyarrow missing): the rollups still count them.
+        """
+        daily = self.rollups.daily(self.start_day, self.end_day)
+        return datetime.fromisoformat(daily[index][0]) if daily else None
+
     def get_summary_stats(self):
         """Get summary statistics"""
-        if self.df is None or len(self.df) == 0:
+        if not self.total:
             return None
 
+        first = self.first_detection()
+        latest = self.latest_detections(1)
+        last = latest[-1] if latest else self.rollup_day(-1)
+        days_monitored = (last - first).days + 1
+
+        hourly = self.rollups.hourly(self.start_day, self.end_day)
+        weekly = self.rollups.weekday(self.start_day, self.end_day)
+
         stats = {
-            'total_violations': len(self.df),
-            'first_detection': self.df['timestamp'].min(),
-            'last_detection': self.df['timestamp'].max(),
-            'days_monitored': (self.df['timestamp'].max() - self.df['timestamp'].min()).days + 1,
-            'avg_violations_per_day': len(self.df) / max((self.df['timestamp'].max() - self.df['timestamp'].min()).days + 1, 1),
-            'most_common_hour': self.df['hour'].mode()[0] if len(self.df) > 0 else None,
-            'most_common_day': self.df['day_of_week'].mode()[0] if len(self.df) > 0 else None,
+            'total_violations': self.total,
+            'first_detection': first,
+            'last_detection': last,
+            'days_monitored': days_monitored,
+            'avg_violations_per_day': self.total / max(days_monitored, 1),
+            # max() keeps the first of equal counts: the earliest hour / day
+            'most_common_hour': max(hourly, key=lambda row: row[1])[0] if hourly else None,
+            'most_common_day': max(weekly, key=lambda row: row[1])[0] if weekly else None,
         }
 
         return stats
 
     def violations_per_day(self):
-        """Count violations per day"""
-        if self.df is None:
+        """Count violations per day: [(date, violations)]"""
+        if self.rollups is None:
             return None
 
-        daily = self.df.groupby('date').size().reset_index(name='violations')
-        daily['date'] = pd.to_datetime(daily['date'])
-        return daily
+        return [(datetime.strptime(day, '%Y-%m-%d'), count)
+                for day, count in self.rollups.daily(self.start_day, self.end_day)]
 
     def violations_per_hour(self):
-        """Count violations per hour of day"""
-        if self.df is None:
+        """Count violations per hour of day: [(hour, violations)]"""
+        if self.rollups is None:
             return None
 
-        hourly = self.df.groupby('hour').size().reset_index(name='violations')
-        return hourly
+        return self.rollups.hourly(self.start_day, self.end_day)
 
     def violations_per_weekday(self):
-        """Count violations per day of week"""
-        if self.df is None:
+        """Count violations per day of week: [(day name, violations)], Monday first"""
+        if self.rollups is None:
             return None
 
-        # Order by day of week
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        weekly = self.df.groupby('day_of_week').size().reset_index(name='violations')
-        weekly['day_of_week'] = pd.Categorical(weekly['day_of_week'], categories=day_order, ordered=True)
-        weekly = weekly.sort_values('day_of_week')
-        return weekly
+        return self.rollups.weekday(self.start_day, self.end_day)
+
+    @staticmethod
+    def moving_average(values, window=7):
+        """Trailing moving average (shorter window at the start)"""
+        averages = []
+        running = 0
+        for i, value in enumerate(values):
+            running += value
+            if i >= window:
+                running -= values[i - window]
+            averages.append(running / min(i + 1, window))
+        return averages
 
     def calculate_trend(self):
         """Calculate training progress trend"""
-        if self.df is None or len(self.df) < 2:
+        if not self.total or self.total < 2:
             return None
 
         daily = self.violations_per_day()
-
-        # Calculate 7-day moving average
-        daily['ma_7'] = daily['violations'].rolling(window=7, min_periods=1).mean()
+        counts = [count for _, count in daily]
 
         # Calculate trend (comparing first week vs last week)
-        if len(daily) >= 7:
-            first_week_avg = daily['violations'].head(7).mean()
-            last_week_avg = daily['violations'].tail(7).mean()
+        if len(counts) >= 7:
+            first_week_avg = sum(counts[:7]) / 7
+            last_week_avg = sum(counts[-7:]) / 7
             improvement = ((first_week_avg - last_week_avg) / first_week_avg * 100) if first_week_avg > 0 else 0
         else:
             improvement = None
 
         return {
             'daily_data': daily,
+            'moving_average': self.moving_average(counts),
             'improvement_percentage': improvement
         }
 
@@ -136,28 +249,30 @@ class TrainingAnalytics:
         print("\n📅 VIOLAÇÕES POR DIA")
         print("-" * 70)
         daily = self.violations_per_day()
-        for _, row in daily.tail(10).iterrows():
-            date_str = row['date'].strftime('%d/%m/%Y')
-            bar = '█' * int(row['violations'])
-            print(f"{date_str}: {bar} ({int(row['violations'])})")
+        for date, violations in daily[-10:]:
+            date_str = date.strftime('%d/%m/%Y')
+            bar = '█' * violations
+            print(f"{date_str}: {bar} ({violations})")
 
         # Hourly breakdown
         print("\n🕐 VIOLAÇÕES POR HORA DO DIA")
         print("-" * 70)
         hourly = self.violations_per_hour()
-        for _, row in hourly.iterrows():
-            hour_str = f"{int(row['hour']):02d}:00"
-            bar = '█' * int(row['violations'] / max(hourly['violations']) * 30)
-            print(f"{hour_str}: {bar} ({int(row['violations'])})")
+        peak = max(violations for _, violations in hourly)
+        for hour, violations in hourly:
+            hour_str = f"{hour:02d}:00"
+            bar = '█' * int(violations / peak * 30)
+            print(f"{hour_str}: {bar} ({violations})")
 
         # Weekly breakdown
         print("\n📆 VIOLAÇÕES POR DIA DA SEMANA")
         print("-" * 70)
         weekly = self.violations_per_weekday()
-        for _, row in weekly.iterrows():
-            day_str = row['day_of_week'][:3]
-            bar = '█' * int(row['violations'] / max(weekly['violations']) * 30)
-            print(f"{day_str}: {bar} ({int(row['violations'])})")
+        peak = max(violations for _, violations in weekly)
+        for day, violations in weekly:
+            day_str = day[:3]
+            bar = '█' * int(violations / peak * 30)
+            print(f"{day_str}: {bar} ({violations})")
 
         # Training progress
         print("\n🎯 PROGRESSO DO TREINAMENTO")
@@ -179,75 +294,63 @@ class TrainingAnalytics:
         # Recent activity
         print("\n🔥 ÚLTIMAS 5 DETECÇÕES")
         print("-" * 70)
-        for _, row in self.df.tail(5).iterrows():
-            time_str = row['timestamp'].strftime('%d/%m/%Y %H:%M:%S')
+        for detection_time in self.latest_detections(5):
+            time_str = detection_time.strftime('%d/%m/%Y %H:%M:%S')
             print(f"  • {time_str}")
 
         print("\n" + "=" * 70)
 
-    def create_charts(self, output_dir='analytics'):
-        """Create visualization charts"""
-        if self.df is None:
-            return
+    def chart_data(self):
+        """Everything the charts draw, as plain picklable lists"""
+        trend = self.calculate_trend()
+        daily = self.violations_per_day()
+        return {
+            'daily': daily,
+            'moving_average': trend['moving_average'] if trend else [count for _, count in daily],
+            'hourly': self.violations_per_hour(),
+            'weekly': self.violations_per_weekday()
+        }
 
-        output_path = Path(output_dir)
-        output_path.mkdir(exist_ok=True)
+    def create_charts(self, output_dir='analytics', profile='print', wait=True):
+        """
+        Create visualization charts (rendered in a worker process)
+
+        Args:
+            output_dir: Where the PNG goes
+            profile: 'preview' (fast, low dpi) or 'print' (300 dpi)
+            wait: Block until rendered; False returns the Future of
+                  (PNG path, rendered) instead
+        """
+        if not self.total:
+            return None
 
-        # Chart 1: Violations per day with trend
-        plt.figure(figsize=(12, 6))
-        daily = self.violations_per_day()
-        daily['ma_7'] = daily['violations'].rolling(window=7, min_periods=1).mean()
-
-        plt.subplot(2, 2, 1)
-        plt.bar(daily['date'], daily['violations'], alpha=0.6, label='Violações diárias')
-        plt.plot(daily['date'], daily['ma_7'], 'r-', linewidth=2, label='Média móvel (7 dias)')
-        plt.xlabel('Data')
-        plt.ylabel('Número de violações')
-        plt.title('Violações ao longo do tempo')
-        plt.xticks(rotation=45)
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-
-        # Chart 2: Violations per hour
-        plt.subplot(2, 2, 2)
-        hourly = self.violations_per_hour()
-        plt.bar(hourly['hour'], hourly['violations'], color='orange', alpha=0.7)
-        plt.xlabel('Hora do dia')
-        plt.ylabel('Número de violações')
-        plt.title('Violações por hora do dia')
-        plt.xticks(range(0, 24, 2))
-        plt.grid(True, alpha=0.3)
-
-        # Chart 3: Violations per weekday
-        plt.subplot(2, 2, 3)
-        weekly = self.violations_per_weekday()
-        plt.bar(range(len(weekly)), weekly['violations'], color='green', alpha=0.7)
-        plt.xlabel('Dia da semana')
-        plt.ylabel('Número de violações')
-        plt.title('Violações por dia da semana')
-        plt.xticks(range(len(weekly)), [d[:3] for d in weekly['day_of_week']])
-        plt.grid(True, alpha=0.3)
-
-        # Chart 4: Cumulative violations
-        plt.subplot(2, 2, 4)
-        daily['cumulative'] = daily['violations'].cumsum()
-        plt.plot(daily['date'], daily['cumulative'], 'b-', linewidth=2)
-        plt.fill_between(daily['date'], daily['cumulative'], alpha=0.3)
-        plt.xlabel('Data')
-        plt.ylabel('Total acumulado')
-        plt.title('Violações acumuladas')
-        plt.xticks(rotation=45)
-        plt.grid(True, alpha=0.3)
-
-        plt.tight_layout()
-        chart_file = output_path / 'training_progress.png'
-        plt.savefig(chart_file, dpi=300, bbox_inches='tight')
-        print(f"\n📊 Gráficos salvos em: {chart_file}")
-        plt.close()
+        if self.renderer is None or self.renderer.output_dir != Path(output_dir):
+            self.renderer = ChartRenderer(output_dir)
+        future = self.renderer.render(self.chart_data(), profile=profile)
+        if not wait:
+            return future
+
+        try:
+            chart_file, rendered = future.result()
+        except ImportError:
+            print("❌ matplotlib não instalado - gráficos desativados")
+            print("Instale com: pip install matplotlib")
+            return None
+
+        if rendered:
+            print(f"\n📊 Gráficos salvos em: {chart_file}")
+        else:
+            print(f"\n📊 Dados sem alteração, gráficos mantidos: {chart_file}")
+        return chart_file
+
+    def close(self):
+        """Stop the chart worker process"""
+        if self.renderer is not None:
+            self.renderer.close()
 
     def export_summary(self, output_file='analytics/training_summary.json'):
         """Export summary statistics to JSON"""
-        if self.df is None:
+        if not self.total:
             return
 
         stats = self.get_summary_stats()
@@ -263,7 +366,8 @@ class TrainingAnalytics:
             'most_common_hour': int(stats['most_common_hour']) if stats['most_common_hour'] is not None else None,
             'most_common_day': stats['most_common_day'],
             'improvement_percentage': float(trend['improvement_percentage']) if trend and trend['improvement_percentage'] is not None else None,
-            'daily_violations': self.violations_per_day().to_dict('records')
+            'daily_violations': [{'date': date, 'violations': violations}
+                                 for date, violations in self.violations_per_day()]
         }
 
         output_path = Path(output_file)
@@ -275,28 +379,84 @@ class TrainingAnalytics:
         print(f"📄 Resumo exportado para: {output_path}")
 
 
+def peak_memory_mb(children=False):
+    """Peak resident memory of this process (or its largest finished child) in MB"""
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def print_timing(stages):
+    """Cold-start time per stage and peak memory (--timing)"""
+    print("\n⏱️  DESEMPENHO")
+    print("-" * 70)
+    for name, seconds in stages:
+        print(f"{name}: {seconds * 1000:.0f} ms")
+    print(f"Total desde o início: {(time.perf_counter() - STARTED) * 1000:.0f} ms")
+    peak = peak_memory_mb()
+    if peak is not None:
+        print(f"Memória máxima: {peak:.1f} MB")
+    worker_peak = peak_memory_mb(children=True)
+    if worker_peak:
+        print(f"Memória máxima (worker de gráficos): {worker_peak:.1f} MB")
+    loaded = [name for name in ('pandas', 'matplotlib', 'pyarrow', 'numpy') if name in sys.modules]
+    print(f"Bibliotecas pesadas carregadas: {', '.join(loaded) if loaded else 'nenhuma'}")
+
+
 def main():
     """Main entry point"""
-    import sys
-
-    analytics = TrainingAnalytics()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Análise do progresso do treinamento')
+    parser.add_argument('--charts', action='store_true', help='Gerar gráficos e resumo JSON')
+    parser.add_argument('--days', type=int, help='Analisar apenas os últimos N dias')
+    parser.add_argument('--db', default='logs/events.db', help='Banco de eventos (SQLite)')
+    parser.add_argument('--log', default='logs/detections.csv',
+                       help='Log CSV antigo (usado se o banco não existir)')
+    parser.add_argument('--zone', help='Apenas eventos desta zona')
+    parser.add_argument('--camera', help='Apenas eventos desta câmera')
+    parser.add_argument('--archive', default='data/archive',
+                       help='Arquivo Parquet de eventos antigos (src/event_archive.py --rotate)')
+    parser.add_argument('--chart-profile', choices=sorted(CHART_PROFILES), default='print',
+                       help='preview = rápido, baixa resolução; print = 300 dpi')
+    parser.add_argument('--timing', action='store_true',
+                       help='Mostrar tempo de inicialização e memória máxima')
+    args = parser.parse_args()
+    stages = [('Inicialização', time.perf_counter() - STARTED)]
+
+    since = datetime.now() - timedelta(days=args.days) if args.days else None
+    analytics = TrainingAnalytics(log_file=args.log, db_file=args.db, since=since,
+                                  archive_dir=args.archive, zone=args.zone, camera=args.camera)
 
     # Print text report
+    started = time.perf_counter()
     analytics.print_report()
+    stages.append(('Relatório', time.perf_counter() - started))
 
     # Ask if user wants charts
-    if len(sys.argv) > 1 and sys.argv[1] == '--charts':
+    if args.charts:
         print("\n📊 Gerando gráficos...")
-        analytics.create_charts()
+        started = time.perf_counter()
+        chart_file = analytics.create_charts(profile=args.chart_profile)
         analytics.export_summary()
+        analytics.close()
+        stages.append(('Gráficos', time.perf_counter() - started))
         print("\n✅ Análise completa!")
         print("\nArquivos gerados:")
-        print("  - analytics/training_progress.png (gráficos)")
+        if chart_file:
+            print(f"  - {chart_file} (gráficos)")
         print("  - analytics/training_summary.json (dados)")
     else:
         print("\n💡 Dica: Execute com --charts para gerar gráficos visuais:")
         print("   python analyze_training.py --charts")
 
+    if args.timing:
+        print_timing(stages)
+
 
 if __name__ == "__main__":
     main()
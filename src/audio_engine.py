@@ -0,0 +1,264 @@
+"""
+Audio Engine - In-process playback of preloaded training sounds
+sounds/*.wav are decoded once at startup and mixed into one persistent output
+stream, instead of spawning aplay/afplay for every cue
+"""
+
+import logging
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def read_wav(path, sample_rate):
+    """
+    Decode a PCM WAV file to mono float32 samples at sample_rate
+
+    Args:
+        path: WAV file (8/16/32-bit PCM)
+        sample_rate: Output rate; other rates are linearly resampled
+    """
+    with wave.open(str(path), 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported sample width: {width * 8} bits")
+
+    samples = samples.reshape(-1, channels).mean(axis=1)
+
+    if rate != sample_rate and len(samples) > 1:
+        duration = len(samples) / rate
+        target = np.linspace(0, duration, int(duration * sample_rate), endpoint=False)
+        source = np.arange(len(samples)) / rate
+        samples = np.interp(target, source, samples).astype(np.float32)
+
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+
+class Voice:
+    """
+    One sound being played by the mixer
+
+    Quacks like subprocess.Popen (poll/terminate) so the audio scheduler can
+    wait on or preempt it exactly like a player process.
+    """
+
+    def __init__(self, name, samples, gain=1.0):
+        self.name = name
+        self.samples = samples
+        self.gain = gain
+        self.position = 0
+        self.done = False
+        self.created_at = time.time()
+        self.started_at = None  # estimated time the first sample reaches the speaker
+
+    def poll(self):
+        return 0 if self.done else None
+
+    def terminate(self):
+        self.done = True
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        while not self.done and (deadline is None or time.time() < deadline):
+            time.sleep(0.01)
+        return self.poll()
+
+
+class AudioEngine:
+    """
+    Preloaded sounds mixed into a single output stream (sounddevice)
+
+    Voices are summed in the stream callback and clipped; when more than
+    max_voices overlap, the oldest one is cut.
+    """
+
+    def __init__(self, sounds_dir, audio_config):
+        self.sounds_dir = Path(sounds_dir)
+        self.audio_config = audio_config
+        self.sample_rate = audio_config['sample_rate']
+
+        self.sounds = {}
+        self.voices = []
+        self.lock = threading.Lock()
+        self.stream = None
+        self.available = False
+        self.underruns = 0
+
+        try:
+            import sounddevice
+            self.sd = sounddevice
+        except (ImportError, OSError):
+            logger.warning("sounddevice not available. Training sounds will use external players.")
+            logger.info("Install with: pip install sounddevice")
+            return
+
+        self.load()
+        if self.sounds:
+            self.start()
+
+    def load(self):
+        """Decode every sounds/*.wav into memory"""
+        for path in sorted(self.sounds_dir.glob('*.wav')):
+            try:
+                self.sounds[path.stem] = read_wav(path, self.sample_rate)
+            except (wave.Error, ValueError, EOFError) as e:
+                logger.warning(f"Could not load {path.name}: {e}")
+
+        total = sum(samples.nbytes for samples in self.sounds.values())
+        logger.info(f"Audio engine: {len(self.sounds)} sound(s) preloaded ({total / 1024:.0f} KB)")
+
+    def start(self):
+        """Open the persistent output stream"""
+        try:
+            self.stream = self.sd.OutputStream(
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype='float32',
+                blocksize=self.audio_config['blocksize'],
+                latency='low',
+                callback=self.callback
+            )
+            self.stream.start()
+            self.available = True
+            logger.info(f"Audio output stream open ({self.stream.latency * 1000:.0f} ms output latency)")
+        except Exception as e:
+            logger.warning(f"Could not open audio output: {e}")
+            self.stream = None
+
+    def callback(self, outdata, frames, time_info, status):
+        """Mix active voices into the next output block (audio thread)"""
+        if status.output_underflow:
+            self.underruns += 1
+
+        mix = outdata[:, 0]
+        mix.fill(0)
+
+        with self.lock:
+            voices = self.voices
+
+        now = time.time()
+        for voice in voices:
+            if voice.done:
+                continue
+            if voice.started_at is None:
+                voice.started_at = now + self.stream.latency
+
+            chunk = voice.samples[voice.position:voice.position + frames]
+            mix[:len(chunk)] += chunk * voice.gain
+            voice.position += len(chunk)
+            if voice.position >= len(voice.samples):
+                voice.done = True
+
+        np.clip(mix, -1.0, 1.0, out=mix)
+
+        with self.lock:
+            if any(voice.done for voice in self.voices):
+                self.voices = [voice for voice in self.voices if not voice.done]
+
+    def has_sound(self, name):
+        return self.available and name in self.sounds
+
+    def play(self, name, gain=1.0):
+        """
+        Start a preloaded sound
+
+        Returns:
+            Voice handle, or None if the sound is not loaded
+        """
+        if not self.has_sound(name):
+            return None
+
+        voice = Voice(name, self.sounds[name], gain)
+        with self.lock:
+            voices = [v for v in self.voices if not v.done]
+            while len(voices) >= self.audio_config['max_voices']:
+                voices.pop(0).terminate()
+            self.voices = voices + [voice]
+        return voice
+
+    def stop_all(self):
+        with self.lock:
+            for voice in self.voices:
+                voice.terminate()
+            self.voices = []
+
+    def close(self):
+        """Stop playback and close the output stream"""
+        self.stop_all()
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+        self.available = False
+
+
+def latency_summary(latencies):
+    """Median / p95 / max of a list of latencies in seconds, reported in ms"""
+    if not latencies:
+        return None
+    values = np.array(latencies) * 1000
+    return {
+        'count': len(values),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'max_ms': float(values.max())
+    }
+
+
+def main():
+    """Compare cue-to-sound latency: external player process vs in-process engine"""
+    import argparse
+
+    sys.path.append(str(Path(__file__).parent))
+    import config
+    from dog_trainer import DogTrainer
+
+    parser = argparse.ArgumentParser(description='Training sound latency: player process vs audio engine')
+    parser.add_argument('--sound', default='alert_soft', help='Sound name in sounds/ (without .wav)')
+    parser.add_argument('--repeats', type=int, default=10, help='Cues per backend')
+    parser.add_argument('--interval', type=float, default=0.5, help='Seconds between cues')
+    args = parser.parse_args()
+
+    results = {}
+    for backend, audio_config in (('process', None), ('engine', config.AUDIO_ENGINE)):
+        trainer = DogTrainer(training_mode='intensive', audio_config=audio_config)
+        if backend == 'engine' and not (trainer.engine and trainer.engine.available):
+            print("Audio engine unavailable - skipping engine run")
+            trainer.close()
+            continue
+
+        path = trainer.sounds_dir / f'{args.sound}.wav'
+        for i in range(args.repeats):
+            trainer.audio.play(f'bench_{i}', [(lambda: trainer.play_audio_file(path), 0)])
+            time.sleep(args.interval)
+
+        results[backend] = latency_summary(trainer.audio.cue_latencies())
+        trainer.close()
+
+    print(f"\nCue-to-sound latency ({args.sound}, {args.repeats} cues)")
+    for backend, summary in results.items():
+        if summary:
+            print(f"  {backend:8s} p50 {summary['p50_ms']:7.1f} ms   "
+                  f"p95 {summary['p95_ms']:7.1f} ms   max {summary['max_ms']:7.1f} ms")
+    print("  (process = until the player was spawned; the player still has to open")
+    print("   the device, so its real latency is higher)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Audio Scheduler - Plays training sounds on a dedicated thread
+Callers queue timed cues and return immediately; the scheduler serializes
+playback, coalesces duplicate cues and lets stronger cues preempt weaker ones
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+WAIT_FOR_SOUND = None  # step gap: wait until the step's process has finished
+
+
+class Cue:
+    """
+    A named sequence of sound steps
+
+    steps is a list of (play_fn, gap_seconds). play_fn starts a sound and may
+    return a handle with poll()/terminate() - the subprocess.Popen playing it
+    or an audio engine Voice; gap_seconds is the time to wait
+    before the next step (WAIT_FOR_SOUND = until that process exits).
+    The cue is current until its last gap ends, so the last step should use
+    WAIT_FOR_SOUND: with a 0 gap the cue ends as soon as its player is spawned
+    and can no longer be coalesced or stopped by a stronger cue.
+    """
+
+    def __init__(self, key, steps, priority):
+        self.key = key
+        self.steps = steps
+        self.priority = priority
+        self.cancelled = False
+        self.queued_at = time.time()
+
+
+class AudioScheduler(threading.Thread):
+    """
+    Single playback thread fed by a small cue queue
+
+    - A cue whose key is already playing or queued is coalesced (dropped).
+    - A cue with a higher priority than the one playing cancels it (stopping
+      its process) and discards queued cues of lower priority.
+    - Otherwise cues play in priority order, oldest first.
+    """
+
+    def __init__(self, max_pending=4, poll_interval=0.05):
+        super().__init__(name='audio', daemon=True)
+        self.max_pending = max_pending
+        self.poll_interval = poll_interval
+
+        self.condition = threading.Condition()
+        self.pending = []
+        self.current = None
+        self.current_process = None
+        self.stopped = False
+
+        self.played = 0
+        self.coalesced = 0
+        self.preempted = 0
+        self.dropped = 0
+        self.first_sounds = deque(maxlen=200)  # (queued_at, handle, spawned_at) per cue
+
+    def play(self, key, steps, priority=0):
+        """
+        Queue a cue (never blocks on playback)
+
+        Returns:
+            True if the cue was queued
+        """
+        with self.condition:
+            if self.stopped:
+                return False
+
+            active = [self.current] if self.current and not self.current.cancelled else []
+            if any(cue.key == key for cue in active + self.pending):
+                self.coalesced += 1
+                return False
+
+            # Escalation: stop weaker sounds that are playing or waiting
+            if self.current and not self.current.cancelled and priority > self.current.priority:
+                self.current.cancelled = True
+                self.stop_current_process()
+                self.preempted += 1
+            weaker = [cue for cue in self.pending if cue.priority < priority]
+            if weaker:
+                self.pending = [cue for cue in self.pending if cue.priority >= priority]
+                self.preempted += len(weaker)
+
+            if len(self.pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+
+            self.pending.append(Cue(key, steps, priority))
+            self.pending.sort(key=lambda cue: (-cue.priority, cue.queued_at))
+            self.condition.notify()
+            return True
+
+    def stop_current_process(self):
+        """Terminate the sound process of the current step, if still running"""
+        process = self.current_process
+        if process is not None and process.poll() is None:
+            try:
+                process.terminate()
+            except OSError:
+                pass
+
+    def wait(self, cue, seconds, process=None):
+        """
+        Sleep between steps without holding up preemption
+
+        Returns:
+            False if the cue was cancelled or the scheduler stopped meanwhile
+        """
+        deadline = None if seconds is WAIT_FOR_SOUND else time.time() + seconds
+        with self.condition:
+            while not (cue.cancelled or self.stopped):
+                if deadline is None:
+                    if process is None or process.poll() is not None:
+                        return True
+                    timeout = self.poll_interval
+                else:
+                    timeout = deadline - time.time()
+                    if timeout <= 0:
+                        return True
+                self.condition.wait(min(timeout, self.poll_interval))
+        return False
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                cue = self.pending.pop(0)
+                self.current = cue
+
+            for step, (play_fn, gap) in enumerate(cue.steps):
+                if cue.cancelled or self.stopped:
+                    break
+                try:
+                    process = play_fn()
+                except Exception as e:
+                    logger.warning(f"Sound cue '{cue.key}' failed: {e}")
+                    process = None
+                self.current_process = process if hasattr(process, 'poll') else None
+                if step == 0:
+                    self.first_sounds.append((cue.queued_at, process, time.time()))
+                if not self.wait(cue, gap, self.current_process):
+                    break
+
+            with self.condition:
+                if not cue.cancelled:
+                    self.played += 1
+                self.current = None
+                self.current_process = None
+
+    def stop(self, timeout=1.0):
+        """Stop playback and the thread; queued cues are discarded"""
+        with self.condition:
+            self.stopped = True
+            self.pending = []
+            if self.current:
+                self.current.cancelled = True
+            self.stop_current_process()
+            self.condition.notify_all()
+        if self.is_alive():
+            self.join(timeout)
+
+    def cue_latencies(self):
+        """
+        Seconds from queuing a cue to its first sound
+
+        Uses the time the sound reached the output for in-process voices
+        (started_at) and the spawn time for player processes, which is a lower
+        bound: the player still has to start and open the device.
+        """
+        latencies = []
+        for queued_at, handle, spawned_at in list(self.first_sounds):
+            if hasattr(handle, 'started_at'):
+                if handle.started_at is None:
+                    continue  # not started yet, or cut before reaching the output
+                latencies.append(handle.started_at - queued_at)
+            else:
+                latencies.append(spawned_at - queued_at)
+        return latencies
+
+    def get_stats(self):
+        return {
+            'played': self.played,
+            'coalesced': self.coalesced,
+            'preempted': self.preempted,
+            'dropped': self.dropped,
+            'pending': len(self.pending)
+        }
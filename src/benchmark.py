@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Per-stage latency of the detection loops
+Feeds a fixture clip (or synthetic frames) through each stage on its own and
+through the full loop, reports p50/p95/p99 and throughput, saves JSON and
+compares against a stored baseline
+
+Usage:
+    python src/benchmark.py --source fixtures/sofa_night.mp4
+    python src/benchmark.py --synthetic --pose --update-baseline
+    python src/benchmark.py --source fixtures/sofa_night.mp4 --baseline analytics/benchmark_baseline.json
+
+Exits with status 1 when a stage regresses beyond --tolerance.
+"""
+
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent))
+
+import config
+from notifier import Notifier
+from pose_analyzer import PoseAnalyzer
+from postprocess import DOG_CLASS, result_keypoints
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINE = 'analytics/benchmark_baseline.json'
+
+
+class StageTimer:
+    """Collects per-call latencies (ms) by stage name"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        start = time.perf_counter()
+        yield
+        self.samples[stage].append((time.perf_counter() - start) * 1000)
+
+    def summary(self):
+        return {stage: summarize(samples) for stage, samples in self.samples.items()}
+
+
+def summarize(samples_ms):
+    """Latency percentiles (ms) and throughput (calls/s) of one stage"""
+    values = np.asarray(samples_ms, dtype=np.float64)
+    mean = float(values.mean())
+    return {
+        'count': int(len(values)),
+        'mean_ms': mean,
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max()),
+        'throughput_per_s': 1000.0 / mean if mean > 0 else 0.0
+    }
+
+
+def synthetic_box(frame_index, width, height):
+    """A dog-sized box drifting across the frame (exercises zone checks without detections)"""
+    box_w, box_h = width // 5, height // 4
+    x1 = (frame_index * 7) % max(width - box_w, 1)
+    y1 = height // 2
+    return np.array([[x1, y1, x1 + box_w, y1 + box_h, 0.9, DOG_CLASS]], dtype=np.float32)
+
+
+def write_synthetic_video(path, count, width, height, fps=30):
+    """Textured background with a moving blob, encoded so decode can be measured too"""
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (0, 0), 3)
+
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    for i in range(count):
+        frame = background.copy()
+        box = synthetic_box(i, width, height)[0].astype(int)
+        cv2.rectangle(frame, (box[0], box[1]), (box[2], box[3]), (60, 90, 140), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def synthetic_zone_config(path, width, height):
+    """Zone config with one sofa-sized zone in the lower middle of the frame"""
+    x1, y1, x2, y2 = width // 4, height // 2, width * 3 // 4, height * 9 // 10
+    zone_config = {
+        'camera_index': 0,
+        'zones': [{
+            'name': 'bench_zone',
+            'type': 'forbidden',
+            'points': [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+        }]
+    }
+    with open(path, 'w') as f:
+        json.dump(zone_config, f)
+    return path
+
+
+def synthetic_keypoints(rng, width, height, count=19):
+    """Random dog keypoints [x, y, conf] (analyze_pose input)"""
+    keypoints = np.empty((count, 3), dtype=np.float32)
+    keypoints[:, 0] = rng.uniform(0, width, count)
+    keypoints[:, 1] = rng.uniform(0, height, count)
+    keypoints[:, 2] = rng.uniform(0.2, 1.0, count)
+    return keypoints
+
+
+def bench_decode(timer, source, frames):
+    """Capture/decode: cap.read() per frame"""
+    cap = cv2.VideoCapture(source)
+    decoded = []
+    while len(decoded) < frames:
+        with timer.measure('decode'):
+            ret, frame = cap.read()
+        if not ret:
+            timer.samples['decode'].pop()
+            break
+        decoded.append(frame)
+    cap.release()
+    return decoded
+
+
+def bench_zone_stages(timer, detector, frames, warmup):
+    """Inference, post-processing, zone check and drawing of the zone detector"""
+    for i, frame in enumerate(frames):
+        record = i >= warmup
+        model_input, offset, model_kwargs = detector.prepare_model_input(frame)
+
+        start = time.perf_counter()
+        results = detector.model(model_input, conf=0.4, classes=[DOG_CLASS], verbose=False,
+                                 **model_kwargs)
+        if record:
+            timer.samples['inference'].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        dog_boxes = detector.extract_dog_boxes(results[0], offset)
+        if record:
+            timer.samples['postprocess'].append((time.perf_counter() - start) * 1000)
+
+        if len(dog_boxes) == 0:
+            dog_boxes = synthetic_box(i, frame.shape[1], frame.shape[0])
+
+        start = time.perf_counter()
+        violation = detector.check_dog_in_zones(dog_boxes, frame.shape)
+        if record:
+            timer.samples['zone_check'].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        detector.render_overlays(frame.copy(), dog_boxes, violation, 30.0)
+        if record:
+            timer.samples['draw'].append((time.perf_counter() - start) * 1000)
+
+
+def bench_zone_loop(timer, detector, source, frames, warmup):
+    """Full zone loop: read, process_frame (gate/scheduler/tracker as configured), render"""
+    cap = cv2.VideoCapture(source)
+    start_time = time.time()
+    for i in range(frames):
+        start = time.perf_counter()
+        ret, frame = cap.read()
+        if not ret:
+            break
+        processed_frame, dog_boxes, violation, should_alert = detector.process_frame(
+            frame, start_time + i / 30.0
+        )
+        detector.render_overlays(processed_frame, dog_boxes, violation, 30.0)
+        if i >= warmup:
+            timer.samples['zone_loop'].append((time.perf_counter() - start) * 1000)
+    cap.release()
+
+
+def bench_analyze_pose(timer, frames_shape, count):
+    """PoseAnalyzer.analyze_pose on synthetic keypoints (no model needed)"""
+    height, width = frames_shape[:2]
+    analyzer = PoseAnalyzer(config)
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        keypoints = synthetic_keypoints(rng, width, height)
+        with timer.measure('analyze_pose'):
+            analyzer.analyze_pose(keypoints, i / 30.0)
+
+
+def bench_pose(timer, detector, frames, warmup):
+    """Pose model, keypoint extraction, drawing and the full pose process_frame"""
+    for i, frame in enumerate(frames):
+        record = i >= warmup
+
+        start = time.perf_counter()
+        results = detector.model(frame, conf=config.CONFIDENCE_THRESHOLD, verbose=False)
+        if record:
+            timer.samples['pose_inference'].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        result_keypoints(results[0])
+        if record:
+            timer.samples['pose_postprocess'].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        processed_frame, keypoints, detection_result = detector.process_frame(frame, i / 30.0)
+        if record:
+            timer.samples['pose_loop'].append((time.perf_counter() - start) * 1000)
+
+        if keypoints is not None:
+            with timer.measure('pose_draw'):
+                detector.render_overlays(frame.copy(), keypoints, detection_result, 30.0)
+
+
+@contextlib.contextmanager
+def scratch_event_store(work_dir):
+    """
+    Point config.EVENT_STORE at work_dir while detectors are built
+
+    Their notifiers open the store (and import logs/detections.csv) on
+    construction; the benchmark must not write to the real event log.
+    """
+    previous = config.EVENT_STORE
+    config.EVENT_STORE = dict(previous, path=str(Path(work_dir) / 'events.db'), import_csv=None)
+    try:
+        yield
+    finally:
+        config.EVENT_STORE = previous
+
+
+def bench_notify(timer, frame, count, work_dir):
+    """
+    Notifier.notify as seen by the frame loop (background dispatch as
+    configured) and the synchronous snapshot + event log it replaces
+
+    Runs inside work_dir so the benchmark never touches the real event log.
+    """
+    notifications = dict(config.NOTIFICATIONS, sound=False, desktop_notification=False,
+                         snapshot_dir=str(Path(work_dir) / 'snapshots'))
+    detection_info = {'detection_type': 'benchmark', 'confidence': 1.0, 'frames_detected': 1}
+    event_store = dict(config.EVENT_STORE, import_csv=None)
+
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for stage, dispatch in (('notify', config.NOTIFICATION_DISPATCH),
+                                    ('notify_sync', dict(config.NOTIFICATION_DISPATCH, enabled=False))):
+                notifier = Notifier(SimpleNamespace(NOTIFICATIONS=notifications,
+                                                    NOTIFICATION_DISPATCH=dispatch,
+                                                    EVENT_STORE=event_store))
+                for _ in range(count):
+                    with timer.measure(stage):
+                        notifier.notify(frame, detection_info)
+                notifier.close()
+    finally:
+        os.chdir(previous_dir)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare_to_baseline(stages, baseline, tolerance, metric='p95_ms'):
+    """
+    Stages whose latency grew by more than `tolerance` (fraction) vs the baseline
+
+    Returns:
+        List of (stage, baseline_ms, current_ms, change) for every shared stage
+        and the subset that regressed
+    """
+    rows, regressions = [], []
+    for stage, current in stages.items():
+        reference = baseline.get('stages', {}).get(stage)
+        if not reference or reference[metric] <= 0:
+            continue
+        change = current[metric] / reference[metric] - 1
+        row = (stage, reference[metric], current[metric], change)
+        rows.append(row)
+        if change > tolerance:
+            regressions.append(row)
+    return rows, regressions
+
+
+def print_report(report):
+    print("\n" + "=" * 78)
+    print(f"{'Etapa':18s} {'n':>5s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'máx ms':>9s} {'por s':>9s}")
+    print("-" * 78)
+    for stage, s in report['stages'].items():
+        print(f"{stage:18s} {s['count']:5d} {s['p50_ms']:9.2f} {s['p95_ms']:9.2f} "
+              f"{s['p99_ms']:9.2f} {s['max_ms']:9.2f} {s['throughput_per_s']:9.1f}")
+    print("=" * 78)
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Per-stage latency benchmark of the detection loops')
+    parser.add_argument('--source', help='Fixture video clip (default: synthetic frames)')
+    parser.add_argument('--synthetic', action='store_true',
+                       help='Use generated frames even if --source is given')
+    parser.add_argument('--frames', type=int, default=200, help='Frames per stage')
+    parser.add_argument('--warmup', type=int, default=5, help='Frames excluded from model stages')
+    parser.add_argument('--width', type=int, default=config.CAMERA_WIDTH)
+    parser.add_argument('--height', type=int, default=config.CAMERA_HEIGHT)
+    parser.add_argument('--zones', help='Zone config (default: one synthetic zone)')
+    parser.add_argument('--engine', default=None, help='Inference backend (default: config)')
+    parser.add_argument('--pose', action='store_true', help='Also benchmark the pose detector')
+    parser.add_argument('--notify-count', type=int, default=30, help='Notifications to time')
+    parser.add_argument('--output', help='Result JSON (default: analytics/benchmark_<timestamp>.json)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                       help='Allowed p95 growth vs baseline before failing (0.15 = 15%%)')
+    parser.add_argument('--update-baseline', action='store_true',
+                       help='Store this run as the new baseline')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    from zone_detector import ZoneDetector
+
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory(prefix='dontpiss_bench_') as work_dir:
+        if args.source and not args.synthetic:
+            source = args.source
+        else:
+            print(f"🧪 Gerando {args.frames} frames sintéticos {args.width}x{args.height}")
+            source = str(write_synthetic_video(Path(work_dir) / 'synthetic.avi',
+                                               args.frames, args.width, args.height))
+
+        frames = bench_decode(timer, source, args.frames)
+        if len(frames) <= args.warmup:
+            print(f"❌ Frames insuficientes em: {source}")
+            sys.exit(1)
+        height, width = frames[0].shape[:2]
+
+        zones_file = args.zones or synthetic_zone_config(Path(work_dir) / 'zones.json', width, height)
+
+        with contextlib.redirect_stdout(io.StringIO()), scratch_event_store(work_dir):
+            detector = ZoneDetector(enable_trainer=False, headless=True,
+                                    zone_config_file=zones_file, engine=args.engine)
+
+        print("⏱️  Etapas do detector de zonas...")
+        bench_zone_stages(timer, detector, frames, args.warmup)
+        bench_zone_loop(timer, detector, source, args.frames, args.warmup)
+        bench_analyze_pose(timer, frames[0].shape, args.frames)
+
+        if args.pose:
+            from dog_pee_detector import DogPeeDetector
+            print("⏱️  Etapas do detector de pose...")
+            with scratch_event_store(work_dir):
+                pose_detector = DogPeeDetector(config, headless=True, engine=args.engine)
+            bench_pose(timer, pose_detector, frames, args.warmup)
+
+        print("⏱️  Notificações...")
+        bench_notify(timer, frames[0], args.notify_count, work_dir)
+
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'source': args.source if args.source and not args.synthetic else 'synthetic',
+        'resolution': [width, height],
+        'frames': len(frames),
+        'engine': detector.engine,
+        'platform': {
+            'system': platform.system(),
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__
+        },
+        'stages': timer.summary()
+    }
+    print_report(report)
+
+    output_path = Path(args.output or
+                       f"analytics/benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Resultado salvo em: {output_path}")
+
+    baseline_path = Path(args.baseline)
+    regressions = []
+    if baseline_path.exists() and not args.update_baseline:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        rows, regressions = compare_to_baseline(report['stages'], baseline, args.tolerance)
+
+        print(f"\n📊 Comparação com {baseline_path} (p95, tolerância {args.tolerance:.0%})")
+        if baseline.get('source') != report['source'] or baseline.get('engine') != report['engine']:
+            print("   ⚠️  Baseline gerada com outra fonte/engine - comparação aproximada")
+        for stage, before, after, change in rows:
+            flag = '❌' if change > args.tolerance else '✅'
+            print(f"   {flag} {stage:18s} {before:8.2f} -> {after:8.2f} ms ({change:+.0%})")
+
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📌 Baseline atualizada: {baseline_path}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} etapa(s) com regressão")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
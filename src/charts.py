@@ -0,0 +1,158 @@
+"""
+Charts - Training progress charts rendered in a worker process
+A chart is only re-rendered when the data behind it (or the output profile)
+changed; the fingerprint of the last render is kept next to the PNG
+"""
+
+import hashlib
+import json
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import accumulate
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Output profiles: fast low-dpi preview vs print-quality render
+CHART_PROFILES = {
+    'preview': {'dpi': 72, 'figsize': (12, 6), 'suffix': '_preview'},
+    'print': {'dpi': 300, 'figsize': (12, 6), 'suffix': ''},
+}
+
+CHART_VERSION = 1  # bump when the drawing code changes, to invalidate cached PNGs
+
+
+def chart_fingerprint(data, profile):
+    """Hash of the chart data and the profile settings"""
+    payload = json.dumps({'version': CHART_VERSION, 'profile': CHART_PROFILES[profile],
+                          'data': data}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_charts(data, chart_file, profile):
+    """
+    Draw the four training charts and save them (runs in the worker process)
+
+    Args:
+        data: dict with 'daily' [(date, violations)], 'moving_average' [float],
+              'hourly' [(hour, violations)] and 'weekly' [(day name, violations)]
+        chart_file: PNG path
+        profile: key of CHART_PROFILES
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    settings = CHART_PROFILES[profile]
+    dates = [date for date, _ in data['daily']]
+    daily = [violations for _, violations in data['daily']]
+
+    # Chart 1: Violations per day with trend
+    plt.figure(figsize=settings['figsize'])
+    plt.subplot(2, 2, 1)
+    plt.bar(dates, daily, alpha=0.6, label='Violações diárias')
+    plt.plot(dates, data['moving_average'], 'r-', linewidth=2, label='Média móvel (7 dias)')
+    plt.xlabel('Data')
+    plt.ylabel('Número de violações')
+    plt.title('Violações ao longo do tempo')
+    plt.xticks(rotation=45)
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+
+    # Chart 2: Violations per hour
+    plt.subplot(2, 2, 2)
+    plt.bar([hour for hour, _ in data['hourly']], [violations for _, violations in data['hourly']],
+            color='orange', alpha=0.7)
+    plt.xlabel('Hora do dia')
+    plt.ylabel('Número de violações')
+    plt.title('Violações por hora do dia')
+    plt.xticks(range(0, 24, 2))
+    plt.grid(True, alpha=0.3)
+
+    # Chart 3: Violations per weekday
+    plt.subplot(2, 2, 3)
+    weekly = data['weekly']
+    plt.bar(range(len(weekly)), [violations for _, violations in weekly], color='green', alpha=0.7)
+    plt.xlabel('Dia da semana')
+    plt.ylabel('Número de violações')
+    plt.title('Violações por dia da semana')
+    plt.xticks(range(len(weekly)), [day[:3] for day, _ in weekly])
+    plt.grid(True, alpha=0.3)
+
+    # Chart 4: Cumulative violations
+    plt.subplot(2, 2, 4)
+    cumulative = list(accumulate(daily))
+    plt.plot(dates, cumulative, 'b-', linewidth=2)
+    plt.fill_between(dates, cumulative, alpha=0.3)
+    plt.xlabel('Data')
+    plt.ylabel('Total acumulado')
+    plt.title('Violações acumuladas')
+    plt.xticks(rotation=45)
+    plt.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(chart_file, dpi=settings['dpi'], bbox_inches='tight')
+    plt.close()
+    return str(chart_file)
+
+
+class ChartRenderer:
+    """
+    Renders charts in a single worker process, skipping unchanged ones
+
+    render() returns a Future, so a caller serving reports is never blocked by
+    matplotlib; the CLI simply waits on it.
+    """
+
+    def __init__(self, output_dir='analytics'):
+        self.output_dir = Path(output_dir)
+        self.executor = None
+
+    def chart_path(self, name, profile):
+        return self.output_dir / f"{name}{CHART_PROFILES[profile]['suffix']}.png"
+
+    def is_current(self, chart_file, fingerprint):
+        fingerprint_file = chart_file.with_suffix('.fingerprint')
+        return (chart_file.exists() and fingerprint_file.exists()
+                and fingerprint_file.read_text().strip() == fingerprint)
+
+    def render(self, data, name='training_progress', profile='print'):
+        """
+        Future resolving to (PNG path, rendered): rendered is False when the
+        previous PNG was reused
+        """
+        if profile not in CHART_PROFILES:
+            raise ValueError(f"Unknown chart profile: {profile}")
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        chart_file = self.chart_path(name, profile)
+        fingerprint = chart_fingerprint(data, profile)
+
+        if self.is_current(chart_file, fingerprint):
+            future = Future()
+            future.set_result((str(chart_file), False))
+            return future
+
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=1)
+
+        rendered = Future()
+        job = self.executor.submit(render_charts, data, str(chart_file), profile)
+
+        def done(job):
+            try:
+                path = job.result()
+            except Exception as e:
+                rendered.set_exception(e)
+                return
+            # Written only after the PNG, so a failed render is retried next time
+            chart_file.with_suffix('.fingerprint').write_text(fingerprint + '\n')
+            rendered.set_result((path, True))
+
+        job.add_done_callback(done)
+        return rendered
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
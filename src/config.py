@@ -71,6 +71,14 @@ NOTIFICATIONS = {
     'snapshot_dir': 'data/snapshots'
 }
 
+# Notification dispatch - snapshot/event log/sound/desktop run on background threads
+NOTIFICATION_DISPATCH = {
+    'enabled': True,  # False = notify synchronously inside the frame loop
+    'queue_size': 8,  # pending jobs per channel before new ones are dropped
+    'max_wait_seconds': 0.0,  # how long notify() may wait for room (0 = never block)
+    'flush_timeout_seconds': 10  # time allowed to finish pending jobs on shutdown
+}
+
 # Video recording
 RECORDING = {
     'enabled': False,
@@ -90,3 +98,124 @@ DISPLAY = {
     'show_detection_info': True,
     'debug_mode': True  # Show detailed detection metrics
 }
+
+# Training sounds - sounds/*.wav preloaded and played in-process (needs sounddevice)
+AUDIO_ENGINE = {
+    'enabled': True,  # False = spawn aplay/afplay for every cue
+    'sample_rate': 44100,
+    'blocksize': 256,  # frames per output callback (lower = less latency)
+    'max_voices': 4  # overlapping sounds mixed at once; the oldest is cut beyond this
+}
+
+# Offline video mode (--video) - recorded footage, timed by the video's own timestamps
+OFFLINE = {
+    'frame_stride': 1,  # analyse every Nth frame (skipped frames are not decoded)
+    'output_dir': 'data/offline',  # one folder per run with events.csv and snapshots/
+    'save_snapshots': True,
+    'progress_interval_seconds': 10  # print progress every N wall-clock seconds
+}
+
+# Metrics endpoint (Prometheus text format at http://host:port/metrics, --metrics-port)
+METRICS = {
+    'enabled': False,
+    'host': '127.0.0.1',  # use 0.0.0.0 to scrape from another machine/container
+    'port': 9108
+}
+
+# Profiling (--profile N) - cProfile + stack sampler over N frames after warmup
+PROFILING = {
+    'warmup_frames': 30,  # model/JIT warmup and first allocations are not profiled
+    'sample_interval_seconds': 0.005,  # stack sampler period (flame graph resolution)
+    'top_functions': 10,  # functions listed per stage
+    'output_dir': 'data/profiles'  # .prof (cProfile) and .folded (flame graph) files
+}
+
+# Pipelined capture/inference (zone_detector.py --pipeline)
+PIPELINE = {
+    'enabled': False,
+    'capture_queue_size': 1,  # latest frame wins - older frames are dropped
+    'result_queue_size': 2,  # results waiting for render/notify
+    'stats_interval_seconds': 60  # log per-stage drop counters every N seconds
+}
+
+# Motion gate - skip YOLO while the zones (plus a margin) are static
+MOTION_GATE = {
+    'enabled': True,
+    'downscale': 0.25,  # gate resolution relative to the capture frame
+    'zone_margin_px': 80,  # watch this many pixels around each zone (capture resolution)
+    'pixel_threshold': 25,  # gray-level difference that counts as changed
+    'min_changed_fraction': 0.005,  # fraction of ROI pixels that must change
+    'background_alpha': 0.05,  # background model learning rate
+    'keepalive_seconds': 5,  # run the model at least this often
+    'log_interval_seconds': 300  # log gated/ungated ratio every N seconds
+}
+
+# Zone mask index (rasterized zones for dog-in-zone checks)
+ZONE_INDEX = {
+    # Also flag a violation when at least this fraction of the dog box lies in
+    # a zone, even if the box center does not. 0 = box center only, the
+    # original rule; e.g. 0.5 also catches dogs straddling a zone edge
+    'min_overlap_fraction': 0
+}
+
+# Zone-ROI inference - run the model only on the area around the zones
+ROI_INFERENCE = {
+    'enabled': False,
+    'padding_px': 100,  # margin around the union of all zones
+    'imgsz': None  # model input size for the crop (e.g. 320), None = model default
+}
+
+# Inference engine (--engine): "torch", "onnx" (ONNX Runtime) or "openvino"
+# Exported models are cached next to the .pt weights on first use
+INFERENCE_ENGINE = 'torch'
+INFERENCE_INT8 = False  # load the INT8 model built by src/quantize.py (--int8)
+
+# Adaptive inference rate - model calls per second by dog presence
+INFERENCE_SCHEDULER = {
+    'enabled': True,
+    'rates': {
+        'IDLE': 1.0,  # no dog seen recently
+        'DOG_VISIBLE': 5.0,  # dog in view, away from the zones
+        'NEAR_ZONE': 0  # dog close to a zone: every frame (0 = no limit)
+    },
+    'near_zone_distance_px': 150,  # box within this distance of a zone = NEAR_ZONE
+    'hold_seconds': {  # stay in a state this long after the condition was last seen
+        'DOG_VISIBLE': 10,
+        'NEAR_ZONE': 5
+    }
+}
+
+# Dog tracker - smooths boxes between model calls and across short dropouts
+TRACKER = {
+    'enabled': True,
+    'iou_threshold': 0.3,  # minimum IoU to match a detection to a track
+    'max_missed_inferences': 2,  # drop a track after this many model runs without it
+                                 # (frames skipped by the gate/scheduler never age tracks)
+    'min_hits': 1,  # detections needed before a track is reported
+    'process_noise': 50.0,  # Kalman motion noise (higher = follows fast moves)
+    'measurement_noise': 10.0  # Kalman detection noise (pixels^2)
+}
+
+# Event store - SQLite (WAL) log of detections and zone violations
+EVENT_STORE = {
+    'enabled': True,
+    'path': 'logs/events.db',
+    'batch_size': 50,  # events per transaction
+    'flush_interval_seconds': 1.0,  # commit a partial batch after this long
+    'import_csv': 'logs/detections.csv'  # legacy log imported on first use (None = skip)
+}
+
+# Event archive - old events rotated out of the database into Parquet files
+# (python src/event_archive.py --rotate; needs pip install pyarrow)
+EVENT_ARCHIVE = {
+    'path': 'data/archive',  # date=YYYY-MM-DD/ partitions
+    'keep_days': 30,  # days of events kept in logs/events.db
+    'row_group_size': 10000  # rows per Parquet row group (unit of filter pushdown)
+}
+
+# Startup - the model loads and warms up while the camera opens;
+# a per-phase timing breakdown is logged once monitoring starts
+STARTUP = {
+    'background_model_load': True,  # overlap model load/warmup with the rest of startup
+    'warmup_inferences': 2  # model calls on a blank frame before the first real one
+}
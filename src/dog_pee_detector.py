@@ -7,6 +7,7 @@ Main detection script using computer vision and pose estimation
 import cv2
 import numpy as np
 import logging
+import signal
 import time
 import sys
 import json
@@ -18,16 +19,31 @@ sys.path.append(str(Path(__file__).parent))
 import config
 from pose_analyzer import PoseAnalyzer
 from notifier import Notifier
+from inference_engine import ENGINES, load_model
+from postprocess import result_keypoints
+from metrics import DetectorMetrics, start_server
+from profiling import LoopProfiler
+from offline_video import OfflineVideo, OfflineEventLog, ProgressReporter, print_summary
 
 
 class DogPeeDetector:
     """Main detector class for monitoring dog urination"""
 
-    def __init__(self, config_module):
+    def __init__(self, config_module, headless=False, engine=None, int8=None,
+                 metrics_port=None, profile_frames=None):
         self.config = config_module
+        self.engine = engine or config_module.INFERENCE_ENGINE
+        self.int8 = config_module.INFERENCE_INT8 if int8 is None else int8
         self.load_user_config()
         self.setup_logging()
 
+        # Headless mode (no rendering/display, signal-driven control)
+        self.headless = headless
+        self.stop_requested = False
+        self.snapshot_requested = False
+        # Kept on the instance: the config module is shared with other detectors
+        self.show_video = self.config.DISPLAY['show_video'] and not headless
+
         # Initialize components
         self.pose_analyzer = PoseAnalyzer(config_module)
         self.notifier = Notifier(config_module)
@@ -39,6 +55,20 @@ class DogPeeDetector:
         # Video capture
         self.cap = None
 
+        # Profiling (--profile N)
+        self.profiler = None
+        if profile_frames:
+            self.profiler = LoopProfiler(profile_frames, 'dog_pee_detector',
+                                         config_module.PROFILING)
+
+        # Metrics (per-frame counters are cheap; queues are read only when scraped)
+        self.metrics = DetectorMetrics('default')
+        self.metrics.watch_notifier(self.notifier)
+        if metrics_port is None and config_module.METRICS['enabled']:
+            metrics_port = config_module.METRICS['port']
+        if metrics_port:
+            start_server(config_module.METRICS['host'], metrics_port)
+
     def load_user_config(self):
         """Load user configuration from setup wizard"""
         user_config_file = Path(__file__).parent.parent / 'user_config.json'
@@ -90,12 +120,13 @@ class DogPeeDetector:
 
     def setup_model(self):
         """Initialize pose estimation model"""
-        self.logger.info(f"Loading model: {self.config.MODEL_TYPE}")
+        precision = 'INT8' if self.int8 else 'FP32'
+        self.logger.info(f"Loading model: {self.config.MODEL_TYPE} ({self.engine}, {precision})")
 
         try:
             if self.config.MODEL_TYPE == "yolo":
-                from ultralytics import YOLO
-                self.model = YOLO(self.config.YOLO_MODEL)
+                self.model = load_model(self.config.YOLO_MODEL, self.engine, task='pose',
+                                        int8=self.int8)
                 self.logger.info("YOLO model loaded successfully")
             else:
                 self.logger.error(f"Unsupported model type: {self.config.MODEL_TYPE}")
@@ -105,9 +136,9 @@ class DogPeeDetector:
             self.logger.error(f"Failed to load model: {e}")
             self.logger.info("Attempting to download model...")
             try:
-                from ultralytics import YOLO
                 # This will download the model if not present
-                self.model = YOLO('yolov8n-pose.pt')
+                self.model = load_model('yolov8n-pose.pt', self.engine, task='pose',
+                                        int8=self.int8)
                 self.logger.info("Model downloaded and loaded successfully")
             except Exception as e2:
                 self.logger.error(f"Failed to download model: {e2}")
@@ -170,42 +201,37 @@ class DogPeeDetector:
 
         return frame
 
-    def check_humans_nearby(self, result, dog_keypoints):
-        """Check if there are humans near the dog"""
+    def check_humans_nearby(self, all_keypoints, frame_width):
+        """
+        Check if there are humans near the dog
+
+        Args:
+            all_keypoints: N x K x 3 keypoints of every detected pose (first = dog)
+            frame_width: Frame width in pixels
+        """
         if not self.config.PEE_DETECTION.get('ignore_with_humans_nearby', False):
             return False
 
         # YOLOv8-pose detects multiple poses, check if any are human-sized
-        if not hasattr(result, 'keypoints') or result.keypoints is None:
-            return False
-
-        if len(result.keypoints.data) <= 1:
+        if len(all_keypoints) <= 1:
             return False  # Only dog detected
 
         # Get dog position
-        dog_x = dog_keypoints[:, 0].mean()
-        dog_y = dog_keypoints[:, 1].mean()
+        dog_x = all_keypoints[0, :, 0].mean()
 
         threshold = self.config.PEE_DETECTION['human_proximity_threshold']
-        frame_width = result.orig_shape[1] if hasattr(result, 'orig_shape') else 1280
-
-        # Check other detected poses
-        for i in range(1, len(result.keypoints.data)):
-            other_kp = result.keypoints.data[i].cpu().numpy()
-            other_x = other_kp[:, 0].mean()
-            other_y = other_kp[:, 1].mean()
 
-            # Calculate distance
-            distance = abs(other_x - dog_x)
-            if distance < (frame_width * threshold):
-                return True  # Human nearby
-
-        return False
+        # Check other detected poses (all at once)
+        other_x = all_keypoints[1:, :, 0].mean(axis=1)
+        return bool(np.any(np.abs(other_x - dog_x) < frame_width * threshold))
 
     def process_frame(self, frame, current_time):
         """Process a single frame"""
         # Run pose estimation
+        inference_start = time.perf_counter()
         results = self.model(frame, conf=self.config.CONFIDENCE_THRESHOLD, verbose=False)
+        self.metrics.record_inference(time.perf_counter() - inference_start)
+        self.metrics.frames.inc()
 
         keypoints = None
         detection_result = None
@@ -213,25 +239,24 @@ class DogPeeDetector:
 
         # Process results
         if results and len(results) > 0:
-            result = results[0]
+            # Every pose moved to NumPy in one transfer
+            all_keypoints = result_keypoints(results[0])
 
-            # Check if any dogs detected
-            if hasattr(result, 'keypoints') and result.keypoints is not None:
-                # Get first detection (assuming single dog)
-                if len(result.keypoints.data) > 0:
-                    keypoints = result.keypoints.data[0].cpu().numpy()
+            # Get first detection (assuming single dog)
+            if len(all_keypoints) > 0:
+                keypoints = all_keypoints[0]
 
-                    # Check for humans nearby
-                    humans_nearby = self.check_humans_nearby(result, keypoints)
+                # Check for humans nearby
+                humans_nearby = self.check_humans_nearby(all_keypoints, frame.shape[1])
 
-                    # Analyze pose for pee detection
-                    detection_result = self.pose_analyzer.analyze_pose(
-                        keypoints, current_time, humans_nearby
-                    )
+                # Analyze pose for pee detection
+                detection_result = self.pose_analyzer.analyze_pose(
+                    keypoints, current_time, humans_nearby
+                )
 
-                    # Draw skeleton if enabled
-                    if self.config.DISPLAY['show_skeleton']:
-                        frame = self.draw_skeleton(frame, keypoints)
+                # Draw skeleton if enabled
+                if self.config.DISPLAY['show_skeleton'] and not self.headless:
+                    frame = self.draw_skeleton(frame, keypoints)
 
         return frame, keypoints, detection_result
 
@@ -361,23 +386,33 @@ class DogPeeDetector:
         print("\n" + "=" * 60)
         print("DontPiss - Dog Pee Detection System")
         print("=" * 60)
-        print("Press 'q' to quit")
-        print("Press 's' to save current frame")
-        print("Press 'r' to reset detection")
-        print("Press 'd' to toggle debug mode")
+        if self.headless:
+            print("Headless mode: no video window")
+            print("SIGTERM/SIGINT to quit, SIGUSR1 to save a snapshot")
+            print("SIGUSR2 to reset detection")
+        else:
+            print("Press 'q' to quit")
+            print("Press 's' to save current frame")
+            print("Press 'r' to reset detection")
+            print("Press 'd' to toggle debug mode")
         print("=" * 60 + "\n")
 
+        self.install_signal_handlers()
+
         frame_count = 0
         start_time = time.time()
         fps = 0
 
         try:
-            while True:
+            while not self.stop_requested:
                 ret, frame = self.cap.read()
                 if not ret:
                     self.logger.warning("Failed to read frame")
                     break
 
+                if self.profiler and self.profiler.tick():
+                    break
+
                 current_time = time.time()
                 frame_count += 1
 
@@ -385,21 +420,39 @@ class DogPeeDetector:
                 if frame_count % 30 == 0:
                     fps = 30 / (current_time - start_time)
                     start_time = current_time
+                    self.metrics.fps.set(fps)
 
                 # Process frame
                 processed_frame, keypoints, detection_result = self.process_frame(
                     frame, current_time
                 )
 
+                # Overlays for snapshots are drawn lazily when headless
+                render = None
+                if self.headless:
+                    def render(snapshot_frame):
+                        return self.render_overlays(snapshot_frame.copy(), keypoints,
+                                                    detection_result, fps)
+
                 # Check for pee detection
                 if detection_result and detection_result['is_peeing']:
-                    self.notifier.notify(processed_frame, detection_result)
+                    self.metrics.pee_detection(detection_result['detection_type'])
+                    self.notifier.notify(processed_frame, detection_result, render=render)
+
+                if self.snapshot_requested:
+                    self.snapshot_requested = False
+                    self.save_manual_snapshot(
+                        render(processed_frame) if render else processed_frame
+                    )
+
+                if self.headless:
+                    continue
 
                 # Draw information
                 processed_frame = self.draw_info(processed_frame, detection_result, fps)
 
                 # Display frame
-                if self.config.DISPLAY['show_video']:
+                if self.show_video:
                     cv2.imshow('DontPiss - Dog Pee Detector', processed_frame)
 
                 # Handle key presses
@@ -408,10 +461,7 @@ class DogPeeDetector:
                     self.logger.info("Quit requested")
                     break
                 elif key == ord('s'):
-                    timestamp = time.strftime('%Y%m%d_%H%M%S')
-                    filename = f"manual_snapshot_{timestamp}.jpg"
-                    cv2.imwrite(f"data/{filename}", processed_frame)
-                    self.logger.info(f"Snapshot saved: {filename}")
+                    self.save_manual_snapshot(processed_frame)
                 elif key == ord('r'):
                     self.pose_analyzer.reset_detection()
                     self.logger.info("Detection reset")
@@ -428,20 +478,142 @@ class DogPeeDetector:
         finally:
             self.cleanup()
 
+    def run_offline(self, video_path, stride=None):
+        """
+        Process a recorded video as fast as possible
+
+        Cooldowns follow the video timestamps; detections go to an event log.
+        """
+        stride = stride or self.config.OFFLINE['frame_stride']
+        self.headless = True
+        self.show_video = False
+        self.install_signal_handlers()
+
+        # Detection threshold is in analysed frames: keep the same duration
+        pee_config = dict(self.pose_analyzer.pee_config)
+        pee_config['min_frames_threshold'] = max(
+            1, round(pee_config['min_frames_threshold'] / stride))
+        self.pose_analyzer.pee_config = pee_config
+
+        # Video time starts at 0: the first detection of the clip must not
+        # fall inside a cooldown from the wall-clock default
+        self.pose_analyzer.last_detection_time = float('-inf')
+
+        video = OfflineVideo(video_path, stride)
+        events = OfflineEventLog(video_path, self.config.OFFLINE)
+        progress = ProgressReporter(video, self.config.OFFLINE['progress_interval_seconds'])
+        print(f"\nOffline mode: {video_path} (stride {video.stride})")
+        print(f"Events: {events.output_dir / 'events.csv'}\n")
+
+        video_seconds = 0.0
+        try:
+            for frame_index, frame, video_seconds in video.frames():
+                if self.stop_requested:
+                    break
+                if self.profiler and self.profiler.tick():
+                    break
+
+                processed_frame, keypoints, detection_result = self.process_frame(
+                    frame, video_seconds
+                )
+
+                if detection_result and detection_result['is_peeing']:
+                    snapshot_path = events.save_snapshot(
+                        self.render_overlays(processed_frame.copy(), keypoints,
+                                             detection_result, 0),
+                        video_seconds, detection_result['detection_type']
+                    )
+                    events.log(video_seconds, frame_index, 'pee_detected',
+                               detection_result['detection_type'],
+                               confidence=detection_result['confidence'],
+                               snapshot_path=snapshot_path)
+
+                progress.update(video_seconds)
+        except KeyboardInterrupt:
+            self.logger.info("Interrupted by user")
+        finally:
+            events.close()
+            video.release()
+            print_summary(video, events, video_seconds)
+            self.cleanup()
+
+    def install_signal_handlers(self):
+        """Signal-based control (replaces keyboard control when headless)"""
+        def request_stop(signum, frame):
+            self.logger.info(f"Received signal {signum}, stopping...")
+            self.stop_requested = True
+
+        def request_snapshot(signum, frame):
+            self.snapshot_requested = True
+
+        def request_reset(signum, frame):
+            self.pose_analyzer.reset_detection()
+            self.logger.info("Detection reset")
+
+        signal.signal(signal.SIGTERM, request_stop)
+        if self.headless:
+            signal.signal(signal.SIGINT, request_stop)
+        if hasattr(signal, 'SIGUSR1'):  # Not available on Windows
+            signal.signal(signal.SIGUSR1, request_snapshot)
+            signal.signal(signal.SIGUSR2, request_reset)
+
+    def render_overlays(self, frame, keypoints, detection_result, fps):
+        """Draw skeleton and detection info onto the frame"""
+        if self.config.DISPLAY['show_skeleton']:
+            frame = self.draw_skeleton(frame, keypoints)
+        return self.draw_info(frame, detection_result, fps)
+
+    def save_manual_snapshot(self, frame):
+        """Save a snapshot requested by the user (key 's' or SIGUSR1)"""
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
+        filename = f"manual_snapshot_{timestamp}.jpg"
+        cv2.imwrite(f"data/{filename}", frame)
+        self.logger.info(f"Snapshot saved: {filename}")
+
     def cleanup(self):
         """Clean up resources"""
         self.logger.info("Cleaning up...")
+        if self.profiler:
+            self.profiler.close()
         if self.cap:
             self.cap.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
+        self.notifier.close()
         self.logger.info("Shutdown complete")
 
 
 def main():
     """Entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='DontPiss Dog Pee Detector')
+    parser.add_argument('--headless', action='store_true',
+                       help='No video window or overlays (Docker/servers); control via signals')
+    parser.add_argument('--engine', choices=ENGINES, default=None,
+                       help='Inference backend (default: config.INFERENCE_ENGINE)')
+    parser.add_argument('--int8', action='store_true',
+                       help='Use the INT8 model built by quantize.py (onnx/openvino engines)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve Prometheus metrics on this port (http://127.0.0.1:PORT/metrics)')
+    parser.add_argument('--profile', type=int, metavar='N', default=None,
+                       help='Profile N frames after warmup, write .prof/.folded files and exit')
+    parser.add_argument('--video', metavar='PATH',
+                       help='Process a recorded video offline (no display, video timestamps)')
+    parser.add_argument('--stride', type=int, default=None,
+                       help='With --video: analyse every Nth frame (default: config.OFFLINE)')
+
+    args = parser.parse_args()
+
     try:
-        detector = DogPeeDetector(config)
-        detector.run()
+        detector = DogPeeDetector(config, headless=args.headless or bool(args.video),
+                                  engine=args.engine, int8=args.int8 or None,
+                                  metrics_port=args.metrics_port,
+                                  profile_frames=args.profile)
+        if args.video:
+            detector.run_offline(args.video, args.stride)
+        else:
+            detector.run()
     except Exception as e:
         print(f"Fatal error: {e}")
         logging.error(f"Fatal error: {e}", exc_info=True)
@@ -0,0 +1,175 @@
+"""
+Dog Tracker - Lightweight IoU + Kalman tracker for dog boxes
+Keeps stable track ids, predicts boxes on frames without inference and
+survives short detection dropouts
+"""
+
+import logging
+import numpy as np
+
+from postprocess import CONF, CLS, empty_detections
+
+logger = logging.getLogger(__name__)
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy box arrays"""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return intersection / (area_a[:, None] + area_b[None, :] - intersection + 1e-6)
+
+
+class Track:
+    """
+    Single dog track with a constant-velocity Kalman filter
+
+    State: [cx, cy, w, h, vx, vy, vw, vh] (pixels, pixels/second)
+    """
+
+    H = np.hstack([np.eye(4), np.zeros((4, 4))])
+
+    def __init__(self, track_id, box, current_time, tracker_config):
+        self.track_id = track_id
+        self.tracker_config = tracker_config
+
+        x1, y1, x2, y2 = box[:4]
+        self.x = np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1, 0, 0, 0, 0],
+                          dtype=np.float64)
+        self.P = np.diag([10, 10, 10, 10, 1000, 1000, 1000, 1000]).astype(np.float64)
+        self.R = np.eye(4) * tracker_config['measurement_noise']
+
+        self.time = current_time
+        self.last_update_time = current_time
+        self.hits = 1
+        self.misses = 0  # consecutive model runs without a matching detection
+        self.conf = float(box[CONF]) if len(box) > CONF else 1.0
+        self.cls = float(box[CLS]) if len(box) > CLS else 0.0
+
+    def predict(self, current_time):
+        """Advance the state to current_time"""
+        dt = current_time - self.time
+        if dt <= 0:
+            return
+
+        F = np.eye(8)
+        F[0:4, 4:8] = np.eye(4) * dt
+        q = self.tracker_config['process_noise']
+        Q = np.diag([q * dt] * 4 + [q * 10 * dt] * 4)
+
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + Q
+        self.x[2:4] = np.maximum(self.x[2:4], 1.0)
+        self.time = current_time
+
+    def update(self, box, current_time):
+        """Correct the state with a matched detection"""
+        x1, y1, x2, y2 = box[:4]
+        z = np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1], dtype=np.float64)
+
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - self.H @ self.x)
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+
+        self.last_update_time = current_time
+        self.hits += 1
+        self.misses = 0
+        if len(box) > CLS:
+            self.conf = float(box[CONF])
+            self.cls = float(box[CLS])
+
+    def box(self):
+        """Current box estimate as xyxy"""
+        cx, cy, w, h = self.x[:4]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], dtype=np.float32)
+
+
+class DogTracker:
+    """Associates detections to tracks by IoU and coasts tracks between detections"""
+
+    def __init__(self, tracker_config):
+        self.tracker_config = tracker_config
+        self.tracks = []
+        self.next_id = 1
+
+    def predict(self, current_time):
+        """
+        Predicted boxes for a frame without inference
+
+        Tracks are never dropped here: a dog lying still is exactly what the
+        motion gate and scheduler skip, so only model runs can age a track.
+
+        Returns:
+            Tuple of (detections, track_ids)
+        """
+        for track in self.tracks:
+            track.predict(current_time)
+        return self.output()
+
+    def update(self, detections, current_time):
+        """
+        Match fresh detections to tracks, start new tracks, drop stale ones
+
+        Args:
+            detections: Dog detections from the model (N x 6)
+            current_time: Frame timestamp (seconds)
+        Returns:
+            Tuple of (detections, track_ids)
+        """
+        for track in self.tracks:
+            track.predict(current_time)
+
+        unmatched = list(range(len(detections)))
+        matched_tracks = set()
+        if self.tracks and len(detections) > 0:
+            ious = iou_matrix([track.box() for track in self.tracks],
+                              [det[:4] for det in detections])
+
+            # Greedy assignment, best overlaps first
+            threshold = self.tracker_config['iou_threshold']
+            for flat_index in np.argsort(-ious, axis=None):
+                t, d = np.unravel_index(flat_index, ious.shape)
+                if ious[t, d] < threshold:
+                    break
+                if d not in unmatched or t in matched_tracks:
+                    continue
+                self.tracks[t].update(detections[d], current_time)
+                matched_tracks.add(t)
+                unmatched.remove(d)
+
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.misses += 1
+
+        for d in unmatched:
+            self.tracks.append(Track(self.next_id, detections[d], current_time, self.tracker_config))
+            logger.debug(f"New dog track #{self.next_id}")
+            self.next_id += 1
+
+        self.prune()
+        return self.output()
+
+    def prune(self):
+        """Drop tracks missed by too many consecutive model runs"""
+        max_missed = self.tracker_config['max_missed_inferences']
+        self.tracks = [track for track in self.tracks if track.misses <= max_missed]
+
+    def output(self):
+        """Detections array (N x 6, last matched conf/cls) and ids of confirmed tracks"""
+        confirmed = [track for track in self.tracks
+                     if track.hits >= self.tracker_config['min_hits']]
+        if not confirmed:
+            return empty_detections(), []
+
+        detections = np.array([[*track.box(), track.conf, track.cls] for track in confirmed],
+                              dtype=np.float32)
+        return detections, [track.track_id for track in confirmed]
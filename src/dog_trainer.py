@@ -5,22 +5,28 @@ Extends zone_detector with training capabilities
 """
 
 import subprocess
-import os
 import random
 import time
 import platform
 from pathlib import Path
 
+from audio_scheduler import AudioScheduler, WAIT_FOR_SOUND
+from audio_engine import AudioEngine, latency_summary
+
+PRAISE_PRIORITY = 5  # above every alert level: once the dog leaves, pending alerts are stale
+
 
 class DogTrainer:
     """Handles active training alerts for the dog"""
 
-    def __init__(self, training_mode='gentle'):
+    def __init__(self, training_mode='gentle', audio_config=None):
         """
         Initialize trainer with specific mode
 
         Args:
             training_mode: 'gentle', 'standard', or 'intensive'
+            audio_config: config.AUDIO_ENGINE to play sounds/*.wav in-process
+                          (None = spawn an external player per cue)
         """
         self.training_mode = training_mode
         self.last_alert_time = 0
@@ -65,82 +71,96 @@ class DogTrainer:
         # Check which custom files exist
         self.has_custom_audio = any(f.exists() for f in self.custom_audio.values())
 
+        # Preloaded custom sounds mixed into one output stream
+        self.engine = None
+        if audio_config and audio_config['enabled']:
+            self.engine = AudioEngine(self.sounds_dir, audio_config)
+
+        # Sounds play on their own thread so alert() never blocks the video loop
+        self.audio = AudioScheduler()
+        self.audio.start()
+
+    def spawn(self, args):
+        """Start a sound player process without waiting for it"""
+        return subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
     def play_audio_file(self, filepath):
-        """Play custom audio file (cross-platform)"""
+        """Play custom audio file (cross-platform) - returns the player process/voice or None"""
+        # Preloaded in the audio engine: no process spawn
+        if self.engine and self.engine.has_sound(Path(filepath).stem):
+            return self.engine.play(Path(filepath).stem)
+
         try:
             if not Path(filepath).exists():
-                return False
+                return None
 
             if platform.system() == 'Darwin':  # macOS
-                subprocess.Popen(['afplay', str(filepath)],
-                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                return self.spawn(['afplay', str(filepath)])
             elif platform.system() == 'Windows':
                 # Use Windows Media Player command line
-                subprocess.Popen(['powershell', '-c', f'(New-Object Media.SoundPlayer "{filepath}").PlaySync()'],
-                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                               creationflags=subprocess.CREATE_NO_WINDOW)
+                return subprocess.Popen(['powershell', '-c', f'(New-Object Media.SoundPlayer "{filepath}").PlaySync()'],
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                        creationflags=subprocess.CREATE_NO_WINDOW)
             else:  # Linux
-                subprocess.Popen(['aplay', str(filepath)],
-                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            return True
+                return self.spawn(['aplay', str(filepath)])
         except:
-            return False
+            return None
 
     def play_beep(self, duration=0.3, frequency=800):
         """Play beep sound (cross-platform) - uses custom audio if available"""
         # Try custom audio first
         if self.custom_audio['alert_soft'].exists():
-            if self.play_audio_file(self.custom_audio['alert_soft']):
-                return
+            process = self.play_audio_file(self.custom_audio['alert_soft'])
+            if process:
+                return process
 
         # Fallback to system beep
         try:
             if platform.system() == 'Darwin':  # macOS
-                os.system('afplay /System/Library/Sounds/Funk.aiff &')
+                return self.spawn(['afplay', '/System/Library/Sounds/Funk.aiff'])
             elif platform.system() == 'Windows':
                 # Windows beep using winsound
                 import winsound
                 winsound.Beep(int(frequency), int(duration * 1000))
             else:  # Linux
-                os.system(f'beep -f {frequency} -l {int(duration * 1000)} &')
+                return self.spawn(['beep', '-f', str(frequency), '-l', str(int(duration * 1000))])
         except Exception as e:
             # Fallback: just print (silent mode)
             pass
+        return None
 
     def play_buzzer(self):
         """Play annoying buzzer sound - uses custom audio if available"""
         # Try custom audio first
         if self.custom_audio['alert_strong'].exists():
-            if self.play_audio_file(self.custom_audio['alert_strong']):
-                return
+            process = self.play_audio_file(self.custom_audio['alert_strong'])
+            if process:
+                return process
 
         # Fallback to system buzzer
         try:
             if platform.system() == 'Darwin':  # macOS
-                os.system('afplay /System/Library/Sounds/Sosumi.aiff &')
+                return self.spawn(['afplay', '/System/Library/Sounds/Sosumi.aiff'])
             elif platform.system() == 'Windows':
                 import winsound
-                # Play sequence of annoying beeps
+                # Play sequence of annoying beeps (runs on the audio thread)
                 for _ in range(3):
                     winsound.Beep(1000, 200)
                     time.sleep(0.1)
             else:  # Linux
-                os.system('beep -f 1000 -l 200 -r 3 &')
+                return self.spawn(['beep', '-f', '1000', '-l', '200', '-r', '3'])
         except:
             pass
+        return None
 
     def play_voice_command(self, command="No"):
         """Play voice command - uses custom audio if available, fallback to TTS"""
         # Try custom audio first based on command type
-        if command == "Good":
-            if self.custom_audio['good_dog'].exists():
-                if self.play_audio_file(self.custom_audio['good_dog']):
-                    return
-        else:
-            # For warning commands, use medium alert
-            if self.custom_audio['alert_medium'].exists():
-                if self.play_audio_file(self.custom_audio['alert_medium']):
-                    return
+        audio_key = 'good_dog' if command == "Good" else 'alert_medium'  # warnings use medium alert
+        if self.custom_audio[audio_key].exists():
+            process = self.play_audio_file(self.custom_audio[audio_key])
+            if process:
+                return process
 
         # Fallback to text-to-speech
         try:
@@ -153,67 +173,77 @@ class DogTrainer:
             message = random.choice(commands.get(command, ["No!"]))
 
             if platform.system() == 'Darwin':  # macOS
-                subprocess.Popen(['say', '-v', 'Samantha', '-r', '200', message],
-                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                return self.spawn(['say', '-v', 'Samantha', '-r', '200', message])
             elif platform.system() == 'Windows':
                 # Use PowerShell's text-to-speech (non-blocking)
                 ps_command = f'Add-Type -AssemblyName System.Speech; (New-Object System.Speech.Synthesis.SpeechSynthesizer).Speak("{message}")'
-                subprocess.Popen(['powershell', '-Command', ps_command],
-                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                               creationflags=subprocess.CREATE_NO_WINDOW if platform.system() == 'Windows' else 0)
+                return subprocess.Popen(['powershell', '-Command', ps_command],
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                        creationflags=subprocess.CREATE_NO_WINDOW if platform.system() == 'Windows' else 0)
             else:  # Linux
-                subprocess.Popen(['espeak', message],
-                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                return self.spawn(['espeak', message])
         except Exception as e:
             # Silent fallback
             pass
+        return None
 
-    def play_ultrasonic_simulation(self):
+    def ultrasonic_steps(self):
         """
         Simulate ultrasonic deterrent with high-frequency beeps
         (Dogs hear higher frequencies than humans)
+
+        Returns:
+            Cue steps for the audio scheduler (the pauses between beeps are
+            scheduler gaps, not sleeps on the caller's thread)
         """
-        try:
-            if platform.system() == 'Darwin':  # macOS
-                for _ in range(3):
-                    os.system('afplay /System/Library/Sounds/Tink.aiff &')
-                    time.sleep(0.1)
-            elif platform.system() == 'Windows':
+        if platform.system() == 'Darwin':  # macOS
+            def tink():
+                return self.spawn(['afplay', '/System/Library/Sounds/Tink.aiff'])
+            return [(tink, 0.1)] * 3
+        elif platform.system() == 'Windows':
+            def high_beep():
                 import winsound
-                # Play high-frequency beeps
-                for _ in range(3):
-                    winsound.Beep(3000, 100)  # High pitch
-                    time.sleep(0.1)
-            else:  # Linux
-                os.system('beep -f 3000 -l 100 -r 3 &')
-        except:
-            pass
-
-    def escalate_alert(self, violation_duration):
-        """Escalate alert based on how long dog has been in zone"""
-
+                winsound.Beep(3000, 100)  # High pitch
+            return [(high_beep, 0.1)] * 3
+        else:  # Linux
+            def beep_burst():
+                return self.spawn(['beep', '-f', '3000', '-l', '100', '-r', '3'])
+            return [(beep_burst, 0)]
+
+    def escalation_level(self, violation_duration):
+        """Alert level 1-4 for how long the dog has been in the zone"""
         if violation_duration < 1:
-            # Level 1: Gentle warning (first second)
-            self.play_beep(duration=0.2)
-
+            return 1  # Gentle warning (first second)
         elif violation_duration < 3:
-            # Level 2: Firm warning (1-3 seconds)
-            self.play_voice_command("No")
-
+            return 2  # Firm warning (1-3 seconds)
         elif violation_duration < 5:
-            # Level 3: Strong deterrent (3-5 seconds)
-            self.play_buzzer()
-            self.play_voice_command("No")
+            return 3  # Strong deterrent (3-5 seconds)
+        return 4  # Maximum deterrent (5+ seconds)
 
+    def escalate_alert(self, violation_duration):
+        """Escalate alert based on how long dog has been in zone"""
+        level = self.escalation_level(violation_duration)
+
+        def say_no():
+            return self.play_voice_command("No")
+
+        # The last step waits for its sound, so the cue stays current (and can be
+        # coalesced or preempted) until it has finished playing
+        if level == 1:
+            steps = [(lambda: self.play_beep(duration=0.2), WAIT_FOR_SOUND)]
+        elif level == 2:
+            steps = [(say_no, WAIT_FOR_SOUND)]
+        elif level == 3:
+            steps = [(self.play_buzzer, 0), (say_no, WAIT_FOR_SOUND)]
         else:
-            # Level 4: Maximum deterrent (5+ seconds)
-            self.play_ultrasonic_simulation()
-            self.play_voice_command("No")
-            self.play_buzzer()
+            steps = self.ultrasonic_steps() + [(say_no, 0), (self.play_buzzer, WAIT_FOR_SOUND)]
+
+        # A higher level preempts whatever lower level is still playing
+        self.audio.play(f'level_{level}', steps, priority=level)
 
     def alert(self, frames_in_zone):
         """
-        Main alert method
+        Main alert method - queues sounds and returns immediately
 
         Args:
             frames_in_zone: Number of consecutive frames dog has been in zone
@@ -236,29 +266,40 @@ class DogTrainer:
             self.escalate_alert(violation_duration)
         else:
             # Simple repeated alert
-            for _ in range(self.config['repeat_alerts']):
-                self.play_beep(duration=0.3)
-                time.sleep(0.2)
+            beep = lambda: self.play_beep(duration=0.3)
+            steps = [(beep, 0.2)] * (self.config['repeat_alerts'] - 1) + [(beep, WAIT_FOR_SOUND)]
+            self.audio.play('repeat', steps, priority=1)
+
+    def play_praise_sound(self):
+        """Pleasant system sound (macOS only)"""
+        if platform.system() == 'Darwin':
+            return self.spawn(['afplay', '/System/Library/Sounds/Hero.aiff'])
+        return None
 
     def positive_reinforcement(self):
         """Play positive sound when dog leaves zone"""
-        try:
-            # Play pleasant sound
-            os.system('afplay /System/Library/Sounds/Hero.aiff')
-            # Optional: voice praise
-            if random.random() < 0.3:  # 30% of the time
-                self.play_voice_command("Good")
-        except:
-            pass
+        # Play pleasant sound, then (30% of the time) voice praise once it ends
+        steps = [(self.play_praise_sound, WAIT_FOR_SOUND)]
+        if random.random() < 0.3:
+            steps.append((lambda: self.play_voice_command("Good"), WAIT_FOR_SOUND))
+        self.audio.play('praise', steps, priority=PRAISE_PRIORITY)
 
     def get_stats(self):
         """Get training session statistics"""
         return {
             'mode': self.training_mode,
             'alerts_triggered': self.alert_count,
-            'config': self.config
+            'config': self.config,
+            'audio': self.audio.get_stats(),
+            'cue_latency': latency_summary(self.audio.cue_latencies())
         }
 
+    def close(self):
+        """Stop the audio thread (any sound still playing is cut off)"""
+        self.audio.stop()
+        if self.engine:
+            self.engine.close()
+
 
 def create_training_sounds():
     """
@@ -330,6 +371,7 @@ if __name__ == "__main__":
 
         stats = trainer.get_stats()
         print(f"\nStats: {stats}")
+        trainer.close()
 
     print("\n✅ Demo complete!")
     print("\nTo create custom sounds:")
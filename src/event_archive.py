@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Event Archive - Date-partitioned Parquet archive of old events
+Events older than keep_days are rotated out of the SQLite store into
+<archive>/date=YYYY-MM-DD/ files with typed columns; readers only open the
+partitions in the requested range and only the columns they ask for
+
+Usage:
+    python src/event_archive.py --rotate
+    python src/event_archive.py --stats
+"""
+
+import importlib.util
+import logging
+import os
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from event_store import connect
+from rollups import RollupCache
+
+logger = logging.getLogger(__name__)
+
+# pyarrow (and numpy with it) is only imported once an archive is opened,
+# so importing this module costs nothing on the text-report path
+ARCHIVE_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+pa = None
+pq = None
+
+
+def load_pyarrow():
+    global pa, pq
+    if pq is None:
+        import pyarrow
+        import pyarrow.parquet
+        pa, pq = pyarrow, pyarrow.parquet
+
+
+def archive_schema():
+    return pa.schema([
+        ('timestamp', pa.timestamp('us')),  # local time, as recorded
+        ('camera', pa.string()),
+        ('zone', pa.string()),
+        ('event_type', pa.string()),
+        ('confidence', pa.float32()),
+        ('frames_detected', pa.int32()),
+        ('snapshot_path', pa.string()),
+    ])
+
+
+def as_datetime(value):
+    """datetime for a datetime, date or ISO string"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    return datetime.fromisoformat(value)
+
+
+class EventArchive:
+    """Reader/writer for the date=YYYY-MM-DD partitioned archive"""
+
+    def __init__(self, archive_dir, row_group_size=10000):
+        if not ARCHIVE_AVAILABLE:
+            raise RuntimeError("pyarrow not installed (pip install pyarrow)")
+        load_pyarrow()
+        self.archive_dir = Path(archive_dir)
+        self.row_group_size = row_group_size
+
+    def partitions(self, start=None, end=None):
+        """[(day, directory)] of the partitions overlapping [start, end), oldest first"""
+        if not self.archive_dir.exists():
+            return []
+
+        start_day = as_datetime(start).date() if start is not None else None
+        end_day = None
+        if end is not None:
+            end = as_datetime(end)
+            # end is exclusive: a midnight end excludes that day, any later time includes it
+            end_day = end.date() if end.time() == datetime.min.time() else end.date() + timedelta(days=1)
+
+        found = []
+        for directory in self.archive_dir.glob('date=*'):
+            try:
+                day = date.fromisoformat(directory.name[len('date='):])
+            except ValueError:
+                continue
+            if start_day is not None and day < start_day:
+                continue
+            if end_day is not None and day >= end_day:
+                continue
+            found.append((day, directory))
+        return sorted(found)
+
+    @staticmethod
+    def filters(start=None, end=None, zone=None, camera=None, event_type=None):
+        """Parquet filter expression for the range and the column filters (None = all)"""
+        filters = []
+        if start is not None:
+            filters.append(('timestamp', '>=', as_datetime(start)))
+        if end is not None:
+            filters.append(('timestamp', '<', as_datetime(end)))
+        for column, value in (('zone', zone), ('camera', camera), ('event_type', event_type)):
+            if value is not None:
+                filters.append((column, '=', value))
+        return filters or None
+
+    def read_partitions(self, partitions, columns=None, filters=None):
+        """Concatenated Table of the given partitions"""
+        tables = [pq.read_table(path, columns=columns, filters=filters)
+                  for _, directory in partitions
+                  for path in sorted(directory.glob('*.parquet'))]
+        if not tables:
+            schema = archive_schema()
+            if columns is not None:
+                schema = pa.schema([schema.field(name) for name in columns])
+            return schema.empty_table()
+        return pa.concat_tables(tables)
+
+    def read(self, start=None, end=None, columns=None, zone=None, camera=None, event_type=None):
+        """
+        Events in [start, end) as a pyarrow Table
+
+        Partitions outside the range are never opened; the time range and the
+        zone/camera/type filters are pushed down to the row groups and only
+        `columns` are decoded.
+        """
+        return self.read_partitions(self.partitions(start, end), columns,
+                                    self.filters(start, end, zone, camera, event_type))
+
+    def write_partition(self, day, rows):
+        """
+        Write one day's events (sqlite rows) as a Parquet file
+
+        The file is named after the event id range, so writing the same events
+        again (an interrupted rotation) replaces the file instead of duplicating it.
+        """
+        directory = self.archive_dir / f"date={day}"
+        directory.mkdir(parents=True, exist_ok=True)
+
+        table = pa.table({
+            'timestamp': [datetime.fromisoformat(row['timestamp']) for row in rows],
+            'camera': [row['camera'] for row in rows],
+            'zone': [row['zone'] for row in rows],
+            'event_type': [row['event_type'] for row in rows],
+            'confidence': [row['confidence'] for row in rows],
+            'frames_detected': [row['frames_detected'] for row in rows],
+            'snapshot_path': [row['snapshot_path'] for row in rows],
+        }, schema=archive_schema())
+
+        path = directory / f"events_{rows[0]['id']}-{rows[-1]['id']}.parquet"
+        temp_path = path.with_suffix('.tmp')
+        pq.write_table(table, temp_path, row_group_size=self.row_group_size, compression='zstd')
+        os.replace(temp_path, path)
+        return path
+
+    def rotate(self, connection, keep_days):
+        """
+        Move events older than keep_days from the store into the archive
+
+        Rollups are brought up to date first, so the daily/hourly counts keep
+        the archived events.
+
+        Returns:
+            Number of events archived
+        """
+        RollupCache(connection).update()
+
+        cutoff = datetime.combine(date.today() - timedelta(days=keep_days), datetime.min.time())
+        days = [row[0] for row in connection.execute(
+            'SELECT DISTINCT substr(timestamp, 1, 10) FROM events WHERE ts < ? ORDER BY 1',
+            (cutoff.timestamp(),))]
+
+        archived = 0
+        for day in days:
+            rows = connection.execute(
+                'SELECT * FROM events WHERE ts < ? AND substr(timestamp, 1, 10) = ? ORDER BY id',
+                (cutoff.timestamp(), day)).fetchall()
+            path = self.write_partition(day, rows)
+            with connection:
+                connection.executemany('DELETE FROM events WHERE id = ?',
+                                       [(row['id'],) for row in rows])
+            archived += len(rows)
+            logger.info(f"Archived {len(rows)} event(s) to {path}")
+        return archived
+
+    def first_timestamp(self, start=None, end=None, zone=None, camera=None):
+        """Earliest archived event time in the range (stops at the first non-empty partition)"""
+        filters = self.filters(start, end, zone, camera)
+        for partition in self.partitions(start, end):
+            times = self.read_partitions([partition], ['timestamp'], filters).column('timestamp')
+            if len(times):
+                return min(times.to_pylist())
+        return None
+
+    def latest_timestamps(self, n, start=None, end=None, zone=None, camera=None):
+        """Up to n most recent archived event times in the range, oldest first"""
+        filters = self.filters(start, end, zone, camera)
+        times = []
+        for partition in reversed(self.partitions(start, end)):
+            table = self.read_partitions([partition], ['timestamp'], filters)
+            times = sorted(table.column('timestamp').to_pylist()) + times
+            if len(times) >= n:
+                break
+        return times[-n:]
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    sys.path.append(str(Path(__file__).parent))
+    import config
+
+    parser = argparse.ArgumentParser(description='DontPiss event archive (Parquet)')
+    parser.add_argument('--db', default=config.EVENT_STORE['path'], help='Event database')
+    parser.add_argument('--archive', default=config.EVENT_ARCHIVE['path'], help='Archive directory')
+    parser.add_argument('--rotate', action='store_true', help='Archive events older than --keep-days')
+    parser.add_argument('--keep-days', type=int, default=config.EVENT_ARCHIVE['keep_days'],
+                       help='Days of events kept in the database')
+    parser.add_argument('--stats', action='store_true', help='Show archived partitions')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if not ARCHIVE_AVAILABLE:
+        logger.error("pyarrow not installed. Event archive unavailable.")
+        logger.info("Install with: pip install pyarrow")
+        sys.exit(1)
+
+    archive = EventArchive(args.archive, config.EVENT_ARCHIVE['row_group_size'])
+
+    if args.rotate:
+        connection = connect(args.db)
+        archived = archive.rotate(connection, args.keep_days)
+        connection.close()
+        print(f"✅ {archived} evento(s) arquivado(s) em {args.archive}")
+
+    if args.stats or not args.rotate:
+        partitions = archive.partitions()
+        print(f"\n📦 {args.archive}: {len(partitions)} partição(ões)")
+        for day, directory in partitions:
+            rows = sum(pq.ParquetFile(path).metadata.num_rows for path in directory.glob('*.parquet'))
+            print(f"   {day}: {rows} evento(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Event Store - SQLite (WAL) store for detection and zone events
+Replaces the append-only logs/detections.csv: indexed by time, zone and
+camera so analytics can query a range without reading every event
+
+Usage:
+    python src/event_store.py --import logs/detections.csv
+    python src/event_store.py --stats
+"""
+
+import csv
+import logging
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,  -- never reused: rollups track the last id
+    ts REAL NOT NULL,               -- unix time (seconds)
+    timestamp TEXT NOT NULL,        -- local ISO time, as in the old CSV
+    event_type TEXT NOT NULL,       -- zone_violation, leg_lift, squat, ...
+    camera TEXT,
+    zone TEXT,
+    confidence REAL,
+    frames_detected INTEGER,
+    track_id INTEGER,
+    snapshot_path TEXT,
+    source TEXT NOT NULL DEFAULT 'live'
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS idx_events_zone_ts ON events (zone, ts);
+CREATE INDEX IF NOT EXISTS idx_events_camera_ts ON events (camera, ts);
+
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    imported_at TEXT NOT NULL
+);
+"""
+
+COLUMNS = ('ts', 'timestamp', 'event_type', 'camera', 'zone', 'confidence',
+           'frames_detected', 'track_id', 'snapshot_path', 'source')
+
+
+def connect(db_path):
+    """Open a connection with WAL enabled (one connection per thread)"""
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(db_path), timeout=30)
+    connection.row_factory = sqlite3.Row
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')  # durable at checkpoints, no fsync per commit
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def make_event(detection_info, snapshot_path=None, event_time=None, source='live'):
+    """Event row from a notifier detection_info dictionary"""
+    event_time = event_time or datetime.now()
+    return {
+        'ts': event_time.timestamp(),
+        'timestamp': event_time.isoformat(),
+        'event_type': detection_info['detection_type'],
+        'camera': detection_info.get('camera'),
+        'zone': detection_info.get('zone_name'),
+        'confidence': detection_info.get('confidence'),
+        'frames_detected': detection_info.get('frames_detected'),
+        'track_id': detection_info.get('track_id'),
+        'snapshot_path': snapshot_path,
+        'source': source
+    }
+
+
+def insert_events(connection, events):
+    """Insert event dicts in one transaction"""
+    with connection:
+        connection.executemany(
+            f"INSERT INTO events ({', '.join(COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+            [tuple(event.get(column) for column in COLUMNS) for event in events]
+        )
+
+
+class EventWriter(threading.Thread):
+    """
+    Background writer: events are queued by the caller and committed in batches
+
+    A batch is written when batch_size events are waiting or
+    flush_interval_seconds after its first event, whichever comes first.
+    """
+
+    def __init__(self, db_path, batch_size=50, flush_interval_seconds=1.0):
+        super().__init__(name='event-writer', daemon=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.queue = queue.Queue()
+        self.written = 0
+        self.failed = 0
+
+    def record(self, event):
+        """Queue one event (never blocks)"""
+        self.queue.put(event)
+
+    def run(self):
+        connection = connect(self.db_path)
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            batch, flushed = [], []
+            deadline = time.time() + self.flush_interval_seconds
+            while True:
+                if isinstance(item, threading.Event):
+                    flushed.append(item)  # flush request: commit what we have now
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.time(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+
+            if batch:
+                try:
+                    insert_events(connection, batch)
+                    self.written += len(batch)
+                except sqlite3.Error as e:
+                    self.failed += len(batch)
+                    logger.error(f"Failed to store {len(batch)} event(s): {e}")
+            for event in flushed:
+                event.set()
+        connection.close()
+
+    def flush(self, timeout=10):
+        """Block until every event queued so far is committed"""
+        if not self.is_alive():
+            return False
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=10):
+        """Write everything still queued and stop"""
+        self.queue.put(None)
+        self.join(timeout)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(store_config):
+    """Shared writer per database (several detectors/notifiers in one process)"""
+    db_path = str(Path(store_config['path']).resolve())
+    with _writers_lock:
+        writer = _writers.get(db_path)
+        if writer is None or not writer.is_alive():
+            import_legacy_csv(store_config)
+            writer = EventWriter(db_path, store_config['batch_size'],
+                                 store_config['flush_interval_seconds'])
+            writer.start()
+            _writers[db_path] = writer
+    return writer
+
+
+def import_legacy_csv(store_config):
+    """Import the old detections.csv once, the first time the store is used"""
+    csv_path = store_config.get('import_csv')
+    if csv_path and Path(csv_path).exists():
+        connection = connect(store_config['path'])
+        try:
+            import_csv(connection, csv_path)
+        finally:
+            connection.close()
+
+
+def import_csv(connection, csv_path):
+    """
+    Import a detections.csv (timestamp, detection_type, confidence, snapshot_path)
+
+    Each file is imported once; a file that grew since is imported again from
+    the first row not yet stored. A file that shrank (rotated or truncated) is
+    skipped: its rows cannot be told apart from the ones already stored.
+
+    Returns:
+        Number of events imported
+    """
+    path = Path(csv_path)
+    key = str(path.resolve())
+    size = path.stat().st_size
+
+    previous = connection.execute('SELECT size, rows FROM imports WHERE path = ?', (key,)).fetchone()
+    if previous and previous['size'] == size:
+        return 0
+    if previous and previous['size'] > size:
+        logger.warning(f"{path} is smaller than when it was imported "
+                       f"({size} < {previous['size']} bytes), skipping it")
+        return 0
+    skip_rows = previous['rows'] if previous else 0
+
+    events = []
+    total_rows = 0
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            total_rows += 1
+            if total_rows <= skip_rows:
+                continue
+            try:
+                event_time = datetime.fromisoformat(row['timestamp'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            snapshot = row.get('snapshot_path')
+            events.append({
+                'ts': event_time.timestamp(),
+                'timestamp': event_time.isoformat(),
+                'event_type': row.get('detection_type') or 'unknown',
+                'confidence': float(row['confidence']) if row.get('confidence') else None,
+                'snapshot_path': None if snapshot in (None, '', 'N/A') else snapshot,
+                'source': 'csv'
+            })
+
+    insert_events(connection, events)
+    with connection:
+        connection.execute(
+            'INSERT OR REPLACE INTO imports (path, size, rows, imported_at) VALUES (?, ?, ?, ?)',
+            (key, size, total_rows, datetime.now().isoformat())
+        )
+    logger.info(f"Imported {len(events)} event(s) from {path}")
+    return len(events)
+
+
+class EventStore:
+    """Read side: range queries over the indexed event table"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = connect(db_path)
+
+    @staticmethod
+    def where(start=None, end=None, zone=None, camera=None, event_type=None):
+        """SQL WHERE clause and parameters for the common filters"""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append('ts >= ?')
+            params.append(start.timestamp() if isinstance(start, datetime) else start)
+        if end is not None:
+            clauses.append('ts < ?')
+            params.append(end.timestamp() if isinstance(end, datetime) else end)
+        for column, value in (('zone', zone), ('camera', camera), ('event_type', event_type)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def query(self, start=None, end=None, zone=None, camera=None, event_type=None, limit=None,
+              columns=None):
+        """Events in [start, end) matching the filters, oldest first (list of dicts)"""
+        where, params = self.where(start, end, zone, camera, event_type)
+        selected = ', '.join(columns) if columns else '*'
+        sql = f'SELECT {selected} FROM events{where} ORDER BY ts'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def count(self, start=None, end=None, zone=None, camera=None, event_type=None):
+        where, params = self.where(start, end, zone, camera, event_type)
+        return self.connection.execute(f'SELECT COUNT(*) FROM events{where}', params).fetchone()[0]
+
+    def latest(self, n, start=None, end=None, zone=None, camera=None, event_type=None):
+        """The n most recent events matching the filters, oldest first"""
+        where, params = self.where(start, end, zone, camera, event_type)
+        rows = self.connection.execute(
+            f'SELECT * FROM events{where} ORDER BY ts DESC LIMIT {int(n)}', params)
+        return [dict(row) for row in rows][::-1]
+
+    def time_range(self, start=None, end=None):
+        """(first ts, last ts) of the events in [start, end), or (None, None)"""
+        where, params = self.where(start, end)
+        row = self.connection.execute(f'SELECT MIN(ts), MAX(ts) FROM events{where}', params).fetchone()
+        return row[0], row[1]
+
+    def close(self):
+        self.connection.close()
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    sys.path.append(str(Path(__file__).parent))
+    import config
+
+    parser = argparse.ArgumentParser(description='DontPiss event store (SQLite)')
+    parser.add_argument('--db', default=config.EVENT_STORE['path'], help='Database file')
+    parser.add_argument('--import', dest='import_files', nargs='+', metavar='CSV',
+                       help='Import detections.csv file(s)')
+    parser.add_argument('--stats', action='store_true', help='Show event counts')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    connection = connect(args.db)
+    for csv_path in args.import_files or []:
+        imported = import_csv(connection, csv_path)
+        print(f"✅ {imported} evento(s) importado(s) de {csv_path}")
+    connection.close()
+
+    if args.stats or not args.import_files:
+        store = EventStore(args.db)
+        first, last = store.time_range()
+        print(f"\n📦 {args.db}: {store.count()} evento(s)")
+        if first is not None:
+            print(f"   De {datetime.fromtimestamp(first):%d/%m/%Y %H:%M} "
+                  f"até {datetime.fromtimestamp(last):%d/%m/%Y %H:%M}")
+        for row in store.connection.execute(
+                'SELECT event_type, COUNT(*) AS n FROM events GROUP BY event_type ORDER BY n DESC'):
+            print(f"   {row['event_type']}: {row['n']}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
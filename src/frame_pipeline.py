@@ -0,0 +1,169 @@
+"""
+Frame pipeline - Decoupled capture and inference stages
+Keeps detection locked to the live scene when inference is slower than the camera
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class DroppingQueue:
+    """
+    Bounded queue that discards the oldest item instead of blocking the producer
+
+    Items for which keep(item) is true are never discarded; while only such
+    items are pending the queue grows past maxsize rather than lose one.
+    """
+
+    def __init__(self, name, maxsize=1, keep=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.keep = keep
+        self.items = deque()
+        self.condition = threading.Condition()
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        """Add item, evicting the oldest droppable pending one if the queue is full"""
+        with self.condition:
+            if len(self.items) >= self.maxsize:
+                for index, pending in enumerate(self.items):
+                    if self.keep is None or not self.keep(pending):
+                        del self.items[index]
+                        self.dropped += 1
+                        break
+            self.items.append(item)
+            self.put_count += 1
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        """Get next item (raises queue.Empty on timeout)"""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.items, timeout):
+                raise queue.Empty
+            return self.items.popleft()
+
+    def qsize(self):
+        with self.condition:
+            return len(self.items)
+
+
+class CaptureThread(threading.Thread):
+    """Reads frames as fast as the camera delivers them, keeping only the newest"""
+
+    def __init__(self, cap, output_queue, stop_event, on_read=None):
+        super().__init__(name='capture', daemon=True)
+        self.cap = cap
+        self.output_queue = output_queue
+        self.stop_event = stop_event
+        self.on_read = on_read  # on_read(seconds) after each successful read
+        self.frames_read = 0
+        self.failed = False
+
+    def run(self):
+        while not self.stop_event.is_set():
+            read_start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                logger.warning("Failed to read frame")
+                self.failed = True
+                break
+
+            if self.on_read:
+                self.on_read(time.perf_counter() - read_start)
+            self.frames_read += 1
+            self.output_queue.put((frame, time.time()))
+
+
+class InferenceWorker(threading.Thread):
+    """Runs the detection function on the newest captured frame"""
+
+    def __init__(self, process_fn, input_queue, output_queue, stop_event):
+        super().__init__(name='inference', daemon=True)
+        self.process_fn = process_fn
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.stop_event = stop_event
+        self.frames_processed = 0
+        self.error = None
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                frame, capture_time = self.input_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            try:
+                result = self.process_fn(frame, capture_time)
+            except Exception as e:
+                logger.error(f"Error in inference worker: {e}", exc_info=True)
+                self.error = e
+                break
+
+            self.frames_processed += 1
+            self.output_queue.put(result)
+
+
+class FramePipeline:
+    """
+    Three-stage pipeline: capture thread -> inference worker -> caller (render/notify)
+
+    Each handoff is a bounded queue that drops the oldest entry when full, so a
+    slow stage never makes an upstream stage fall behind the live scene.
+    Results for which keep_result(result) is true (e.g. alerts) are never dropped.
+    """
+
+    def __init__(self, cap, process_fn, capture_queue_size=1, result_queue_size=2,
+                 keep_result=None, on_read=None):
+        self.stop_event = threading.Event()
+        self.capture_queue = DroppingQueue('capture', capture_queue_size)
+        self.result_queue = DroppingQueue('result', result_queue_size, keep=keep_result)
+
+        self.capture_thread = CaptureThread(cap, self.capture_queue, self.stop_event, on_read)
+        self.inference_worker = InferenceWorker(
+            process_fn, self.capture_queue, self.result_queue, self.stop_event
+        )
+        self.results_consumed = 0
+
+    def start(self):
+        self.capture_thread.start()
+        self.inference_worker.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.capture_thread.join(timeout=2)
+        self.inference_worker.join(timeout=5)
+
+    @property
+    def running(self):
+        """True while both worker stages are alive (or the result queue still has data)"""
+        if self.result_queue.qsize() > 0:
+            return True
+        return self.capture_thread.is_alive() and self.inference_worker.is_alive()
+
+    def get_result(self, timeout=0.1):
+        """Get the next inference result, or None if nothing arrived in time"""
+        try:
+            result = self.result_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+        self.results_consumed += 1
+        return result
+
+    def stats(self):
+        """Per-stage frame and drop counters"""
+        return {
+            'frames_captured': self.capture_thread.frames_read,
+            'capture_dropped': self.capture_queue.dropped,
+            'frames_inferred': self.inference_worker.frames_processed,
+            'result_dropped': self.result_queue.dropped,
+            'frames_rendered': self.results_consumed,
+        }
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Inference Engine - Pluggable backends for the YOLO models
+Runs the same ultralytics model on PyTorch, ONNX Runtime or OpenVINO (CPU)
+
+Exported models are cached next to the .pt weights and re-exported when the
+weights change. All backends return the same ultralytics Results objects, so
+boxes and keypoints reach the rest of the pipeline unchanged.
+
+Parity check against PyTorch:
+    python src/inference_engine.py --weights yolov8n.pt --engine onnx --source video.mp4
+"""
+
+import logging
+import sys
+import numpy as np
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ('torch', 'onnx', 'openvino')
+
+
+def exported_model_path(weights, engine, int8=False):
+    """Where the exported model for an engine lives"""
+    weights_path = Path(weights)
+    suffix = '_int8' if int8 else ''
+    if engine == 'onnx':
+        return weights_path.with_name(f"{weights_path.stem}{suffix}.onnx")
+    if engine == 'openvino':
+        return weights_path.parent / f"{weights_path.stem}{suffix}_openvino_model"
+    return weights_path
+
+
+def load_model(weights, engine='torch', task=None, imgsz=640, int8=False):
+    """
+    Load a YOLO model on the requested backend, exporting it on first use
+
+    Args:
+        weights: PyTorch weights (e.g. 'yolov8n.pt'), downloaded if missing
+        engine: 'torch', 'onnx' or 'openvino'
+        task: Model task ('detect', 'pose'), needed for exported models
+        imgsz: Export input size
+        int8: Load the INT8 model produced by quantize.py
+    Returns:
+        ultralytics YOLO model
+    """
+    from ultralytics import YOLO
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', choose from {ENGINES}")
+
+    if int8:
+        if engine == 'torch':
+            raise ValueError("INT8 models need --engine onnx or --engine openvino")
+        quantized = exported_model_path(weights, engine, int8=True)
+        if not quantized.exists():
+            raise FileNotFoundError(
+                f"INT8 model not found: {quantized}. "
+                f"Run: python src/quantize.py --engine {engine}"
+            )
+        logger.info(f"Loading INT8 {engine} model: {quantized}")
+        return YOLO(str(quantized), task=task)
+
+    if engine == 'torch':
+        return YOLO(weights)
+
+    exported = exported_model_path(weights, engine)
+    weights_path = Path(weights)
+
+    stale = (exported.exists() and weights_path.exists()
+             and exported.stat().st_mtime < weights_path.stat().st_mtime)
+
+    if not exported.exists() or stale:
+        logger.info(f"Exporting {weights} to {engine} (first use, this takes a while)...")
+        # Dynamic shapes allow batched multi-camera input and ROI crops
+        exported = Path(YOLO(weights).export(format=engine, imgsz=imgsz, dynamic=True))
+        logger.info(f"Exported model cached at: {exported}")
+
+    logger.info(f"Loading {engine} model: {exported}")
+    return YOLO(str(exported), task=task)
+
+
+def box_iou(box_a, boxes_b):
+    """IoU between one xyxy box and an (N, 4) array of boxes"""
+    x1 = np.maximum(box_a[0], boxes_b[:, 0])
+    y1 = np.maximum(box_a[1], boxes_b[:, 1])
+    x2 = np.minimum(box_a[2], boxes_b[:, 2])
+    y2 = np.minimum(box_a[3], boxes_b[:, 3])
+
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    return intersection / (area_a + area_b - intersection + 1e-6)
+
+
+def compare_results(reference, candidate, iou_threshold):
+    """
+    Match candidate detections to reference detections of the same class
+
+    Returns:
+        Dictionary with match counts, worst confidence gap and keypoint error
+    """
+    ref_boxes = reference.boxes.xyxy.cpu().numpy()
+    ref_conf = reference.boxes.conf.cpu().numpy()
+    ref_cls = reference.boxes.cls.cpu().numpy()
+    cand_boxes = candidate.boxes.xyxy.cpu().numpy()
+    cand_conf = candidate.boxes.conf.cpu().numpy()
+    cand_cls = candidate.boxes.cls.cpu().numpy()
+
+    ref_kpts = cand_kpts = None
+    if getattr(reference, 'keypoints', None) is not None and getattr(candidate, 'keypoints', None) is not None:
+        ref_kpts = reference.keypoints.xy.cpu().numpy()
+        cand_kpts = candidate.keypoints.xy.cpu().numpy()
+
+    used = np.zeros(len(cand_boxes), dtype=bool)
+    matched = 0
+    max_conf_diff = 0.0
+    keypoint_errors = []
+
+    for i in np.argsort(-ref_conf):
+        if len(cand_boxes) == 0:
+            break
+        ious = box_iou(ref_boxes[i], cand_boxes)
+        ious[(cand_cls != ref_cls[i]) | used] = 0
+        j = int(np.argmax(ious))
+        if ious[j] < iou_threshold:
+            continue
+
+        used[j] = True
+        matched += 1
+        max_conf_diff = max(max_conf_diff, abs(float(ref_conf[i] - cand_conf[j])))
+        if ref_kpts is not None:
+            keypoint_errors.append(float(np.abs(ref_kpts[i] - cand_kpts[j]).mean()))
+
+    return {
+        'reference': len(ref_boxes),
+        'candidate': len(cand_boxes),
+        'matched': matched,
+        'max_conf_diff': max_conf_diff,
+        'keypoint_errors': keypoint_errors
+    }
+
+
+def check_parity(weights, engine, frames, task=None, conf=0.4, iou_threshold=0.9,
+                 conf_tolerance=0.05, keypoint_tolerance_px=3.0):
+    """
+    Compare an exported engine against the PyTorch model on sample frames
+
+    Returns:
+        Parity report dictionary ('passed' is True when every reference detection
+        is matched within the tolerances)
+    """
+    reference_model = load_model(weights, 'torch')
+    candidate_model = load_model(weights, engine, task=task)
+
+    totals = {'frames': 0, 'reference': 0, 'candidate': 0, 'matched': 0}
+    max_conf_diff = 0.0
+    keypoint_errors = []
+
+    for frame in frames:
+        reference = reference_model(frame, conf=conf, verbose=False)[0]
+        candidate = candidate_model(frame, conf=conf, verbose=False)[0]
+        comparison = compare_results(reference, candidate, iou_threshold)
+
+        totals['frames'] += 1
+        for key in ('reference', 'candidate', 'matched'):
+            totals[key] += comparison[key]
+        max_conf_diff = max(max_conf_diff, comparison['max_conf_diff'])
+        keypoint_errors.extend(comparison['keypoint_errors'])
+
+    mean_keypoint_error = float(np.mean(keypoint_errors)) if keypoint_errors else 0.0
+    passed = (totals['matched'] == totals['reference'] == totals['candidate']
+              and max_conf_diff <= conf_tolerance
+              and mean_keypoint_error <= keypoint_tolerance_px)
+
+    return {
+        'engine': engine,
+        **totals,
+        'max_conf_diff': max_conf_diff,
+        'mean_keypoint_error_px': mean_keypoint_error,
+        'passed': passed
+    }
+
+
+def read_frames(source, count, stride=1):
+    """Read up to `count` frames from a camera index or video file"""
+    import cv2
+
+    cap = cv2.VideoCapture(source)
+    frames = []
+    index = 0
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if index % stride == 0:
+            frames.append(frame)
+        index += 1
+    cap.release()
+    return frames
+
+
+def main():
+    """Parity check entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Check exported engine outputs against PyTorch')
+    parser.add_argument('--weights', default='yolov8n.pt', help='PyTorch weights')
+    parser.add_argument('--engine', choices=['onnx', 'openvino'], required=True)
+    parser.add_argument('--task', choices=['detect', 'pose'], default=None)
+    parser.add_argument('--source', default='0', help='Camera index or video file')
+    parser.add_argument('--frames', type=int, default=50, help='Number of frames to compare')
+    parser.add_argument('--stride', type=int, default=10, help='Use every Nth frame')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    frames = read_frames(source, args.frames, args.stride)
+    if not frames:
+        print(f"❌ Could not read frames from: {args.source}")
+        sys.exit(1)
+
+    report = check_parity(args.weights, args.engine, frames, task=args.task)
+
+    print("\n" + "=" * 50)
+    print(f"Parity check: torch vs {report['engine']}")
+    print("=" * 50)
+    print(f"Frames: {report['frames']}")
+    print(f"Detections: torch={report['reference']}, {report['engine']}={report['candidate']}, "
+          f"matched={report['matched']}")
+    print(f"Max confidence diff: {report['max_conf_diff']:.4f}")
+    print(f"Mean keypoint error: {report['mean_keypoint_error_px']:.2f}px")
+    print(f"Result: {'✅ PASS' if report['passed'] else '❌ FAIL'}")
+
+    sys.exit(0 if report['passed'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Inference Scheduler - Adapts the model call rate to dog presence
+IDLE (no dog) -> DOG_VISIBLE (dog in view) -> NEAR_ZONE (dog close to a zone)
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+IDLE = 'IDLE'
+DOG_VISIBLE = 'DOG_VISIBLE'
+NEAR_ZONE = 'NEAR_ZONE'
+
+STATE_LEVELS = {IDLE: 0, DOG_VISIBLE: 1, NEAR_ZONE: 2}
+
+
+class InferenceScheduler:
+    """
+    Decides which frames get a model call
+
+    Escalation is immediate on the first detection that justifies it;
+    de-escalation waits until the condition has been absent for the state's
+    hold time (hysteresis), so a dog briefly missed by the model does not
+    drop the rate back to IDLE.
+    """
+
+    def __init__(self, scheduler_config):
+        self.scheduler_config = scheduler_config
+        self.state = IDLE
+        self.last_inference_time = None
+        self.last_dog_time = None
+        self.last_near_time = None
+        self.transitions = 0
+
+    def interval(self):
+        """Minimum seconds between model calls in the current state (0 = every frame)"""
+        rate = self.scheduler_config['rates'][self.state]
+        return 1.0 / rate if rate > 0 else 0.0
+
+    def should_infer(self, current_time):
+        """Whether a model call is due for this frame"""
+        if self.last_inference_time is None:
+            return True
+        return current_time - self.last_inference_time >= self.interval()
+
+    def target_state(self, current_time):
+        """State justified by recent detections, honouring the hold times"""
+        hold = self.scheduler_config['hold_seconds']
+
+        if (self.last_near_time is not None
+                and current_time - self.last_near_time < hold[NEAR_ZONE]):
+            return NEAR_ZONE
+        if (self.last_dog_time is not None
+                and current_time - self.last_dog_time < hold[DOG_VISIBLE]):
+            return DOG_VISIBLE
+        return IDLE
+
+    def update(self, dog_boxes, zone_index, current_time):
+        """
+        Record a fresh model call and move between states
+
+        Args:
+            dog_boxes: Dog boxes returned by the model
+            zone_index: ZoneMaskIndex built for the current frame
+            current_time: Frame timestamp (seconds)
+        """
+        self.last_inference_time = current_time
+
+        if len(dog_boxes) > 0:
+            self.last_dog_time = current_time
+            distance = self.scheduler_config['near_zone_distance_px']
+            if any(zone_index.near_any_zone(box, distance) for box in dog_boxes):
+                self.last_near_time = current_time
+
+        new_state = self.target_state(current_time)
+        if new_state != self.state:
+            direction = 'up' if STATE_LEVELS[new_state] > STATE_LEVELS[self.state] else 'down'
+            logger.info(f"Inference rate {direction}: {self.state} -> {new_state}")
+            self.state = new_state
+            self.transitions += 1
@@ -0,0 +1,283 @@
+"""
+Metrics - Prometheus text-format endpoint for the detectors
+Per-frame updates are plain attribute increments; anything that can be read
+on demand (queue depths, dwell counters, RSS) is collected only when scraped
+"""
+
+import bisect
+import logging
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)  # seconds
+STAGES = ('capture', 'motion_gate', 'render', 'notify')  # frame loop stages timed per camera
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values, extra=None):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def set_function(self, function):
+        """Read the value from function() at scrape time instead of per frame"""
+        self.function = function
+
+    def get(self):
+        return self.function() if self.function else self.value
+
+
+class HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricFamily:
+    """A named metric with one child per label combination"""
+
+    child_types = {'counter': CounterChild, 'gauge': GaugeChild}
+
+    def __init__(self, name, help_text, metric_type, labelnames=(), buckets=None):
+        self.name = name
+        self.help_text = help_text
+        self.metric_type = metric_type
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets or LATENCY_BUCKETS)
+        self.children = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def labels(self, *values):
+        """Child for these label values (keep the handle; lookups are not free)"""
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.get(key)
+                if child is None:
+                    if self.metric_type == 'histogram':
+                        child = HistogramChild(self.buckets)
+                    else:
+                        child = self.child_types[self.metric_type]()
+                    self.children[key] = child
+        return child
+
+    def add_collector(self, function):
+        """function() -> iterable of (label_values, value), evaluated at scrape time"""
+        self.collectors.append(function)
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}",
+                 f"# TYPE {self.name} {self.metric_type}"]
+
+        for key, child in list(self.children.items()):
+            if self.metric_type == 'histogram':
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), child.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    labels = format_labels(self.labelnames, key, 'le="' + le + '"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {child.sum}")
+                lines.append(f"{self.name}_count{labels} {child.count}")
+            else:
+                value = child.get() if self.metric_type == 'gauge' else child.value
+                lines.append(f"{self.name}{format_labels(self.labelnames, key)} {value}")
+
+        for collector in self.collectors:
+            try:
+                for key, value in collector():
+                    lines.append(f"{self.name}{format_labels(self.labelnames, key)} {value}")
+            except Exception as e:
+                logger.debug(f"Metric collector for {self.name} failed: {e}")
+
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.families = {}
+
+    def register(self, name, help_text, metric_type, labelnames=(), buckets=None):
+        family = self.families.get(name)
+        if family is None:
+            family = MetricFamily(name, help_text, metric_type, labelnames, buckets)
+            self.families[name] = family
+        return family
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(name, help_text, 'counter', labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self.register(name, help_text, 'gauge', labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=None):
+        return self.register(name, help_text, 'histogram', labelnames, buckets)
+
+    def expose(self):
+        """Whole registry in Prometheus text exposition format"""
+        lines = []
+        for family in list(self.families.values()):
+            lines.extend(family.expose())
+        return '\n'.join(lines) + '\n'
+
+
+def resident_memory_bytes():
+    """Current RSS of this process"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # peak, not current
+    except ImportError:
+        return 0
+
+
+REGISTRY = MetricsRegistry()
+
+FRAMES = REGISTRY.counter('dontpiss_frames_total', 'Frames processed', ['camera'])
+FPS = REGISTRY.gauge('dontpiss_fps', 'Processed frames per second', ['camera'])
+INFERENCES = REGISTRY.counter('dontpiss_inferences_total', 'Model calls', ['camera'])
+INFERENCE_SECONDS = REGISTRY.histogram('dontpiss_inference_seconds',
+                                       'Model call latency', ['camera'])
+STAGE_SECONDS = REGISTRY.histogram('dontpiss_stage_seconds',
+                                   'Frame loop stage latency',
+                                   ['camera', 'stage'])
+DROPPED_FRAMES = REGISTRY.counter('dontpiss_dropped_frames_total',
+                                  'Frames dropped by a queue before processing',
+                                  ['camera', 'stage'])
+FRAMES_IN_ZONE = REGISTRY.gauge('dontpiss_frames_in_zone',
+                                'Consecutive frames with the dog in a zone', ['camera'])
+ALERTS = REGISTRY.counter('dontpiss_alerts_total', 'Alerts fired', ['camera', 'zone'])
+PEE_DETECTIONS = REGISTRY.counter('dontpiss_pee_detections_total',
+                                  'Urination detections', ['camera', 'type'])
+NOTIFIER_QUEUE_DEPTH = REGISTRY.gauge('dontpiss_notifier_queue_depth',
+                                      'Notification jobs waiting', ['camera', 'channel'])
+NOTIFIER_DROPPED = REGISTRY.counter('dontpiss_notifier_dropped_total',
+                                    'Notification jobs dropped (channel full)',
+                                    ['camera', 'channel'])
+RSS = REGISTRY.gauge('process_resident_memory_bytes', 'Resident memory size in bytes')
+RSS.labels().set_function(resident_memory_bytes)
+
+
+class DetectorMetrics:
+    """Per-camera metric handles, resolved once so per-frame updates are attribute increments"""
+
+    def __init__(self, camera):
+        self.camera = camera
+        self.frames = FRAMES.labels(camera)
+        self.fps = FPS.labels(camera)
+        self.inferences = INFERENCES.labels(camera)
+        self.inference_seconds = INFERENCE_SECONDS.labels(camera)
+        self.frames_in_zone = FRAMES_IN_ZONE.labels(camera)
+        self.stage_seconds = {stage: STAGE_SECONDS.labels(camera, stage) for stage in STAGES}
+
+    def record_inference(self, seconds):
+        self.inferences.inc()
+        self.inference_seconds.observe(seconds)
+
+    def record_stage(self, stage, seconds):
+        self.stage_seconds[stage].observe(seconds)
+
+    def alert(self, zone):
+        ALERTS.labels(self.camera, zone).inc()
+
+    def pee_detection(self, detection_type):
+        PEE_DETECTIONS.labels(self.camera, detection_type).inc()
+
+    def watch_drops(self, function):
+        """function() -> {stage: dropped frames}, read at scrape time"""
+        DROPPED_FRAMES.add_collector(
+            lambda: [((self.camera, stage), count) for stage, count in function().items()])
+
+    def watch_notifier(self, notifier):
+        watch_notifier(self.camera, notifier)
+
+
+def watch_notifier(camera, notifier):
+    """Export a Notifier's per-channel queue depth and drops at scrape time"""
+    def channel_stats():
+        if notifier.dispatcher is None:
+            return {}
+        return notifier.dispatcher.stats()
+
+    NOTIFIER_QUEUE_DEPTH.add_collector(
+        lambda: [((camera, name), stats['pending']) for name, stats in channel_stats().items()])
+    NOTIFIER_DROPPED.add_collector(
+        lambda: [((camera, name), stats['dropped']) for name, stats in channel_stats().items()])
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+
+        body = REGISTRY.expose().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes would flood the detector log
+
+
+_server = None
+
+
+def start_server(host, port):
+    """Serve /metrics on a background thread (once per process)"""
+    global _server
+    if _server is not None:
+        return _server
+
+    try:
+        _server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        logger.error(f"Could not start metrics endpoint on {host}:{port}: {e}")
+        return None
+
+    threading.Thread(target=_server.serve_forever, name='metrics', daemon=True).start()
+    logger.info(f"Metrics endpoint: http://{host}:{port}/metrics")
+    return _server
@@ -0,0 +1,141 @@
+"""
+Motion Gate - Skips model inference while the watched zones are static
+Cheap downscaled background model computed only inside the zones plus a margin
+"""
+
+import cv2
+import numpy as np
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MotionGate:
+    """Decides per frame whether the detection model needs to run"""
+
+    def __init__(self, zones, gate_config):
+        self.zones = zones
+        self.gate_config = gate_config
+        self.scale = gate_config['downscale']
+
+        # Background model (built lazily from the first frame)
+        self.background = None
+        self.roi_mask = None
+        self.roi_pixels = 0
+        self.frame_shape = None
+        self.last_inference_time = 0
+
+        # Statistics
+        self.frames_gated = 0
+        self.frames_inferred = 0
+        self.gate_seconds = 0.0
+        self.inference_seconds = 0.0
+        self.last_log_time = time.time()
+
+    def build_roi_mask(self, frame_shape):
+        """Rasterize zone polygons (dilated by the margin) at gate resolution"""
+        height, width = frame_shape[:2]
+        small_w = max(1, int(width * self.scale))
+        small_h = max(1, int(height * self.scale))
+
+        mask = np.zeros((small_h, small_w), dtype=np.uint8)
+        for zone in self.zones:
+            points = np.array(zone['points'], dtype=np.float32) * self.scale
+            cv2.fillPoly(mask, [points.astype(np.int32)], 255)
+
+        margin = int(self.gate_config['zone_margin_px'] * self.scale)
+        if margin > 0:
+            kernel = np.ones((2 * margin + 1, 2 * margin + 1), dtype=np.uint8)
+            mask = cv2.dilate(mask, kernel)
+
+        # No zones: watch the whole frame
+        if not mask.any():
+            mask[:] = 255
+
+        self.roi_mask = mask
+        self.roi_pixels = int(np.count_nonzero(mask))
+        self.frame_shape = frame_shape[:2]
+        self.background = None
+
+    def preprocess(self, frame):
+        """Downscale, grayscale and blur a frame for differencing"""
+        small = cv2.resize(frame, (self.roi_mask.shape[1], self.roi_mask.shape[0]),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def should_infer(self, frame, current_time):
+        """
+        Check whether the frame differs enough from the background to need inference
+
+        Args:
+            frame: Current BGR frame
+            current_time: Frame timestamp (seconds)
+        Returns:
+            True if the model should run on this frame
+        """
+        start = time.perf_counter()
+
+        if self.roi_mask is None or self.frame_shape != frame.shape[:2]:
+            self.build_roi_mask(frame.shape)
+
+        gray = self.preprocess(frame)
+
+        if self.background is None:
+            self.background = gray.astype(np.float32)
+            motion = True
+        else:
+            diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+            changed = (diff > self.gate_config['pixel_threshold']) & (self.roi_mask > 0)
+            changed_fraction = np.count_nonzero(changed) / max(self.roi_pixels, 1)
+            motion = changed_fraction >= self.gate_config['min_changed_fraction']
+            cv2.accumulateWeighted(gray, self.background, self.gate_config['background_alpha'])
+
+        keepalive_due = (current_time - self.last_inference_time
+                         >= self.gate_config['keepalive_seconds'])
+        run_model = motion or keepalive_due
+
+        self.gate_seconds += time.perf_counter() - start
+
+        if run_model:
+            self.last_inference_time = current_time
+        else:
+            self.frames_gated += 1
+
+        self.maybe_log_stats()
+        return run_model
+
+    def record_inference(self, seconds):
+        """Record the duration of a model call that the gate let through"""
+        self.frames_inferred += 1
+        self.inference_seconds += seconds
+
+    def get_stats(self):
+        """Gate ratio and estimated CPU time saved"""
+        total = self.frames_gated + self.frames_inferred
+        avg_inference = self.inference_seconds / self.frames_inferred if self.frames_inferred else 0.0
+        return {
+            'frames_gated': self.frames_gated,
+            'frames_inferred': self.frames_inferred,
+            'gated_ratio': self.frames_gated / total if total else 0.0,
+            'avg_inference_ms': avg_inference * 1000,
+            'gate_overhead_ms': (self.gate_seconds / total * 1000) if total else 0.0,
+            'seconds_saved': max(self.frames_gated * avg_inference - self.gate_seconds, 0.0)
+        }
+
+    def maybe_log_stats(self):
+        """Periodically log the gated/ungated ratio and CPU saved"""
+        now = time.time()
+        if now - self.last_log_time < self.gate_config['log_interval_seconds']:
+            return
+
+        self.last_log_time = now
+        stats = self.get_stats()
+        logger.info(
+            f"Motion gate: {stats['frames_gated']} gated / {stats['frames_inferred']} inferred "
+            f"({stats['gated_ratio']:.1%} skipped), "
+            f"avg inference {stats['avg_inference_ms']:.1f}ms, "
+            f"gate overhead {stats['gate_overhead_ms']:.2f}ms/frame, "
+            f"~{stats['seconds_saved']:.1f}s CPU saved"
+        )
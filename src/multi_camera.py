@@ -0,0 +1,303 @@
+"""
+Multi-Camera Detector - Several cameras in one process with a single shared model
+Collects the latest frame from every stream and runs them through YOLO as one batch
+
+Cameras file format (e.g. cameras.json):
+    {
+      "cameras": [
+        {"name": "sala", "source": 0, "zone_config": "zone_config_sala.json"},
+        {"name": "quarto", "source": "rtsp://...", "zone_config": "zone_config_quarto.json"}
+      ]
+    }
+"""
+
+import json
+import logging
+import queue
+import signal
+import threading
+import time
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent))
+
+import config
+from frame_pipeline import DroppingQueue, CaptureThread
+from profiling import LoopProfiler
+from postprocess import DOG_CLASS
+from zone_detector import ZoneDetector
+
+
+class CameraStream:
+    """Per-camera capture thread, latest-frame slot and FPS counter"""
+
+    def __init__(self, detector, stop_event):
+        self.detector = detector
+        self.frame_queue = DroppingQueue(detector.name, maxsize=1)
+        self.capture_thread = CaptureThread(
+            detector.cap, self.frame_queue, stop_event,
+            on_read=lambda seconds: detector.metrics.record_stage('capture', seconds))
+        self.frame_count = 0
+        self.fps_start_time = time.time()
+        self.fps = 0
+
+    def latest_frame(self):
+        """Newest unprocessed frame and its capture time, or None"""
+        try:
+            return self.frame_queue.get(timeout=0)
+        except queue.Empty:
+            return None
+
+    def tick(self, current_time):
+        """Update the processed-frames FPS counter"""
+        self.frame_count += 1
+        if self.frame_count % 30 == 0:
+            self.fps = 30 / (current_time - self.fps_start_time)
+            self.fps_start_time = current_time
+
+
+class MultiCameraDetector:
+    """Runs one ZoneDetector per camera on top of a single batched model"""
+
+    def __init__(self, cameras_file, training_mode='standard', enable_trainer=True,
+                 roi_inference=None, headless=False, engine=None, int8=None,
+                 metrics_port=None, profile_frames=None, motion_gating=None,
+                 adaptive_rate=None):
+        self.headless = headless
+        self.stop_requested = False
+        self.stop_event = threading.Event()
+        self.streams = []
+
+        cameras = self.load_cameras(cameras_file)
+        self.logger = logging.getLogger(__name__)
+
+        # One model shared by every camera
+        self.model = None
+        self.detectors = []
+        for camera in cameras:
+            detector = ZoneDetector(
+                training_mode=training_mode,
+                enable_trainer=enable_trainer,
+                pipelined=False,
+                roi_inference=roi_inference,
+                headless=headless,
+                zone_config_file=camera['zone_config'],
+                camera_source=camera.get('source'),
+                model=self.model,
+                name=camera['name'],
+                engine=engine,
+                int8=int8,
+                metrics_port=metrics_port,
+                motion_gating=motion_gating,
+                adaptive_rate=adaptive_rate
+            )
+            # The first detector's background load (a Future) is shared as is
+            self.model = detector.model_loader or detector.model
+            self.detectors.append(detector)
+
+        self.logger.info(f"Multi-camera detector ready: {len(self.detectors)} camera(s), 1 model")
+
+        # Profiling (--profile N): one profile over the shared loop
+        self.profiler = None
+        if profile_frames:
+            self.profiler = LoopProfiler(profile_frames, 'multi_camera', config.PROFILING)
+
+        # Batch statistics
+        self.batches_run = 0
+        self.frames_batched = 0
+        self.inference_seconds = 0.0
+
+    def load_cameras(self, cameras_file):
+        """Load the camera list"""
+        cameras_path = Path(cameras_file)
+        if not cameras_path.exists():
+            print(f"\n❌ Arquivo de câmeras não encontrado: {cameras_path.absolute()}")
+            sys.exit(1)
+
+        with open(cameras_path, 'r', encoding='utf-8') as f:
+            cameras = json.load(f).get('cameras', [])
+
+        if not cameras:
+            print(f"\n❌ Nenhuma câmera configurada em: {cameras_path}")
+            sys.exit(1)
+
+        names = [camera['name'] for camera in cameras]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Camera names must be unique: {names}")
+
+        return cameras
+
+    def install_signal_handlers(self):
+        """SIGTERM/SIGINT stop every camera, SIGUSR1 snapshots every camera"""
+        def request_stop(signum, frame):
+            self.logger.info(f"Received signal {signum}, stopping...")
+            self.stop_requested = True
+            for detector in self.detectors:
+                detector.stop_requested = True
+
+        def request_snapshot(signum, frame):
+            for detector in self.detectors:
+                detector.snapshot_requested = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        if self.headless:
+            signal.signal(signal.SIGINT, request_stop)
+        if hasattr(signal, 'SIGUSR1'):  # Not available on Windows
+            signal.signal(signal.SIGUSR1, request_snapshot)
+
+    def run_batch(self, pending):
+        """
+        Run the model once over every frame that needs inference
+
+        Args:
+            pending: List of (detector, frame, capture_time) tuples
+        Returns:
+            Dict mapping detector name to its dog boxes
+        """
+        # Cameras with different model kwargs (e.g. ROI imgsz) go in separate batches
+        groups = {}
+        for detector, frame, capture_time in pending:
+            model_input, offset, model_kwargs = detector.prepare_model_input(frame)
+            key = tuple(sorted(model_kwargs.items()))
+            groups.setdefault(key, []).append((detector, frame, capture_time, model_input, offset))
+
+        detections = {}
+        for key, members in groups.items():
+            inference_start = time.perf_counter()
+            results = self.model([member[3] for member in members],
+                                 conf=0.4, classes=[DOG_CLASS], verbose=False, **dict(key))
+            elapsed = time.perf_counter() - inference_start
+
+            self.batches_run += 1
+            self.frames_batched += len(members)
+            self.inference_seconds += elapsed
+
+            for (detector, frame, capture_time, _, offset), result in zip(members, results):
+                dog_boxes = detector.extract_dog_boxes(result, offset)
+                detector.record_detections(frame, dog_boxes, elapsed / len(members), capture_time)
+                detections[detector.name] = dog_boxes
+
+        return detections
+
+    def log_stats(self):
+        """Log batch size, inference cost and per-camera drops"""
+        if self.batches_run == 0:
+            return
+
+        avg_batch = self.frames_batched / self.batches_run
+        avg_ms = self.inference_seconds / self.batches_run * 1000
+        drops = ", ".join(
+            f"{stream.detector.name}: {stream.frame_queue.dropped}" for stream in self.streams
+        )
+        self.logger.info(
+            f"Batches: {self.batches_run}, avg size {avg_batch:.2f}, "
+            f"avg {avg_ms:.1f}ms/batch; dropped frames - {drops}"
+        )
+
+    def run(self):
+        """Main multi-camera loop"""
+        self.logger.info("Starting Multi-Camera Zone Detector...")
+
+        # Cameras open concurrently (and while the model finishes loading)
+        with ThreadPoolExecutor(max_workers=len(self.detectors)) as executor:
+            started = time.perf_counter()
+            list(executor.map(lambda detector: detector.setup_camera(), self.detectors))
+        first = self.detectors[0]
+        first.startup.record('camera open', time.perf_counter() - started)
+        first.wait_for_model()
+        self.model = first.model
+        first.startup.report()
+
+        for detector in self.detectors:
+            stream = CameraStream(detector, self.stop_event)
+            detector.metrics.watch_drops(lambda queue=stream.frame_queue: {'capture': queue.dropped})
+            self.streams.append(stream)
+
+        print("\n" + "=" * 60)
+        print("🚫 Zone Detector - Multi-câmera")
+        print("=" * 60)
+        for detector in self.detectors:
+            print(f"  - {detector.name}: {len(detector.zones)} zona(s)")
+        if self.headless:
+            print("\nSIGTERM/SIGINT para sair, SIGUSR1 para salvar snapshots")
+        else:
+            print("\nPressione 'q' em qualquer janela para sair")
+        print("=" * 60 + "\n")
+
+        self.install_signal_handlers()
+
+        for stream in self.streams:
+            stream.capture_thread.start()
+
+        last_stats_time = time.time()
+
+        try:
+            while not self.stop_requested:
+                if not any(stream.capture_thread.is_alive() for stream in self.streams):
+                    self.logger.warning("All camera streams stopped")
+                    break
+
+                # Latest frame from every camera that produced one
+                ready = []
+                for stream in self.streams:
+                    item = stream.latest_frame()
+                    if item is not None:
+                        ready.append((stream, item[0], item[1]))
+
+                if not ready:
+                    time.sleep(0.005)
+                    continue
+
+                if self.profiler and self.profiler.tick():
+                    break
+
+                pending = [(stream.detector, frame, capture_time)
+                           for stream, frame, capture_time in ready
+                           if stream.detector.needs_inference(frame, capture_time)]
+                detections = self.run_batch(pending) if pending else {}
+
+                # Dispatch to per-camera zone state, trainer and notifier
+                keep_running = True
+                for stream, frame, capture_time in ready:
+                    detector = stream.detector
+                    fresh_boxes = detections.get(detector.name)
+                    dog_boxes = detector.track_dogs(fresh_boxes, capture_time)
+                    processed_frame, dog_boxes, violation, should_alert = \
+                        detector.update_zone_state(frame, dog_boxes, capture_time,
+                                                   inferred=fresh_boxes is not None)
+
+                    stream.tick(time.time())
+                    if not detector.handle_frame(processed_frame, dog_boxes, violation,
+                                                 should_alert, detector.frames_in_zone,
+                                                 stream.fps):
+                        keep_running = False
+
+                if not keep_running:
+                    break
+
+                if time.time() - last_stats_time >= config.PIPELINE['stats_interval_seconds']:
+                    self.log_stats()
+                    last_stats_time = time.time()
+
+        except KeyboardInterrupt:
+            self.logger.info("Interrupted by user")
+        except Exception as e:
+            self.logger.error(f"Error in main loop: {e}", exc_info=True)
+        finally:
+            self.cleanup()
+
+    def cleanup(self):
+        """Stop capture threads and release every camera"""
+        self.stop_event.set()
+        for stream in self.streams:
+            stream.capture_thread.join(timeout=2)
+
+        if self.profiler:
+            self.profiler.close()
+
+        self.log_stats()
+        for detector in self.detectors:
+            detector.cleanup()
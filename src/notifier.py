@@ -4,14 +4,131 @@ Notification system for dog pee detection alerts
 
 import os
 import logging
+import queue
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
 import cv2
 
+from event_store import get_writer, make_event
+
 logger = logging.getLogger(__name__)
 
 
+class NotificationChannel(threading.Thread):
+    """Worker thread draining a bounded job queue for one notification channel"""
+
+    def __init__(self, name, queue_size, max_wait_seconds):
+        super().__init__(name=f'notify-{name}', daemon=True)
+        self.channel_name = name
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.max_wait_seconds = max_wait_seconds
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def submit(self, fn, *args):
+        """
+        Queue a job; waits at most max_wait_seconds for room, then drops it
+
+        Returns:
+            True if the job was queued
+        """
+        try:
+            if self.max_wait_seconds > 0:
+                self.queue.put((fn, args), timeout=self.max_wait_seconds)
+            else:
+                self.queue.put_nowait((fn, args))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(
+                f"Notification channel '{self.channel_name}' is full - "
+                f"job dropped ({self.dropped} so far)"
+            )
+            return False
+
+        self.submitted += 1
+        return True
+
+    def run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+
+            fn, args = job
+            try:
+                fn(*args)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Notification channel '{self.channel_name}' failed: {e}")
+
+    def close(self, timeout):
+        """Let queued jobs finish, waiting at most `timeout` seconds"""
+        deadline = time.time() + timeout
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.join(max(deadline - time.time(), 0))
+
+    def stats(self):
+        return {
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'pending': self.queue.qsize() if self.is_alive() else 0
+        }
+
+
+class NotificationDispatcher:
+    """
+    Runs notification work off the frame loop
+
+    Each channel (snapshot + event log, sound, desktop) gets its own thread and
+    bounded queue, so a slow SD card or a hung notification daemon cannot hold
+    up the other channels or the detector. When a queue is full the job is
+    dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(self, dispatch_config):
+        self.dispatch_config = dispatch_config
+        self.channels = {}
+
+    def submit(self, channel, fn, *args):
+        """Queue fn(*args) on a channel, starting its worker on first use"""
+        worker = self.channels.get(channel)
+        if worker is None:
+            worker = NotificationChannel(
+                channel,
+                self.dispatch_config['queue_size'],
+                self.dispatch_config['max_wait_seconds']
+            )
+            worker.start()
+            self.channels[channel] = worker
+        return worker.submit(fn, *args)
+
+    def stats(self):
+        return {name: worker.stats() for name, worker in self.channels.items()}
+
+    def close(self, timeout):
+        """Flush every channel within a shared timeout"""
+        deadline = time.time() + timeout
+        for worker in self.channels.values():
+            worker.close(max(deadline - time.time(), 0))
+
+        for name, stats in self.stats().items():
+            logger.info(
+                f"Notification channel '{name}': {stats['completed']} done, "
+                f"{stats['failed']} failed, {stats['dropped']} dropped, "
+                f"{stats['pending']} not flushed"
+            )
+
+
 class Notifier:
     """Handles notifications when dog urination is detected"""
 
@@ -34,6 +151,19 @@ class Notifier:
                 logger.warning("plyer not installed. Desktop notifications disabled.")
                 logger.info("Install with: pip install plyer")
 
+        # Snapshot encoding, event log and alerts run on background threads
+        self.dispatcher = None
+        if config.NOTIFICATION_DISPATCH['enabled']:
+            self.dispatcher = NotificationDispatcher(config.NOTIFICATION_DISPATCH)
+
+        # Events go to the SQLite store (batched by its writer thread)
+        self.event_writer = None
+        if config.EVENT_STORE['enabled']:
+            try:
+                self.event_writer = get_writer(config.EVENT_STORE)
+            except Exception as e:
+                logger.error(f"Event store unavailable, logging to CSV: {e}")
+
     def play_sound(self):
         """Play alert sound"""
         if not self.notification_config['sound']:
@@ -54,7 +184,7 @@ class Notifier:
         except Exception as e:
             logger.warning(f"Could not play sound: {e}")
 
-    def show_desktop_notification(self, detection_info: dict):
+    def show_desktop_notification(self, detection_info: dict, event_time=None):
         """Show desktop notification"""
         if not self.notification_config['desktop_notification'] or not self.desktop_available:
             return
@@ -64,7 +194,7 @@ class Notifier:
             message = (
                 f"Type: {detection_info['detection_type']}\n"
                 f"Confidence: {detection_info['confidence']:.2%}\n"
-                f"Time: {datetime.now().strftime('%H:%M:%S')}"
+                f"Time: {(event_time or datetime.now()).strftime('%H:%M:%S')}"
             )
 
             self.notification.notify(
@@ -76,17 +206,30 @@ class Notifier:
         except Exception as e:
             logger.error(f"Desktop notification failed: {e}")
 
-    def save_snapshot(self, frame, detection_info: dict):
-        """Save snapshot of the detection"""
+    def save_snapshot(self, frame, detection_info: dict, render=None, event_time=None):
+        """
+        Save snapshot of the detection
+        Args:
+            frame: Frame to save
+            detection_info: Dictionary with detection details
+            render: Optional callable that draws overlays onto the frame; only
+                    called when a snapshot is actually written (headless mode)
+            event_time: When the detection happened (default: now)
+        """
         if not self.notification_config['save_snapshot']:
             return None
 
         try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            if render is not None:
+                frame = render(frame)
+
+            timestamp = (event_time or datetime.now()).strftime('%Y%m%d_%H%M%S')
             detection_type = detection_info['detection_type']
             confidence = int(detection_info['confidence'] * 100)
 
             filename = f"pee_detected_{detection_type}_{confidence}pct_{timestamp}.jpg"
+            if detection_info.get('camera'):
+                filename = f"{detection_info['camera']}_{filename}"
             filepath = os.path.join(
                 self.notification_config['snapshot_dir'],
                 filename
@@ -99,8 +242,12 @@ class Notifier:
             logger.error(f"Failed to save snapshot: {e}")
             return None
 
-    def log_detection(self, detection_info: dict, snapshot_path: str = None):
-        """Log detection to file"""
+    def log_detection(self, detection_info: dict, snapshot_path: str = None, event_time=None):
+        """Log detection to the event store (legacy CSV when the store is disabled)"""
+        if self.event_writer is not None:
+            self.event_writer.record(make_event(detection_info, snapshot_path, event_time))
+            return
+
         try:
             log_file = Path('logs/detections.csv')
             log_file.parent.mkdir(exist_ok=True)
@@ -112,7 +259,7 @@ class Notifier:
 
             # Append detection
             with open(log_file, 'a') as f:
-                timestamp = datetime.now().isoformat()
+                timestamp = (event_time or datetime.now()).isoformat()
                 f.write(
                     f"{timestamp},"
                     f"{detection_info['detection_type']},"
@@ -122,40 +269,68 @@ class Notifier:
         except Exception as e:
             logger.error(f"Failed to log detection: {e}")
 
-    def notify(self, frame, detection_info: dict):
+    def print_alert(self, detection_info: dict, snapshot_path=None, event_time=None):
+        """Print the alert banner to the console"""
+        print("\n" + "=" * 50)
+        print("🐕 PEE DETECTION ALERT!")
+        print(f"Type: {detection_info['detection_type'].upper()}")
+        print(f"Confidence: {detection_info['confidence']:.2%}")
+        print(f"Frames: {detection_info['frames_detected']}")
+        print(f"Time: {(event_time or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')}")
+        if snapshot_path:
+            print(f"Snapshot: {snapshot_path}")
+        print("=" * 50 + "\n")
+
+    def persist(self, frame, detection_info: dict, event_time=None):
+        """Save snapshot, append to the event log and print the alert"""
+        snapshot_path = self.save_snapshot(frame, detection_info, event_time=event_time)
+        self.log_detection(detection_info, snapshot_path, event_time)
+        self.print_alert(detection_info, snapshot_path, event_time)
+
+    def notify(self, frame, detection_info: dict, render=None):
         """
         Main notification method - triggers all enabled notifications
         Args:
             frame: Current video frame
             detection_info: Dictionary with detection details
+            render: Optional overlay callable passed to save_snapshot
         """
         if not self.notification_config['enabled']:
             return
 
+        event_time = datetime.now()
         logger.info(
             f"DETECTION! Type: {detection_info['detection_type']}, "
             f"Confidence: {detection_info['confidence']:.2%}"
         )
 
-        # Save snapshot
-        snapshot_path = self.save_snapshot(frame, detection_info)
-
-        # Log detection
-        self.log_detection(detection_info, snapshot_path)
+        if self.dispatcher is None:
+            snapshot_path = self.save_snapshot(frame, detection_info, render, event_time)
+            self.log_detection(detection_info, snapshot_path, event_time)
+            self.play_sound()
+            self.show_desktop_notification(detection_info, event_time)
+            self.print_alert(detection_info, snapshot_path, event_time)
+            return
 
-        # Play sound
-        self.play_sound()
+        # Overlays are drawn here because they read detector state; the worker
+        # gets its own copy of the frame and only encodes and writes it
+        snapshot_frame = None
+        if self.notification_config['save_snapshot']:
+            snapshot_frame = render(frame) if render is not None else frame.copy()
+        detection_info = dict(detection_info)
 
-        # Show desktop notification
-        self.show_desktop_notification(detection_info)
+        self.dispatcher.submit('persist', self.persist, snapshot_frame, detection_info, event_time)
+        if self.notification_config['sound']:
+            self.dispatcher.submit('sound', self.play_sound)
+        if self.notification_config['desktop_notification'] and self.desktop_available:
+            self.dispatcher.submit('desktop', self.show_desktop_notification,
+                                   detection_info, event_time)
 
-        # Print to console
-        print("\n" + "=" * 50)
-        print("🐕 PEE DETECTION ALERT!")
-        print(f"Type: {detection_info['detection_type'].upper()}")
-        print(f"Confidence: {detection_info['confidence']:.2%}")
-        print(f"Frames: {detection_info['frames_detected']}")
-        print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        if snapshot_path:
-            print(f"Snapshot: {snapshot_path}")
-        print("=" * 50 + "\n")
+    def close(self, timeout=None):
+        """Flush pending notifications and stored events (call on shutdown)"""
+        if timeout is None:
+            timeout = self.config.NOTIFICATION_DISPATCH['flush_timeout_seconds']
+        if self.dispatcher is not None:
+            self.dispatcher.close(timeout)
+        if self.event_writer is not None:
+            self.event_writer.flush(timeout)
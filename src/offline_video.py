@@ -0,0 +1,170 @@
+"""
+Offline Video - Faster-than-realtime processing of recorded footage
+All timing comes from the video's own timestamps (CAP_PROP_POS_MSEC), so
+cooldowns, dwell times and the inference scheduler behave as they did live
+"""
+
+import csv
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+def format_video_time(seconds):
+    """Video position as HH:MM:SS.mmm"""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600 * 1000)
+    minutes, milliseconds = divmod(milliseconds, 60 * 1000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+
+class OfflineVideo:
+    """
+    Reads every `stride`-th frame of a video file with its container timestamp
+
+    Skipped frames are only grabbed, not decoded.
+    """
+
+    def __init__(self, video_path, stride=1):
+        self.video_path = str(video_path)
+        self.stride = max(int(stride), 1)
+
+        self.cap = cv2.VideoCapture(self.video_path)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Failed to open video: {self.video_path}")
+
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_count = self.cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        self.duration = frame_count / self.fps if frame_count > 0 else None
+
+        self.frame_index = -1
+        self.frames_processed = 0
+        self.started_at = None
+
+    def timestamp(self):
+        """Seconds into the video of the frame just read"""
+        position = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if position <= 0 and self.frame_index > 0:
+            # Some containers report no timestamps; fall back to the nominal rate
+            position = self.frame_index / self.fps
+        return position
+
+    def frames(self):
+        """Yield (frame_index, frame, video_seconds) for every stride-th frame"""
+        self.started_at = time.time()
+        while True:
+            for _ in range(self.stride - 1):
+                if not self.cap.grab():
+                    return
+                self.frame_index += 1
+
+            ret, frame = self.cap.read()
+            if not ret:
+                return
+            self.frame_index += 1
+            self.frames_processed += 1
+            yield self.frame_index, frame, self.timestamp()
+
+    def speed(self, video_seconds):
+        """Video seconds processed per wall-clock second"""
+        elapsed = time.time() - self.started_at
+        return video_seconds / elapsed if elapsed > 0 else 0.0
+
+    def release(self):
+        self.cap.release()
+
+
+class OfflineEventLog:
+    """
+    Event log (CSV) and snapshots for one processed video
+
+    Written to <output_dir>/<video name>_<run timestamp>/ with events.csv and
+    snapshots/ named by video position.
+    """
+
+    FIELDS = ['video_time', 'video_seconds', 'frame', 'event', 'detail',
+              'confidence', 'track_id', 'snapshot_path']
+
+    def __init__(self, video_path, offline_config):
+        self.offline_config = offline_config
+        run_name = f"{Path(video_path).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.output_dir = Path(offline_config['output_dir']) / run_name
+        self.snapshot_dir = self.output_dir / 'snapshots'
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+
+        self.file = open(self.output_dir / 'events.csv', 'w', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=self.FIELDS)
+        self.writer.writeheader()
+        self.counts = {}
+
+    def save_snapshot(self, frame, video_seconds, event):
+        """Write a snapshot named after its video position; returns the path or None"""
+        if not self.offline_config['save_snapshots']:
+            return None
+
+        position = format_video_time(video_seconds).replace(':', '-')
+        path = self.snapshot_dir / f"{position}_{event}.jpg"
+        cv2.imwrite(str(path), frame)
+        return str(path)
+
+    def log(self, video_seconds, frame_index, event, detail=None, confidence=None,
+            track_id=None, snapshot_path=None):
+        """Append one event"""
+        self.writer.writerow({
+            'video_time': format_video_time(video_seconds),
+            'video_seconds': f"{video_seconds:.3f}",
+            'frame': frame_index,
+            'event': event,
+            'detail': detail or '',
+            'confidence': '' if confidence is None else f"{confidence:.4f}",
+            'track_id': '' if track_id is None else track_id,
+            'snapshot_path': snapshot_path or ''
+        })
+        self.counts[event] = self.counts.get(event, 0) + 1
+        logger.info(f"[{format_video_time(video_seconds)}] {event} {detail or ''}".rstrip())
+
+    def close(self):
+        self.file.close()
+
+
+class ProgressReporter:
+    """Prints processing progress every few wall-clock seconds"""
+
+    def __init__(self, video, interval_seconds):
+        self.video = video
+        self.interval_seconds = interval_seconds
+        self.last_report = time.time()
+
+    def update(self, video_seconds):
+        now = time.time()
+        if now - self.last_report < self.interval_seconds:
+            return
+        self.last_report = now
+
+        total = (f" / {format_video_time(self.video.duration)}"
+                 if self.video.duration else "")
+        print(f"  {format_video_time(video_seconds)}{total}  "
+              f"({self.video.speed(video_seconds):.1f}x realtime, "
+              f"{self.video.frames_processed} frames)")
+
+
+def print_summary(video, events, video_seconds):
+    """Final report of an offline run"""
+    elapsed = time.time() - video.started_at if video.started_at else 0.0
+
+    print("\n" + "=" * 60)
+    print(f"Video: {video.video_path}")
+    print(f"Processed: {format_video_time(video_seconds)} of video in "
+          f"{elapsed:.1f}s ({video.speed(video_seconds):.1f}x realtime)")
+    print(f"Frames: {video.frames_processed} analysed (stride {video.stride})")
+    for event, count in sorted(events.counts.items()):
+        print(f"  {event}: {count}")
+    print(f"Event log: {events.output_dir / 'events.csv'}")
+    print("=" * 60 + "\n")
@@ -144,12 +144,14 @@ class PoseAnalyzer:
         except:
             return False
 
-    def analyze_pose(self, keypoints: np.ndarray, current_time: float) -> Dict:
+    def analyze_pose(self, keypoints: np.ndarray, current_time: float,
+                     humans_nearby: bool = False) -> Dict:
         """
         Main analysis function to detect urination behavior
         Args:
             keypoints: Detected keypoints from pose estimation
-            current_time: Current timestamp
+            current_time: Current timestamp (wall clock, or video time offline)
+            humans_nearby: A person is next to the dog (suppresses the alert)
         Returns:
             Dictionary with detection results
         """
@@ -165,6 +167,7 @@ class PoseAnalyzer:
                 'squat_detected': False,
                 'squat_confidence': 0.0,
                 'tail_raised': False,
+                'humans_nearby': humans_nearby,
                 'detection_counter': 0,
                 'min_frames_needed': self.pee_config['min_frames_threshold']
             }
@@ -208,7 +211,7 @@ class PoseAnalyzer:
         min_frames = self.pee_config['min_frames_threshold']
         cooldown = self.pee_config['cooldown_seconds']
 
-        if self.detection_counter >= min_frames:
+        if self.detection_counter >= min_frames and not humans_nearby:
             # Check cooldown period
             time_since_last = current_time - self.last_detection_time
             if time_since_last > cooldown:
@@ -0,0 +1,54 @@
+"""
+Post-processing - Vectorized conversion of YOLO results to NumPy
+One device-to-host transfer per frame instead of one per box
+"""
+
+import numpy as np
+
+DOG_CLASS = 16  # COCO class id
+
+# Columns of a detections array
+X1, Y1, X2, Y2, CONF, CLS = range(6)
+
+
+def empty_detections():
+    """Detections array with no rows"""
+    return np.zeros((0, 6), dtype=np.float32)
+
+
+def result_to_array(result, offset=None):
+    """
+    Convert one ultralytics result to a contiguous N x 6 array
+
+    Args:
+        result: ultralytics Results for a single image
+        offset: Optional (x, y, x, y) shift from model-input to frame coordinates
+    Returns:
+        float32 array with rows [x1, y1, x2, y2, conf, cls]
+    """
+    boxes = getattr(result, 'boxes', None)
+    if boxes is None or len(boxes) == 0:
+        return empty_detections()
+
+    # Single transfer of the whole box tensor
+    data = boxes.data.cpu().numpy()
+    if data.shape[1] == 7:  # [x1, y1, x2, y2, track_id, conf, cls]
+        data = data[:, [0, 1, 2, 3, 5, 6]]
+
+    detections = np.ascontiguousarray(data[:, :6], dtype=np.float32)
+    if offset is not None:
+        detections[:, X1:Y2 + 1] += offset
+    return detections
+
+
+def filter_class(detections, class_id):
+    """Keep only the rows of one class"""
+    return detections[detections[:, CLS] == class_id]
+
+
+def result_keypoints(result):
+    """All keypoints of a pose result as an N x K x 3 array [x, y, conf] (single transfer)"""
+    keypoints = getattr(result, 'keypoints', None)
+    if keypoints is None or keypoints.data is None or len(keypoints.data) == 0:
+        return np.zeros((0, 0, 3), dtype=np.float32)
+    return np.ascontiguousarray(keypoints.data.cpu().numpy(), dtype=np.float32)
@@ -0,0 +1,198 @@
+"""
+Profiling - Built-in profiler for the detection loops (--profile N)
+Profiles N frames after a warmup with cProfile (per-function cumulative time)
+and a stack sampler (folded stacks for flame graphs), then reports the top
+functions of each stage
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# stage -> (file substring or None, function name prefix or None) patterns
+STAGES = {
+    'model call': [
+        ('zone_detector.py', 'detect_dogs'), ('multi_camera.py', 'run_batch'),
+        ('ultralytics', None), ('torch', None), ('onnxruntime', None), ('openvino', None),
+    ],
+    'zone check': [
+        ('zone_detector.py', 'check_dog_in_zones'), ('zone_detector.py', 'point_in_polygon'),
+        ('zone_mask.py', None),
+    ],
+    'pose analysis': [
+        ('pose_analyzer.py', None), ('dog_pee_detector.py', 'check_humans_nearby'),
+    ],
+    'draw': [
+        (None, 'draw_'), (None, 'render_overlays'), ('zone_overlay.py', None),
+    ],
+    'notifier': [
+        ('notifier.py', None),
+    ],
+}
+
+
+def function_label(func):
+    """'name (file:line)' for a pstats function key"""
+    filename, line, name = func
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def matches(func, patterns):
+    filename, _, name = func
+    for file_part, name_prefix in patterns:
+        if file_part is not None and file_part not in filename:
+            continue
+        if name_prefix is not None and not name.startswith(name_prefix):
+            continue
+        return True
+    return False
+
+
+class StackSampler(threading.Thread):
+    """Samples every thread's Python stack at a fixed interval (folded-stack output)"""
+
+    def __init__(self, interval):
+        super().__init__(name='profiler-sampler', daemon=True)
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.stacks = Counter()
+        self.samples = 0
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                                 f"{code.co_firstlineno})")
+                    frame = frame.f_back
+
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self.stop_event.set()
+        self.join(timeout=1)
+
+    def write_folded(self, path):
+        """Brendan Gregg folded format (flamegraph.pl, speedscope, inferno)"""
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class LoopProfiler:
+    """
+    Profiles a window of frames of a detection loop
+
+    Call tick() once at the top of every frame; it returns True once the
+    profiled frames are done and the report has been written.
+    """
+
+    def __init__(self, frames, name, profiling_config):
+        self.frames = frames
+        self.name = name
+        self.profiling_config = profiling_config
+        self.warmup = profiling_config['warmup_frames']
+
+        self.frame_count = 0
+        self.profile = None
+        self.sampler = None
+        self.started_at = None
+        self.elapsed = 0.0
+        self.finished = False
+
+    def tick(self):
+        """Advance one frame; start after warmup, stop and report after N frames"""
+        if self.finished:
+            return True
+
+        self.frame_count += 1
+        if self.frame_count == self.warmup + 1:
+            self.start()
+        elif self.frame_count == self.warmup + self.frames + 1:
+            self.stop()
+            self.report()
+            self.finished = True
+            return True
+        return False
+
+    def close(self):
+        """Report what was collected if the loop ended before N frames"""
+        if self.profile is None or self.finished:
+            return
+        self.stop()
+        self.frames = max(self.frame_count - self.warmup, 1)
+        self.report()
+        self.finished = True
+
+    def start(self):
+        logger.info(f"Profiling {self.frames} frames (after {self.warmup} warmup frames)")
+        self.sampler = StackSampler(self.profiling_config['sample_interval_seconds'])
+        self.sampler.start()
+        self.profile = cProfile.Profile()
+        self.started_at = time.perf_counter()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self.elapsed = time.perf_counter() - self.started_at
+        self.sampler.stop()
+
+    def report(self):
+        """Write .prof / .folded files and print the top functions per stage"""
+        output_dir = Path(self.profiling_config['output_dir'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        base = output_dir / f"{self.name}_{datetime.now():%Y%m%d_%H%M%S}"
+
+        prof_path = base.with_suffix('.prof')
+        folded_path = base.with_suffix('.folded')
+        self.profile.dump_stats(str(prof_path))
+        self.sampler.write_folded(folded_path)
+
+        stats = pstats.Stats(self.profile, stream=io.StringIO())
+        top = self.profiling_config['top_functions']
+
+        print("\n" + "=" * 70)
+        print(f"Profile: {self.frames} frames in {self.elapsed:.2f}s "
+              f"({self.elapsed / self.frames * 1000:.1f} ms/frame)")
+        print("=" * 70)
+
+        for stage, patterns in STAGES.items():
+            rows = [(func, stat) for func, stat in stats.stats.items() if matches(func, patterns)]
+            if not rows:
+                continue
+            rows.sort(key=lambda row: row[1][3], reverse=True)  # cumulative time
+
+            print(f"\n[{stage}]")
+            print(f"  {'cumulative':>10s} {'per frame':>10s} {'calls':>8s}  function")
+            for func, (_, ncalls, _, cumtime, _) in rows[:top]:
+                print(f"  {cumtime:9.3f}s {cumtime / self.frames * 1000:8.2f}ms "
+                      f"{ncalls:8d}  {function_label(func)}")
+
+        print(f"\nOverall top {top} by cumulative time:")
+        overall = sorted(stats.stats.items(), key=lambda row: row[1][3], reverse=True)
+        for func, (_, ncalls, _, cumtime, _) in overall[:top]:
+            print(f"  {cumtime:9.3f}s {ncalls:8d}  {function_label(func)}")
+
+        print(f"\ncProfile stats: {prof_path}  (snakeviz / python -m pstats)")
+        print(f"Flame graph:    {folded_path}  ({self.sampler.samples} samples; "
+              f"flamegraph.pl or https://www.speedscope.app)")
+        print("=" * 70 + "\n")
+        logger.info(f"Profile written: {prof_path}, {folded_path}")
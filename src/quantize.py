@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Quantize - INT8 detection and pose models calibrated on our own camera
+Produces INT8 ONNX/OpenVINO models and an FP32 vs INT8 accuracy/speed report
+
+Usage:
+    python src/quantize.py --source 0 --engine openvino
+    python src/quantize.py --source noite.mp4 --engine onnx --models detect
+
+The detectors load the result with --engine <engine> --int8.
+"""
+
+import cv2
+import json
+import logging
+import sys
+import time
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent))
+
+import config
+from inference_engine import box_iou, exported_model_path, load_model, read_frames
+from postprocess import DOG_CLASS, filter_class, result_to_array
+from zone_mask import ZoneMaskIndex
+
+logger = logging.getLogger(__name__)
+
+# model key -> (weights, task, class counted for recall; None = all classes)
+MODELS = {
+    'detect': ('yolov8n.pt', 'detect', DOG_CLASS),
+    'pose': (config.YOLO_MODEL, 'pose', None),
+}
+
+
+def letterbox(frame, imgsz):
+    """Resize keeping aspect ratio and pad to a square model input (NCHW, RGB, 0-1)"""
+    height, width = frame.shape[:2]
+    scale = imgsz / max(height, width)
+    resized = cv2.resize(frame, (int(round(width * scale)), int(round(height * scale))))
+
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top = (imgsz - resized.shape[0]) // 2
+    left = (imgsz - resized.shape[1]) // 2
+    canvas[top:top + resized.shape[0], left:left + resized.shape[1]] = resized
+
+    rgb = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)
+    return (rgb.transpose(2, 0, 1)[None].astype(np.float32) / 255.0)
+
+
+def save_calibration_frames(frames, output_dir):
+    """Write calibration frames as JPEGs (also used as the OpenVINO dataset)"""
+    images_dir = Path(output_dir) / 'images'
+    images_dir.mkdir(parents=True, exist_ok=True)
+    for old_image in images_dir.glob('*.jpg'):
+        old_image.unlink()
+
+    for i, frame in enumerate(frames):
+        cv2.imwrite(str(images_dir / f"calib_{i:05d}.jpg"), frame)
+
+    return images_dir
+
+
+def write_dataset_yaml(images_dir, names):
+    """Minimal ultralytics dataset file pointing at the calibration images"""
+    dataset = {
+        'path': str(images_dir.parent.absolute()),
+        'train': images_dir.name,
+        'val': images_dir.name,
+        'names': {int(k): v for k, v in names.items()},
+    }
+    yaml_path = images_dir.parent / 'calibration.yaml'
+    # JSON is valid YAML
+    with open(yaml_path, 'w') as f:
+        json.dump(dataset, f, indent=2)
+    return yaml_path
+
+
+def quantize_onnx(weights, frames, imgsz):
+    """Static INT8 quantization of the exported ONNX model with ONNX Runtime"""
+    import onnx
+    import onnxruntime
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat,
+                                          QuantType, quantize_static)
+
+    # Make sure the FP32 export exists
+    load_model(weights, 'onnx', imgsz=imgsz)
+    fp32_path = exported_model_path(weights, 'onnx')
+    int8_path = exported_model_path(weights, 'onnx', int8=True)
+
+    input_name = onnxruntime.InferenceSession(
+        str(fp32_path), providers=['CPUExecutionProvider']
+    ).get_inputs()[0].name
+
+    class FrameCalibrationReader(CalibrationDataReader):
+        """Feeds our camera frames to the calibrator"""
+
+        def __init__(self):
+            self.inputs = iter({input_name: letterbox(frame, imgsz)} for frame in frames)
+
+        def get_next(self):
+            return next(self.inputs, None)
+
+    logger.info(f"Calibrating ONNX INT8 model on {len(frames)} frames...")
+    quantize_static(str(fp32_path), str(int8_path), FrameCalibrationReader(),
+                    quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+
+    # Keep ultralytics metadata (class names, stride, imgsz, task)
+    fp32_model = onnx.load(str(fp32_path))
+    int8_model = onnx.load(str(int8_path))
+    del int8_model.metadata_props[:]
+    int8_model.metadata_props.extend(fp32_model.metadata_props)
+    onnx.save(int8_model, str(int8_path))
+
+    return int8_path
+
+
+def quantize_openvino(weights, images_dir, imgsz):
+    """INT8 export through ultralytics/NNCF using our calibration images"""
+    from ultralytics import YOLO
+
+    model = YOLO(weights)
+    dataset_yaml = write_dataset_yaml(images_dir, model.names)
+
+    logger.info(f"Calibrating OpenVINO INT8 model with {dataset_yaml}...")
+    exported = model.export(format='openvino', int8=True, data=str(dataset_yaml),
+                            imgsz=imgsz, dynamic=True)
+    return Path(exported)
+
+
+def match_count(reference_boxes, candidate_boxes, iou_threshold=0.5):
+    """Number of reference boxes matched one-to-one by candidate boxes"""
+    if len(reference_boxes) == 0 or len(candidate_boxes) == 0:
+        return 0
+
+    candidates = np.asarray(candidate_boxes)[:, :4]
+    used = np.zeros(len(candidates), dtype=bool)
+    matched = 0
+    for box in reference_boxes:
+        ious = box_iou(box[:4], candidates)
+        ious[used] = 0
+        j = int(np.argmax(ious))
+        if ious[j] >= iou_threshold:
+            used[j] = True
+            matched += 1
+    return matched
+
+
+def class_boxes(result, class_filter):
+    """xyxy boxes from a result, optionally restricted to one class"""
+    detections = result_to_array(result)
+    if class_filter is not None:
+        detections = filter_class(detections, class_filter)
+    return detections[:, :4]
+
+
+def load_zones(zones_file):
+    """Zones used for the violation agreement metric (empty if not configured)"""
+    path = Path(zones_file)
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('zones', [])
+
+
+def timed_inference(model, frame, conf):
+    start = time.perf_counter()
+    result = model(frame, conf=conf, verbose=False)[0]
+    return result, (time.perf_counter() - start) * 1000
+
+
+def latency_summary(latencies_ms):
+    return {
+        'mean_ms': float(np.mean(latencies_ms)),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+    }
+
+
+def evaluate(fp32_model, int8_model, frames, class_filter, zones, conf=0.4):
+    """
+    Compare FP32 and INT8 models on held-out frames
+
+    FP32 detections are the reference: recall is the fraction of them the INT8
+    model also finds (IoU >= 0.5), zone agreement is the fraction of frames
+    where both models reach the same zone-violation decision.
+    """
+    zone_index = ZoneMaskIndex()
+    min_overlap = config.ZONE_INDEX['min_overlap_fraction']
+
+    # Warmup (first calls are much slower)
+    fp32_model(frames[0], conf=conf, verbose=False)
+    int8_model(frames[0], conf=conf, verbose=False)
+
+    fp32_latency, int8_latency = [], []
+    reference_total = matched_total = 0
+    zone_agreements = 0
+
+    for frame in frames:
+        reference, fp32_ms = timed_inference(fp32_model, frame, conf)
+        candidate, int8_ms = timed_inference(int8_model, frame, conf)
+        fp32_latency.append(fp32_ms)
+        int8_latency.append(int8_ms)
+
+        reference_boxes = class_boxes(reference, class_filter)
+        candidate_boxes = class_boxes(candidate, class_filter)
+        reference_total += len(reference_boxes)
+        matched_total += match_count(reference_boxes, candidate_boxes)
+
+        if zones:
+            zone_index.ensure(zones, frame.shape)
+            fp32_violation = zone_index.find_violation(zones, reference_boxes, min_overlap)
+            int8_violation = zone_index.find_violation(zones, candidate_boxes, min_overlap)
+            fp32_zone = fp32_violation['zone']['name'] if fp32_violation else None
+            int8_zone = int8_violation['zone']['name'] if int8_violation else None
+            zone_agreements += fp32_zone == int8_zone
+
+    fp32_summary = latency_summary(fp32_latency)
+    int8_summary = latency_summary(int8_latency)
+
+    return {
+        'frames': len(frames),
+        'reference_detections': reference_total,
+        'recall': matched_total / reference_total if reference_total else None,
+        'zone_agreement': zone_agreements / len(frames) if zones else None,
+        'fp32_latency': fp32_summary,
+        'int8_latency': int8_summary,
+        'speedup': fp32_summary['mean_ms'] / int8_summary['mean_ms'],
+    }
+
+
+def print_report(model_key, engine, report):
+    print("\n" + "=" * 60)
+    print(f"📊 FP32 vs INT8 - {model_key} ({engine})")
+    print("=" * 60)
+    print(f"Frames avaliados: {report['frames']}")
+    if report['recall'] is not None:
+        label = 'dog recall' if MODELS[model_key][2] == DOG_CLASS else 'recall'
+        print(f"INT8 {label} vs FP32: {report['recall']:.1%} "
+              f"({report['reference_detections']} detecções FP32)")
+    else:
+        print("Nenhuma detecção FP32 nos frames avaliados (recall indefinido)")
+    if report['zone_agreement'] is not None:
+        print(f"Concordância de violação de zona: {report['zone_agreement']:.1%}")
+    fp32, int8 = report['fp32_latency'], report['int8_latency']
+    print(f"Latência FP32: {fp32['mean_ms']:.1f}ms (p50 {fp32['p50_ms']:.1f}, p95 {fp32['p95_ms']:.1f})")
+    print(f"Latência INT8: {int8['mean_ms']:.1f}ms (p50 {int8['p50_ms']:.1f}, p95 {int8['p95_ms']:.1f})")
+    print(f"Speedup: {report['speedup']:.2f}x")
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build INT8 models calibrated on your camera')
+    parser.add_argument('--source', default=str(config.CAMERA_INDEX),
+                       help='Camera index or video file for calibration frames')
+    parser.add_argument('--engine', choices=['onnx', 'openvino'], default='openvino')
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), default=list(MODELS))
+    parser.add_argument('--frames', type=int, default=300, help='Frames to sample')
+    parser.add_argument('--stride', type=int, default=15, help='Use every Nth frame')
+    parser.add_argument('--holdout', type=int, default=5,
+                       help='Every Nth sampled frame is held out for the report')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--zones', default='zone_config.json',
+                       help='Zone config for the violation agreement metric')
+    parser.add_argument('--output-dir', default='data/calibration')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    print(f"🎥 Amostrando {args.frames} frames de: {args.source}")
+    frames = read_frames(source, args.frames, args.stride)
+    if len(frames) < args.holdout * 2:
+        print(f"❌ Frames insuficientes lidos de: {args.source}")
+        sys.exit(1)
+
+    eval_frames = frames[::args.holdout]
+    calibration_frames = [f for i, f in enumerate(frames) if i % args.holdout != 0]
+    images_dir = save_calibration_frames(calibration_frames, args.output_dir)
+    print(f"✅ {len(calibration_frames)} frames de calibração, {len(eval_frames)} para avaliação")
+
+    zones = load_zones(args.zones)
+    reports = {}
+
+    for model_key in args.models:
+        weights, task, class_filter = MODELS[model_key]
+
+        if args.engine == 'onnx':
+            int8_path = quantize_onnx(weights, calibration_frames, args.imgsz)
+        else:
+            int8_path = quantize_openvino(weights, images_dir, args.imgsz)
+        print(f"✅ Modelo INT8 salvo: {int8_path}")
+
+        fp32_model = load_model(weights, args.engine, task=task, imgsz=args.imgsz)
+        int8_model = load_model(weights, args.engine, task=task, int8=True)
+
+        report = evaluate(fp32_model, int8_model, eval_frames, class_filter,
+                          zones if model_key == 'detect' else [])
+        report['int8_model'] = str(int8_path)
+        reports[model_key] = report
+        print_report(model_key, args.engine, report)
+
+    output_path = Path('analytics') / f"quantization_report_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output_path.parent.mkdir(exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump({'engine': args.engine, 'source': args.source,
+                   'generated_at': datetime.now().isoformat(), 'models': reports}, f, indent=2)
+
+    print(f"\n📄 Relatório salvo em: {output_path}")
+    print(f"   Para usar: python src/zone_detector.py --engine {args.engine} --int8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Rollups - Persisted per-day/per-hour event counts for the training analytics
+Kept in the event database next to the events, with a high-water mark (last
+folded event id) so each run only aggregates the events stored since
+"""
+
+import logging
+from collections import Counter
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_hourly (
+    day TEXT NOT NULL,              -- YYYY-MM-DD (local time, as recorded)
+    hour INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, hour)
+);
+CREATE TABLE IF NOT EXISTS rollup_state (
+    name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL
+);
+"""
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+class RollupCache:
+    """
+    Day x hour event counts, folded in incrementally from the events table
+
+    Daily, hourly and weekday breakdowns for any range of days are sums over
+    at most 24 rows per day, however many events were recorded.
+    """
+
+    NAME = 'hourly'
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.connection.executescript(SCHEMA)
+
+    def high_water_mark(self):
+        row = self.connection.execute('SELECT last_id FROM rollup_state WHERE name = ?',
+                                      (self.NAME,)).fetchone()
+        return row[0] if row else 0
+
+    def update(self):
+        """
+        Fold events stored since the last run into the rollups
+
+        Returns:
+            Number of new events
+        """
+        last_id = self.high_water_mark()
+        newest_id = self.connection.execute('SELECT MAX(id) FROM events').fetchone()[0]
+        if newest_id is None or newest_id <= last_id:
+            return 0
+
+        with self.connection:
+            rows = self.connection.execute(
+                """SELECT substr(timestamp, 1, 10), CAST(substr(timestamp, 12, 2) AS INTEGER),
+                          COUNT(*)
+                   FROM events WHERE id > ? AND id <= ?
+                   GROUP BY 1, 2""",
+                (last_id, newest_id)
+            ).fetchall()
+            self.connection.executemany(
+                """INSERT INTO rollup_hourly (day, hour, count) VALUES (?, ?, ?)
+                   ON CONFLICT (day, hour) DO UPDATE SET count = count + excluded.count""",
+                rows
+            )
+            self.connection.execute(
+                'INSERT OR REPLACE INTO rollup_state (name, last_id) VALUES (?, ?)',
+                (self.NAME, newest_id)
+            )
+
+        folded = sum(row[2] for row in rows)
+        logger.debug(f"Folded {folded} event(s) into rollups (last id {newest_id})")
+        return folded
+
+    def rebuild(self):
+        """Drop the rollups and aggregate every event again (archived events are lost)"""
+        with self.connection:
+            self.connection.execute('DELETE FROM rollup_hourly')
+            self.connection.execute('DELETE FROM rollup_state WHERE name = ?', (self.NAME,))
+        return self.update()
+
+    @staticmethod
+    def where(start_day=None, end_day=None):
+        """WHERE clause for days in [start_day, end_day) (dates or YYYY-MM-DD)"""
+        clauses, params = [], []
+        if start_day is not None:
+            clauses.append('day >= ?')
+            params.append(str(start_day))
+        if end_day is not None:
+            clauses.append('day < ?')
+            params.append(str(end_day))
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def daily(self, start_day=None, end_day=None):
+        """[(YYYY-MM-DD, count)] for days with events, oldest first"""
+        where, params = self.where(start_day, end_day)
+        rows = self.connection.execute(
+            f'SELECT day, SUM(count) FROM rollup_hourly{where} GROUP BY day ORDER BY day', params)
+        return [tuple(row) for row in rows]
+
+    def hourly(self, start_day=None, end_day=None):
+        """[(hour, count)] for hours with events"""
+        where, params = self.where(start_day, end_day)
+        rows = self.connection.execute(
+            f'SELECT hour, SUM(count) FROM rollup_hourly{where} GROUP BY hour ORDER BY hour', params)
+        return [tuple(row) for row in rows]
+
+    def weekday(self, start_day=None, end_day=None):
+        """[(weekday name, count)] Monday first, for weekdays with events"""
+        where, params = self.where(start_day, end_day)
+        rows = self.connection.execute(
+            f"""SELECT (CAST(strftime('%w', day) AS INTEGER) + 6) % 7, SUM(count)
+                FROM rollup_hourly{where} GROUP BY 1 ORDER BY 1""",
+            params)
+        return [(WEEKDAYS[index], count) for index, count in rows]
+
+
+class EventCounts:
+    """
+    The RollupCache breakdowns computed from a list of event times
+
+    Used when a report filters on columns the rollups do not keep (zone, camera).
+    """
+
+    def __init__(self, times):
+        self.cells = Counter((time.date().isoformat(), time.hour) for time in times)
+
+    def select(self, start_day=None, end_day=None):
+        for (day, hour), count in self.cells.items():
+            if start_day is not None and day < str(start_day):
+                continue
+            if end_day is not None and day >= str(end_day):
+                continue
+            yield day, hour, count
+
+    def daily(self, start_day=None, end_day=None):
+        counts = Counter()
+        for day, _, count in self.select(start_day, end_day):
+            counts[day] += count
+        return sorted(counts.items())
+
+    def hourly(self, start_day=None, end_day=None):
+        counts = Counter()
+        for _, hour, count in self.select(start_day, end_day):
+            counts[hour] += count
+        return sorted(counts.items())
+
+    def weekday(self, start_day=None, end_day=None):
+        counts = Counter()
+        for day, _, count in self.select(start_day, end_day):
+            counts[date.fromisoformat(day).weekday()] += count
+        return [(WEEKDAYS[index], count) for index, count in sorted(counts.items())]
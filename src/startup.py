@@ -0,0 +1,72 @@
+"""
+Startup - Per-phase startup timing and background initialisation
+Slow independent steps (model load + warmup, camera open) run concurrently;
+the time of every phase is logged once the detector is ready to monitor
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """Collects (phase, seconds, background) and logs the breakdown"""
+
+    def __init__(self, logger, started=None):
+        self.logger = logger
+        self.started = started if started is not None else time.perf_counter()
+        self.phases = []
+        self.lock = threading.Lock()
+        self.reported = False
+
+    def record(self, name, seconds, background=False):
+        with self.lock:
+            self.phases.append((name, seconds, background))
+
+    @contextmanager
+    def phase(self, name, background=False):
+        """Time a block as one startup phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, background)
+
+    def background(self, name, function, *args):
+        """
+        Run function(*args) on a daemon thread (it records its own phases)
+
+        Returns:
+            Future with the function's result (or exception)
+        """
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(function(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f'startup-{name}', daemon=True).start()
+        return future
+
+    def wait(self, name, future):
+        """Result of a background future; the time blocked is its own phase"""
+        with self.phase(name):
+            return future.result()
+
+    def report(self):
+        """Log the breakdown (once); background phases overlap the others"""
+        if self.reported:
+            return
+        self.reported = True
+
+        total = time.perf_counter() - self.started
+        with self.lock:
+            phases = list(self.phases)
+        breakdown = ', '.join(
+            f"{name} {seconds * 1000:.0f}ms{' (background)' if background else ''}"
+            for name, seconds, background in phases
+        )
+        self.logger.info(f"Startup: ready in {total * 1000:.0f}ms - {breakdown}")
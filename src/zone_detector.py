@@ -4,12 +4,16 @@ Zone Detector - Simple dog detection in forbidden zones (like sofa)
 Much simpler and more accurate than pose-based detection
 """
 
+import time
+IMPORT_STARTED = time.perf_counter()  # startup timing includes the imports
+
 import cv2
 import numpy as np
 import json
 import logging
-import time
+import signal
 import sys
+from concurrent.futures import Future
 from pathlib import Path
 from datetime import datetime
 
@@ -19,32 +23,125 @@ sys.path.append(str(Path(__file__).parent))
 import config
 from notifier import Notifier
 from dog_trainer import DogTrainer
+from frame_pipeline import FramePipeline
+from motion_gate import MotionGate
+from zone_mask import ZoneMaskIndex
+from zone_overlay import ZoneOverlay
+from inference_engine import ENGINES, load_model
+from inference_scheduler import InferenceScheduler
+from dog_tracker import DogTracker
+from postprocess import DOG_CLASS, empty_detections, filter_class, result_to_array
+from metrics import DetectorMetrics, start_server
+from profiling import LoopProfiler
+from offline_video import OfflineVideo, OfflineEventLog, ProgressReporter, print_summary
+from startup import StartupTimer
+
+IMPORTS_DONE = time.perf_counter()
 
 
 class ZoneDetector:
     """Detects when dog enters forbidden zones"""
 
-    def __init__(self, training_mode='standard', enable_trainer=True):
+    def __init__(self, training_mode='standard', enable_trainer=True, pipelined=None,
+                 roi_inference=None, headless=False, zone_config_file=None,
+                 camera_source=None, model=None, name=None, engine=None, int8=None,
+                 metrics_port=None, profile_frames=None, motion_gating=None,
+                 adaptive_rate=None):
+        """
+        Args:
+            zone_config_file: Explicit zone config path (default: search known locations)
+            camera_source: Camera index or video path overriding the zone/user config
+            model: Detection model to share (multi-camera mode); may be the Future
+                   of a load still in progress
+            name: Camera name, used for logs, windows and alerts (multi-camera mode)
+            engine: Inference backend ('torch', 'onnx', 'openvino')
+            int8: Load the INT8 model built by quantize.py
+            metrics_port: Serve Prometheus metrics on this port (default: config.METRICS)
+            profile_frames: Profile this many frames after warmup, report and stop
+            motion_gating: Skip inference on static frames (default: config.MOTION_GATE)
+            adaptive_rate: Lower the inference rate while no dog is near a zone
+                           (default: config.INFERENCE_SCHEDULER)
+        """
+        self.name = name
+
         # Initialize zones list first (will be populated by load_zones)
         self.zones = []
+        self.zone_index = ZoneMaskIndex()
+        self.zone_overlay = ZoneOverlay()
 
         self.setup_logging()
-        self.load_zones()  # This populates self.zones
-        self.load_user_config()
+        self.startup = StartupTimer(self.logger, started=IMPORT_STARTED)
+        self.startup.record('imports', IMPORTS_DONE - IMPORT_STARTED)
+
+        with self.startup.phase('config'):
+            self.load_zones(zone_config_file)  # This populates self.zones
+            self.load_user_config()
+        if camera_source is not None:
+            self.camera_index = camera_source
+
+        # Zone-ROI cropped inference (set before the model warmup uses it)
+        self.roi_inference = (config.ROI_INFERENCE['enabled']
+                              if roi_inference is None else roi_inference)
+        self.inference_roi = None
+        self.inference_roi_shape = None
+        if self.roi_inference:
+            self.logger.info("ROI inference enabled: model runs on the zone area only")
+
+        # Initialize YOLO for object detection (not pose); loading and warming
+        # up in the background overlaps the rest of startup and the camera open
+        self.engine = engine or config.INFERENCE_ENGINE
+        self.int8 = config.INFERENCE_INT8 if int8 is None else int8
+        self._model = None
+        self.model_loader = None
+        if isinstance(model, Future):
+            self.model_loader = model
+        elif model is not None:
+            self._model = model
+        elif config.STARTUP['background_model_load']:
+            self.model_loader = self.startup.background('model', self.setup_model, True)
+        else:
+            self._model = self.setup_model()
 
         # Initialize components
-        self.notifier = Notifier(config)
+        with self.startup.phase('notifier'):
+            self.notifier = Notifier(config)
 
         # Initialize trainer for active alerts
         self.enable_trainer = enable_trainer
         if enable_trainer:
-            self.trainer = DogTrainer(training_mode=training_mode)
+            with self.startup.phase('trainer'):
+                self.trainer = DogTrainer(training_mode=training_mode,
+                                          audio_config=config.AUDIO_ENGINE)
             self.logger.info(f"Trainer initialized in '{training_mode}' mode")
         else:
             self.trainer = None
 
-        # Initialize YOLO for object detection (not pose)
-        self.setup_model()
+        # Motion gate (skips inference on static frames)
+        if motion_gating is None:
+            motion_gating = config.MOTION_GATE['enabled']
+        if motion_gating:
+            self.motion_gate = MotionGate(self.zones, config.MOTION_GATE)
+            self.logger.info("Motion gate enabled")
+        else:
+            self.motion_gate = None
+        self.last_dog_boxes = empty_detections()
+        self.last_violation = None
+
+        # Adaptive inference rate (IDLE / DOG_VISIBLE / NEAR_ZONE)
+        if adaptive_rate is None:
+            adaptive_rate = config.INFERENCE_SCHEDULER['enabled']
+        if adaptive_rate:
+            self.scheduler = InferenceScheduler(config.INFERENCE_SCHEDULER)
+            self.logger.info("Adaptive inference rate enabled")
+        else:
+            self.scheduler = None
+
+        # Tracker (predicts dog boxes on frames without inference)
+        if config.TRACKER['enabled']:
+            self.tracker = DogTracker(config.TRACKER)
+        else:
+            self.tracker = None
+        self.last_track_ids = []
 
         # Detection state
         self.last_alert_time = 0
@@ -55,6 +152,34 @@ class ZoneDetector:
 
         # Video capture
         self.cap = None
+        self.window_name = 'Zone Detector' if name is None else f'Zone Detector - {name}'
+
+        # Headless mode (no rendering/display, signal-driven control)
+        self.headless = headless
+        self.stop_requested = False
+        self.snapshot_requested = False
+
+        # Pipelined capture/inference
+        self.pipelined = config.PIPELINE['enabled'] if pipelined is None else pipelined
+        self.pipeline = None
+
+        # Profiling (--profile N); the inference thread would escape cProfile
+        self.profiler = None
+        if profile_frames:
+            self.profiler = LoopProfiler(profile_frames, name or 'zone_detector', config.PROFILING)
+            if self.pipelined:
+                self.logger.info("Profiling: running sequentially (pipeline disabled)")
+                self.pipelined = False
+
+        # Metrics (per-frame counters are cheap; queues are read only when scraped)
+        self.metrics = DetectorMetrics(name or 'default')
+        self.metrics.frames_in_zone.set_function(lambda: self.frames_in_zone)
+        self.metrics.watch_notifier(self.notifier)
+        self.metrics.watch_drops(self.pipeline_drops)
+        if metrics_port is None and config.METRICS['enabled']:
+            metrics_port = config.METRICS['port']
+        if metrics_port:
+            start_server(config.METRICS['host'], metrics_port)
 
     def setup_logging(self):
         """Configure logging"""
@@ -69,16 +194,22 @@ class ZoneDetector:
                 logging.StreamHandler()
             ]
         )
-        self.logger = logging.getLogger(__name__)
+        if self.name is None:
+            self.logger = logging.getLogger(__name__)
+        else:
+            self.logger = logging.getLogger(f"{__name__}.{self.name}")
 
-    def load_zones(self):
+    def load_zones(self, zone_config_file=None):
         """Load forbidden zones from config"""
-        # Try multiple locations for zone config
-        possible_paths = [
-            Path(__file__).parent / 'zone_config.json',  # src/zone_config.json
-            Path(__file__).parent.parent / 'zone_config.json',  # ../zone_config.json
-            Path('zone_config.json'),  # ./zone_config.json
-        ]
+        if zone_config_file is not None:
+            possible_paths = [Path(zone_config_file)]
+        else:
+            # Try multiple locations for zone config
+            possible_paths = [
+                Path(__file__).parent / 'zone_config.json',  # src/zone_config.json
+                Path(__file__).parent.parent / 'zone_config.json',  # ../zone_config.json
+                Path('zone_config.json'),  # ./zone_config.json
+            ]
 
         zone_config_file = None
         for path in possible_paths:
@@ -136,20 +267,59 @@ class ZoneDetector:
             except Exception as e:
                 self.logger.warning(f"Could not load user config: {e}")
 
-    def setup_model(self):
-        """Initialize YOLO model for object detection"""
-        self.logger.info("Loading YOLO model...")
+    def setup_model(self, background=False):
+        """Load the YOLO detection model and warm it up (returns the model)"""
+        precision = 'INT8' if self.int8 else 'FP32'
+        self.logger.info(f"Loading YOLO model ({self.engine}, {precision})...")
 
         try:
-            from ultralytics import YOLO
             # Use regular detection model (faster than pose)
-            self.model = YOLO('yolov8n.pt')  # nano model
+            with self.startup.phase('model load', background):
+                model = load_model('yolov8n.pt', self.engine, task='detect',
+                                   int8=self.int8)  # nano model
             self.logger.info("YOLO model loaded successfully")
 
         except Exception as e:
             self.logger.error(f"Failed to load model: {e}")
             raise
 
+        with self.startup.phase('warmup', background):
+            self.warmup_model(model)
+        return model
+
+    def warmup_model(self, model):
+        """
+        Run the model on blank frames before monitoring starts
+
+        The first calls pay for lazy initialisation (graph compile, memory
+        allocation); the input has the configured camera size and goes through
+        the same ROI crop as real frames, so the warmed-up shapes match.
+        """
+        runs = config.STARTUP['warmup_inferences']
+        if runs <= 0:
+            return
+
+        frame = np.zeros((config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3), dtype=np.uint8)
+        model_input, _, model_kwargs = self.prepare_model_input(frame)
+        for _ in range(runs):
+            model(model_input, conf=0.4, classes=[DOG_CLASS], verbose=False, **model_kwargs)
+
+    @property
+    def model(self):
+        """Detection model; waits for the background load on first use"""
+        if self._model is None and self.model_loader is not None:
+            self._model = self.model_loader.result()
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
+    def wait_for_model(self):
+        """Block until the model is loaded and warmed up (timed as a phase)"""
+        if self._model is None and self.model_loader is not None:
+            self._model = self.startup.wait('model wait', self.model_loader)
+
     def setup_camera(self):
         """Initialize camera/video source"""
         self.logger.info(f"Initializing camera: {self.camera_index}")
@@ -184,57 +354,165 @@ class ZoneDetector:
 
         return inside
 
-    def check_dog_in_zones(self, boxes):
-        """Check if any detected dog is in forbidden zone"""
+    def check_dog_in_zones(self, boxes, frame_shape=None):
+        """
+        Check if any detected dog is in forbidden zone
+
+        Uses the rasterized zone index: the box center is a single mask lookup
+        and the box/zone overlap fraction comes from a summed-area table.
+        """
         if boxes is None or len(boxes) == 0:
             return None
 
-        for zone in self.zones:
-            zone_points = zone['points']
+        if frame_shape is None:
+            frame_shape = (config.CAMERA_HEIGHT, config.CAMERA_WIDTH)
+        self.zone_index.ensure(self.zones, frame_shape)
 
-            # Check each detected object
-            for box in boxes:
-                # Get box center point
-                x1, y1, x2, y2 = box[:4]
-                center_x = int((x1 + x2) / 2)
-                center_y = int((y1 + y2) / 2)
+        return self.zone_index.find_violation(
+            self.zones, boxes, config.ZONE_INDEX['min_overlap_fraction']
+        )
 
-                # Check if center is in zone
-                if self.point_in_polygon((center_x, center_y), zone_points):
-                    return {
-                        'zone': zone,
-                        'box': box,
-                        'center': (center_x, center_y)
-                    }
+    def get_inference_roi(self, frame_shape):
+        """Union bounding box of all zones plus padding, clipped to the frame"""
+        shape = tuple(frame_shape[:2])
+        if self.inference_roi_shape == shape:
+            return self.inference_roi
+
+        height, width = shape
+        points = np.array([p for zone in self.zones for p in zone['points']], dtype=np.int32)
+        padding = config.ROI_INFERENCE['padding_px']
+
+        x1 = max(int(points[:, 0].min()) - padding, 0)
+        y1 = max(int(points[:, 1].min()) - padding, 0)
+        x2 = min(int(points[:, 0].max()) + padding, width)
+        y2 = min(int(points[:, 1].max()) + padding, height)
+
+        self.inference_roi = (x1, y1, x2, y2)
+        self.inference_roi_shape = shape
+        area_pct = (x2 - x1) * (y2 - y1) / (width * height)
+        self.logger.info(f"Inference ROI: ({x1}, {y1}) -> ({x2}, {y2}), {area_pct:.0%} of frame")
+        return self.inference_roi
+
+    def prepare_model_input(self, frame):
+        """
+        Build the model input for a frame
+
+        Returns:
+            Tuple of (model_input, box_offset, model_kwargs); box_offset maps
+            boxes from the model input back to frame coordinates (or None)
+        """
+        # Crop to the zone area and map boxes back afterwards
+        if self.roi_inference and self.zones:
+            x1, y1, x2, y2 = self.get_inference_roi(frame.shape)
+            model_kwargs = {}
+            if config.ROI_INFERENCE['imgsz']:
+                model_kwargs['imgsz'] = config.ROI_INFERENCE['imgsz']
+            offset = np.array([x1, y1, x1, y1], dtype=np.float32)
+            return frame[y1:y2, x1:x2], offset, model_kwargs
+
+        return frame, None, {}
+
+    def extract_dog_boxes(self, result, offset=None):
+        """Dog detections (N x 6 [x1, y1, x2, y2, conf, cls], frame coordinates)"""
+        return filter_class(result_to_array(result, offset), DOG_CLASS)
+
+    def detect_dogs(self, frame):
+        """Run object detection and return dog detections (N x 6, frame coordinates)"""
+        model_input, offset, model_kwargs = self.prepare_model_input(frame)
+        # Only the dog class leaves the model (cheaper NMS, nothing to filter)
+        results = self.model(model_input, conf=0.4, classes=[DOG_CLASS], verbose=False,
+                             **model_kwargs)
 
-        return None
+        if results and len(results) > 0:
+            return self.extract_dog_boxes(results[0], offset)
+        return empty_detections()
+
+    def needs_inference(self, frame, current_time):
+        """Whether the model must run on this frame (False = reuse last detections)"""
+        # Rate limit by dog presence first, then skip static frames
+        if self.scheduler and not self.scheduler.should_infer(current_time):
+            return False
+        if self.motion_gate is None:
+            return True
+        gate_start = time.perf_counter()
+        should_infer = self.motion_gate.should_infer(frame, current_time)
+        self.metrics.record_stage('motion_gate', time.perf_counter() - gate_start)
+        return should_infer
+
+    def record_detections(self, frame, dog_boxes, inference_seconds, current_time):
+        """Store fresh model detections for reuse on skipped frames"""
+        self.metrics.record_inference(inference_seconds)
+        if self.motion_gate:
+            self.motion_gate.record_inference(inference_seconds)
+        if self.scheduler:
+            self.zone_index.ensure(self.zones, frame.shape)
+            self.scheduler.update(dog_boxes, self.zone_index, current_time)
+        self.last_dog_boxes = dog_boxes
 
     def process_frame(self, frame, current_time):
-        """Process a single frame"""
-        # Run object detection
-        results = self.model(frame, conf=0.4, verbose=False)
-
-        dog_boxes = []
+        """
+        Process a single frame
+
+        Frames skipped by the scheduler or motion gate get tracker-predicted
+        boxes, so the dwell counter and cooldown keep advancing per frame.
+        """
+        fresh_boxes = None
+        if self.needs_inference(frame, current_time):
+            inference_start = time.perf_counter()
+            fresh_boxes = self.detect_dogs(frame)
+            self.record_detections(frame, fresh_boxes, time.perf_counter() - inference_start,
+                                   current_time)
+
+        dog_boxes = self.track_dogs(fresh_boxes, current_time)
+        return self.update_zone_state(frame, dog_boxes, current_time,
+                                      inferred=fresh_boxes is not None)
+
+    def track_dogs(self, fresh_boxes, current_time):
+        """
+        Dog boxes for this frame
+
+        Args:
+            fresh_boxes: Model detections, or None when inference was skipped
+        Returns:
+            Tracked boxes (predicted on skipped frames), or the raw/last
+            detections when the tracker is disabled
+        """
+        if self.tracker is None:
+            return self.last_dog_boxes if fresh_boxes is None else fresh_boxes
+
+        if fresh_boxes is None:
+            dog_boxes, self.last_track_ids = self.tracker.predict(current_time)
+        else:
+            dog_boxes, self.last_track_ids = self.tracker.update(fresh_boxes, current_time)
+        return dog_boxes
+
+    def update_zone_state(self, frame, dog_boxes, current_time, inferred=True):
+        """
+        Update dwell counter and alert state from this frame's dog boxes
+
+        Args:
+            inferred: Whether the model ran on this frame; on skipped frames an
+                      ongoing violation and the dwell counter are held: only
+                      model runs count towards min_frames_threshold or end it
+        """
+        self.metrics.frames.inc()
         violation = None
 
-        # Process results
-        if results and len(results) > 0:
-            result = results[0]
+        # Check if dog in forbidden zone
+        if len(dog_boxes) > 0:
+            violation = self.check_dog_in_zones(dog_boxes, frame.shape)
 
-            if hasattr(result, 'boxes') and result.boxes is not None:
-                # Filter for dogs (class 16 in COCO dataset)
-                for box in result.boxes:
-                    cls = int(box.cls[0])
-                    if cls == 16:  # dog class
-                        dog_boxes.append(box.xyxy[0].cpu().numpy())
+            if violation and self.tracker:
+                violation['track_id'] = self.last_track_ids[violation['box_index']]
 
-        # Check if dog in forbidden zone
-        if dog_boxes:
-            violation = self.check_dog_in_zones(dog_boxes)
+        if violation is None and not inferred:
+            violation = self.last_violation
+        self.last_violation = violation
 
+        if inferred:
             if violation:
                 self.frames_in_zone += 1
-            else:
+            elif len(dog_boxes) > 0:
                 self.frames_in_zone = 0
 
         # Check if alert threshold met
@@ -248,9 +526,7 @@ class ZoneDetector:
         return frame, dog_boxes, violation, should_alert
 
     def draw_zones(self, frame):
-        """Draw forbidden zones on frame"""
-        overlay = frame.copy()
-
+        """Draw forbidden zones on frame (blends the cached zone overlay)"""
         # Debug: show zone count
         cv2.putText(frame, f"Zonas: {len(self.zones)}", (10, frame.shape[0] - 20),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
@@ -260,23 +536,9 @@ class ZoneDetector:
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 3)
             return frame
 
-        for zone in self.zones:
-            points = np.array(zone['points'], dtype=np.int32)
-            color = tuple(zone['color'])
-
-            # Fill zone with transparency
-            cv2.fillPoly(overlay, [points], color)
-
-            # Draw border (thicker for visibility)
-            cv2.polylines(frame, [points], True, color, 5)
-
-            # Draw zone name
-            x, y = zone['points'][0]
-            cv2.putText(frame, zone['name'], (x, y - 10),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.0, color, 3)
-
-        # Blend overlay with more opacity for visibility
-        cv2.addWeighted(overlay, 0.4, frame, 0.6, 0, frame)
+        # Fill, borders and names are rendered once; only zone regions are blended
+        self.zone_overlay.ensure(self.zones, frame.shape)
+        self.zone_overlay.apply(frame)
 
         return frame
 
@@ -332,7 +594,10 @@ class ZoneDetector:
     def run(self):
         """Main detection loop"""
         self.logger.info("Starting Zone Detector...")
-        self.setup_camera()
+        with self.startup.phase('camera open'):
+            self.setup_camera()
+        self.wait_for_model()
+        self.startup.report()
 
         print("\n" + "=" * 60)
         print("🚫 Zone Detector - Detecção de Zona Proibida")
@@ -349,91 +614,328 @@ class ZoneDetector:
             print(f"  - {zone['name']}: {len(zone['points'])} pontos")
             print(f"    Coords: {zone['points'][0]} -> {zone['points'][2]}")
 
-        print("\nPressione 'q' para sair")
-        print("Pressione 's' para salvar snapshot")
+        if self.headless:
+            print("\nModo headless: sem janela de vídeo")
+            print("SIGTERM/SIGINT para sair, SIGUSR1 para salvar snapshot")
+        else:
+            print("\nPressione 'q' para sair")
+            print("Pressione 's' para salvar snapshot")
         print("=" * 60 + "\n")
 
+        self.install_signal_handlers()
+
+        try:
+            if self.pipelined:
+                self.run_pipelined()
+            else:
+                self.run_sequential()
+
+        except KeyboardInterrupt:
+            self.logger.info("Interrupted by user")
+        except Exception as e:
+            self.logger.error(f"Error in main loop: {e}", exc_info=True)
+        finally:
+            self.cleanup()
+
+    def run_sequential(self):
+        """Capture, detect and render one frame at a time on the main thread"""
         frame_count = 0
         start_time = time.time()
         fps = 0
 
-        try:
-            while True:
-                ret, frame = self.cap.read()
-                if not ret:
-                    self.logger.warning("Failed to read frame")
-                    break
+        while not self.stop_requested:
+            read_start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                self.logger.warning("Failed to read frame")
+                break
+            self.metrics.record_stage('capture', time.perf_counter() - read_start)
 
-                current_time = time.time()
-                frame_count += 1
+            if self.profiler and self.profiler.tick():
+                break
 
-                # Calculate FPS
-                if frame_count % 30 == 0:
-                    fps = 30 / (current_time - start_time)
-                    start_time = current_time
+            current_time = time.time()
+            frame_count += 1
 
-                # Process frame
-                processed_frame, dog_boxes, violation, should_alert = self.process_frame(
-                    frame, current_time
-                )
+            # Calculate FPS
+            if frame_count % 30 == 0:
+                fps = 30 / (current_time - start_time)
+                start_time = current_time
 
-                # Draw zones
-                processed_frame = self.draw_zones(processed_frame)
+            # Process frame
+            processed_frame, dog_boxes, violation, should_alert = self.process_frame(
+                frame, current_time
+            )
 
-                # Draw detections
-                processed_frame = self.draw_detections(processed_frame, dog_boxes, violation)
+            if not self.handle_frame(processed_frame, dog_boxes, violation,
+                                     should_alert, self.frames_in_zone, fps):
+                break
 
-                # Draw info
-                processed_frame = self.draw_info(processed_frame, violation, fps)
+    def run_pipelined(self):
+        """Capture and inference on worker threads, render/notify on the main thread"""
+        self.logger.info("Pipelined mode: capture and inference run on separate threads")
+
+        self.pipeline = FramePipeline(
+            self.cap,
+            self.process_frame_for_pipeline,
+            capture_queue_size=config.PIPELINE['capture_queue_size'],
+            result_queue_size=config.PIPELINE['result_queue_size'],
+            # process_frame already started the cooldown for an alerting frame:
+            # dropping it would silence the alert for the whole cooldown
+            keep_result=lambda result: result[3],
+            on_read=lambda seconds: self.metrics.record_stage('capture', seconds)
+        )
+        self.pipeline.start()
 
-                # Active training alerts
-                if self.enable_trainer and self.trainer:
-                    if violation:
-                        # Dog is in zone - alert to train
-                        self.trainer.alert(self.frames_in_zone)
-                        self.was_in_zone = True
-                    else:
-                        # Dog left zone - positive reinforcement
-                        if self.was_in_zone and self.frames_in_zone > 30:
-                            self.trainer.positive_reinforcement()
-                        self.was_in_zone = False
+        frame_count = 0
+        start_time = time.time()
+        last_stats_time = start_time
+        fps = 0
 
-                # Alert if needed (logging/notification)
-                if should_alert and violation:
-                    alert_info = {
-                        'detection_type': 'zone_violation',
-                        'zone_name': violation['zone']['name'],
-                        'confidence': 1.0,
-                        'frames_detected': self.frames_in_zone
-                    }
-                    self.notifier.notify(processed_frame, alert_info)
-
-                # Display
-                cv2.imshow('Zone Detector', processed_frame)
-
-                # Handle keys
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
+        while self.pipeline.running and not self.stop_requested:
+            result = self.pipeline.get_result(timeout=0.1)
+            if result is None:
+                continue
+
+            processed_frame, dog_boxes, violation, should_alert, frames_in_zone = result
+
+            current_time = time.time()
+            frame_count += 1
+
+            # Calculate FPS (of processed frames, not camera frames)
+            if frame_count % 30 == 0:
+                fps = 30 / (current_time - start_time)
+                start_time = current_time
+
+            if current_time - last_stats_time >= config.PIPELINE['stats_interval_seconds']:
+                self.log_pipeline_stats()
+                last_stats_time = current_time
+
+            if not self.handle_frame(processed_frame, dog_boxes, violation,
+                                     should_alert, frames_in_zone, fps):
+                break
+
+    def run_offline(self, video_path, stride=None):
+        """
+        Process a recorded video as fast as possible
+
+        Timing (cooldown, dwell, scheduler, tracker) follows the video
+        timestamps; zone entries/exits and alerts go to an event log.
+        """
+        stride = stride or config.OFFLINE['frame_stride']
+        self.headless = True
+        self.install_signal_handlers()
+
+        # Dwell threshold is in analysed frames: keep the same dwell time
+        self.min_frames_threshold = max(1, round(self.min_frames_threshold / stride))
+
+        # Video time starts at 0: no cooldown/keepalive may carry over from
+        # the wall-clock defaults, or the first seconds of the clip are muted
+        self.last_alert_time = float('-inf')
+        if self.motion_gate:
+            self.motion_gate.last_inference_time = float('-inf')
+
+        with self.startup.phase('video open'):
+            video = OfflineVideo(video_path, stride)
+        self.wait_for_model()
+        self.startup.report()
+        events = OfflineEventLog(video_path, config.OFFLINE)
+        progress = ProgressReporter(video, config.OFFLINE['progress_interval_seconds'])
+        print(f"\n🎞️  Modo offline: {video_path} (stride {video.stride})")
+        print(f"Eventos: {events.output_dir / 'events.csv'}\n")
+
+        current_zone = None
+        video_seconds = 0.0
+        try:
+            for frame_index, frame, video_seconds in video.frames():
+                if self.stop_requested:
+                    break
+                if self.profiler and self.profiler.tick():
                     break
-                elif key == ord('s'):
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    filename = f"data/snapshot_{timestamp}.jpg"
-                    cv2.imwrite(filename, processed_frame)
-                    self.logger.info(f"Snapshot saved: {filename}")
 
+                processed_frame, dog_boxes, violation, should_alert = self.process_frame(
+                    frame, video_seconds
+                )
+
+                zone_name = violation['zone']['name'] if violation else None
+                track_id = violation.get('track_id') if violation else None
+                if zone_name != current_zone:
+                    if current_zone is not None:
+                        events.log(video_seconds, frame_index, 'zone_exit', current_zone)
+                    if zone_name is not None:
+                        events.log(video_seconds, frame_index, 'zone_enter', zone_name,
+                                   track_id=track_id)
+                    current_zone = zone_name
+
+                if should_alert and violation:
+                    snapshot_path = events.save_snapshot(
+                        self.render_overlays(processed_frame.copy(), dog_boxes, violation, 0),
+                        video_seconds, 'zone_violation'
+                    )
+                    events.log(video_seconds, frame_index, 'zone_violation', zone_name,
+                               confidence=float(violation['box'][4]), track_id=track_id,
+                               snapshot_path=snapshot_path)
+
+                progress.update(video_seconds)
+
+            if current_zone is not None:
+                events.log(video_seconds, video.frame_index, 'zone_exit', current_zone)
         except KeyboardInterrupt:
             self.logger.info("Interrupted by user")
-        except Exception as e:
-            self.logger.error(f"Error in main loop: {e}", exc_info=True)
         finally:
+            events.close()
+            video.release()
+            print_summary(video, events, video_seconds)
             self.cleanup()
 
+    def process_frame_for_pipeline(self, frame, capture_time):
+        """Inference-stage wrapper that snapshots the dwell counter with its frame"""
+        processed_frame, dog_boxes, violation, should_alert = self.process_frame(
+            frame, capture_time
+        )
+        return processed_frame, dog_boxes, violation, should_alert, self.frames_in_zone
+
+    def pipeline_drops(self):
+        """Frames dropped per pipeline stage (metrics)"""
+        if self.pipeline is None:
+            return {}
+        stats = self.pipeline.stats()
+        return {'capture': stats['capture_dropped'], 'result': stats['result_dropped']}
+
+    def log_pipeline_stats(self):
+        """Log per-stage frame and drop counters"""
+        if self.pipeline is None:
+            return
+
+        stats = self.pipeline.stats()
+        self.logger.info(
+            f"Pipeline: captured={stats['frames_captured']} "
+            f"(dropped {stats['capture_dropped']}), "
+            f"inferred={stats['frames_inferred']} "
+            f"(dropped {stats['result_dropped']}), "
+            f"rendered={stats['frames_rendered']}"
+        )
+
+    def install_signal_handlers(self):
+        """Signal-based control (replaces keyboard control when headless)"""
+        def request_stop(signum, frame):
+            self.logger.info(f"Received signal {signum}, stopping...")
+            self.stop_requested = True
+
+        def request_snapshot(signum, frame):
+            self.snapshot_requested = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        if self.headless:
+            signal.signal(signal.SIGINT, request_stop)
+        if hasattr(signal, 'SIGUSR1'):  # Not available on Windows
+            signal.signal(signal.SIGUSR1, request_snapshot)
+
+    def render_overlays(self, frame, dog_boxes, violation, fps):
+        """Draw zones, detections and status info onto the frame"""
+        # Draw zones
+        frame = self.draw_zones(frame)
+
+        # Draw detections
+        frame = self.draw_detections(frame, dog_boxes, violation)
+
+        # Draw info
+        frame = self.draw_info(frame, violation, fps)
+
+        return frame
+
+    def save_manual_snapshot(self, frame):
+        """Save a snapshot requested by the user (key 's' or SIGUSR1)"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"data/snapshot_{timestamp}.jpg"
+        cv2.imwrite(filename, frame)
+        self.logger.info(f"Snapshot saved: {filename}")
+
+    def handle_frame(self, processed_frame, dog_boxes, violation, should_alert,
+                     frames_in_zone, fps):
+        """
+        Render, train, notify and display one processed frame
+
+        In headless mode nothing is drawn unless a snapshot is written.
+
+        Returns:
+            False if the user asked to quit, True otherwise
+        """
+        self.metrics.fps.set(fps)
+        if not self.headless:
+            render_start = time.perf_counter()
+            processed_frame = self.render_overlays(processed_frame, dog_boxes, violation, fps)
+            self.metrics.record_stage('render', time.perf_counter() - render_start)
+
+        # Active training alerts
+        if self.enable_trainer and self.trainer:
+            if violation:
+                # Dog is in zone - alert to train
+                self.trainer.alert(frames_in_zone)
+                self.was_in_zone = True
+            else:
+                # Dog left zone - positive reinforcement
+                if self.was_in_zone and frames_in_zone > 30:
+                    self.trainer.positive_reinforcement()
+                self.was_in_zone = False
+
+        # Overlays for snapshots are drawn lazily when headless
+        render = None
+        if self.headless:
+            def render(frame):
+                return self.render_overlays(frame.copy(), dog_boxes, violation, fps)
+
+        # Alert if needed (logging/notification)
+        if should_alert and violation:
+            alert_info = {
+                'detection_type': 'zone_violation',
+                'zone_name': violation['zone']['name'],
+                'confidence': 1.0,
+                'frames_detected': frames_in_zone
+            }
+            if violation.get('track_id') is not None:
+                alert_info['track_id'] = violation['track_id']
+            if self.name is not None:
+                alert_info['camera'] = self.name
+            self.metrics.alert(violation['zone']['name'])
+            notify_start = time.perf_counter()
+            self.notifier.notify(processed_frame, alert_info, render=render)
+            self.metrics.record_stage('notify', time.perf_counter() - notify_start)
+
+        if self.snapshot_requested:
+            self.snapshot_requested = False
+            self.save_manual_snapshot(render(processed_frame) if render else processed_frame)
+
+        if self.headless:
+            return not self.stop_requested
+
+        # Display
+        cv2.imshow(self.window_name, processed_frame)
+
+        # Handle keys
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            return False
+        elif key == ord('s'):
+            self.save_manual_snapshot(processed_frame)
+
+        return True
+
     def cleanup(self):
         """Clean up resources"""
         self.logger.info("Cleaning up...")
+        if self.profiler:
+            self.profiler.close()
+        if self.pipeline:
+            self.pipeline.stop()
+            self.log_pipeline_stats()
         if self.cap:
             self.cap.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
+        self.notifier.close()
+        if self.trainer:
+            self.trainer.close()
         self.logger.info("Shutdown complete")
 
 
@@ -447,10 +949,45 @@ def main():
                        help='Training mode: gentle (soft alerts), standard (normal), intensive (strong), silent (no trainer)')
     parser.add_argument('--no-trainer', action='store_true',
                        help='Disable active training alerts (only log violations)')
+    parser.add_argument('--pipeline', action='store_true',
+                       help='Run capture and inference on separate threads (latest frame wins)')
+    parser.add_argument('--roi', action='store_true',
+                       help='Run the model only on the area around the configured zones')
+    parser.add_argument('--headless', action='store_true',
+                       help='No video window or overlays (Docker/servers); control via signals')
+    parser.add_argument('--engine', choices=ENGINES, default=None,
+                       help='Inference backend (default: config.INFERENCE_ENGINE)')
+    parser.add_argument('--int8', action='store_true',
+                       help='Use the INT8 model built by quantize.py (onnx/openvino engines)')
+    parser.add_argument('--cameras', metavar='FILE',
+                       help='JSON list of cameras (name, source, zone_config) sharing one batched model')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve Prometheus metrics on this port (http://127.0.0.1:PORT/metrics)')
+    parser.add_argument('--profile', type=int, metavar='N', default=None,
+                       help='Profile N frames after warmup, write .prof/.folded files and exit')
+    parser.add_argument('--video', metavar='PATH',
+                       help='Process a recorded video offline (no display, no trainer, video timestamps)')
+    parser.add_argument('--stride', type=int, default=None,
+                       help='With --video: analyse every Nth frame (default: config.OFFLINE)')
+    parser.add_argument('--no-motion-gate', action='store_true',
+                       help='Run the model on every frame, even when nothing moves near the zones')
+    parser.add_argument('--no-scheduler', action='store_true',
+                       help='Keep a fixed inference rate instead of slowing down while no dog is near a zone')
 
     args = parser.parse_args()
+    if args.video and args.cameras:
+        parser.error('--video cannot be combined with --cameras')
 
     try:
+        if args.video:
+            detector = ZoneDetector(enable_trainer=False, headless=True,
+                                    roi_inference=args.roi or None, engine=args.engine,
+                                    int8=args.int8 or None, profile_frames=args.profile,
+                                    motion_gating=False if args.no_motion_gate else None,
+                                    adaptive_rate=False if args.no_scheduler else None)
+            detector.run_offline(args.video, args.stride)
+            return
+
         # Silent mode = no trainer
         enable_trainer = not args.no_trainer and args.mode != 'silent'
         training_mode = args.mode if args.mode != 'silent' else 'standard'
@@ -461,7 +998,29 @@ def main():
         else:
             print("\n📊 Silent mode: Only logging violations")
 
-        detector = ZoneDetector(training_mode=training_mode, enable_trainer=enable_trainer)
+        if args.cameras:
+            from multi_camera import MultiCameraDetector
+            detector = MultiCameraDetector(args.cameras, training_mode=training_mode,
+                                           enable_trainer=enable_trainer,
+                                           roi_inference=args.roi or None,
+                                           headless=args.headless,
+                                           engine=args.engine,
+                                           int8=args.int8 or None,
+                                           metrics_port=args.metrics_port,
+                                           profile_frames=args.profile,
+                                           motion_gating=False if args.no_motion_gate else None,
+                                           adaptive_rate=False if args.no_scheduler else None)
+        else:
+            detector = ZoneDetector(training_mode=training_mode, enable_trainer=enable_trainer,
+                                    pipelined=args.pipeline or None,
+                                    roi_inference=args.roi or None,
+                                    headless=args.headless,
+                                    engine=args.engine,
+                                    int8=args.int8 or None,
+                                    metrics_port=args.metrics_port,
+                                    profile_frames=args.profile,
+                                    motion_gating=False if args.no_motion_gate else None,
+                                    adaptive_rate=False if args.no_scheduler else None)
         detector.run()
     except Exception as e:
         print(f"Fatal error: {e}")
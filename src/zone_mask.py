@@ -0,0 +1,142 @@
+"""
+Zone Mask Index - Rasterized zone lookup for fast dog-in-zone checks
+Replaces per-box polygon ray casting with array indexing and summed-area tables
+"""
+
+import cv2
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ZoneMaskIndex:
+    """
+    Zones precompiled into a per-pixel label mask at capture resolution
+
+    label_mask[y, x] is 0 outside every zone, or (zone index + 1). Where zones
+    overlap, the zone listed first in zone_config.json wins, matching the order
+    in which zones were checked before. One summed-area table per zone gives the
+    number of zone pixels inside any rectangle in O(1).
+    """
+
+    def __init__(self):
+        self.label_mask = None
+        self.integrals = []
+        self.any_zone_integral = None
+        self.frame_shape = None
+        self.zones = None  # zone list the index was built from (kept so its id stays unique)
+        self.zone_count = 0
+        self.rebuild_count = 0
+
+    def ensure(self, zones, frame_shape):
+        """
+        Rebuild the index if the resolution or the zone list changed
+
+        Checked every frame, so only the list identity and length are compared:
+        loading zones replaces the list; call invalidate() after editing it in place.
+        """
+        shape = tuple(frame_shape[:2])
+        if shape == self.frame_shape and zones is self.zones and len(zones) == self.zone_count:
+            return
+
+        self.build(zones, shape)
+        self.zones = zones
+        self.zone_count = len(zones)
+
+    def invalidate(self):
+        """Force a rebuild on the next ensure()"""
+        self.zones = None
+
+    def build(self, zones, frame_shape):
+        """Rasterize zones into the label mask and per-zone summed-area tables"""
+        height, width = frame_shape[:2]
+        label_mask = np.zeros((height, width), dtype=np.int16)
+
+        # Paint in reverse so earlier zones take priority where they overlap
+        for zone_id in range(len(zones), 0, -1):
+            points = np.array(zones[zone_id - 1]['points'], dtype=np.int32)
+            cv2.fillPoly(label_mask, [points], zone_id)
+
+        self.integrals = []
+        for zone_id in range(1, len(zones) + 1):
+            zone_pixels = (label_mask == zone_id).astype(np.uint8)
+            self.integrals.append(cv2.integral(zone_pixels))
+        self.any_zone_integral = cv2.integral((label_mask > 0).astype(np.uint8))
+
+        self.label_mask = label_mask
+        self.frame_shape = (height, width)
+        self.rebuild_count += 1
+        logger.info(f"Zone mask built: {len(zones)} zone(s) at {width}x{height}")
+
+    def zone_at(self, x, y):
+        """Zone index containing pixel (x, y), or None"""
+        height, width = self.frame_shape
+        if not (0 <= x < width and 0 <= y < height):
+            return None
+
+        label = int(self.label_mask[int(y), int(x)])
+        return label - 1 if label > 0 else None
+
+    def rect_sum(self, sat, x1, y1, x2, y2):
+        """Number of set pixels inside a rectangle, from a summed-area table"""
+        height, width = self.frame_shape
+
+        # Clip to the frame; pixels outside the frame are never in a zone
+        cx1 = int(np.clip(x1, 0, width))
+        cy1 = int(np.clip(y1, 0, height))
+        cx2 = int(np.clip(x2, 0, width))
+        cy2 = int(np.clip(y2, 0, height))
+
+        return (int(sat[cy2, cx2]) - int(sat[cy1, cx2])
+                - int(sat[cy2, cx1]) + int(sat[cy1, cx1]))
+
+    def overlap_fraction(self, zone_index, box):
+        """Fraction of the box area (x1, y1, x2, y2) covered by the zone"""
+        x1, y1, x2, y2 = box[:4]
+        area = max(x2 - x1, 0) * max(y2 - y1, 0)
+        if area <= 0:
+            return 0.0
+
+        covered = self.rect_sum(self.integrals[zone_index], x1, y1, x2, y2)
+        return min(covered / area, 1.0)
+
+    def near_any_zone(self, box, distance):
+        """True if any zone pixel lies within `distance` pixels of the box"""
+        x1, y1, x2, y2 = box[:4]
+        return self.rect_sum(self.any_zone_integral, x1 - distance, y1 - distance,
+                             x2 + distance, y2 + distance) > 0
+
+    def find_violation(self, zones, boxes, min_overlap=0.0):
+        """
+        First zone/box pair where the box center (or enough of the box) is in the zone
+
+        Args:
+            zones: Zone list the index was built from
+            boxes: Dog boxes (x1, y1, x2, y2, ...)
+            min_overlap: Box area fraction that also counts as "in zone" (0 = center only)
+        Returns:
+            Violation dictionary or None
+        """
+        for zone_id, zone in enumerate(zones):
+            # Check each detected object
+            for box_index, box in enumerate(boxes):
+                # Get box center point
+                x1, y1, x2, y2 = box[:4]
+                center_x = int((x1 + x2) / 2)
+                center_y = int((y1 + y2) / 2)
+
+                overlap = self.overlap_fraction(zone_id, box)
+                center_in_zone = self.zone_at(center_x, center_y) == zone_id
+
+                # Check if center (or enough of the box) is in zone
+                if center_in_zone or (min_overlap > 0 and overlap >= min_overlap):
+                    return {
+                        'zone': zone,
+                        'box': box,
+                        'box_index': box_index,
+                        'center': (center_x, center_y),
+                        'overlap': overlap
+                    }
+
+        return None
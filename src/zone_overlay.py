@@ -0,0 +1,138 @@
+"""
+Zone Overlay - Pre-rendered zone fill, borders and labels
+Rendered once per zone/resolution change and blended only inside the zone rectangles
+"""
+
+import cv2
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+FILL_OPACITY = 0.4
+BORDER_OPACITY = 0.6
+BORDER_THICKNESS = 5
+
+
+def merge_rects(rects):
+    """Merge overlapping (x1, y1, x2, y2) rectangles so no pixel is blended twice"""
+    merged = list(rects)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                a, b = merged[i], merged[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    merged[i] = (min(a[0], b[0]), min(a[1], b[1]),
+                                 max(a[2], b[2]), max(a[3], b[3]))
+                    del merged[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    return merged
+
+
+class ZoneOverlay:
+    """
+    Cached zone overlay layer with per-pixel alpha
+
+    Reproduces the previous draw_zones output (fills at 40% opacity, borders
+    and labels at 60%) as out = frame * (1 - alpha) + layer * alpha, using
+    8-bit fixed-point weights precomputed at build time.
+    """
+
+    def __init__(self):
+        self.premultiplied = None
+        self.inverse_alpha = None
+        self.rects = []
+        self.frame_shape = None
+        self.zones = None  # zone list the overlay was rendered from
+        self.zone_count = 0
+
+    def ensure(self, zones, frame_shape):
+        """
+        Rebuild the overlay if the resolution or the zone list changed
+
+        Same cheap identity check as ZoneMaskIndex.ensure; call invalidate()
+        after editing zones (points, colors, names) in place.
+        """
+        shape = tuple(frame_shape[:2])
+        if shape == self.frame_shape and zones is self.zones and len(zones) == self.zone_count:
+            return
+
+        self.build(zones, shape)
+        self.zones = zones
+        self.zone_count = len(zones)
+
+    def invalidate(self):
+        """Force a rebuild on the next ensure()"""
+        self.zones = None
+
+    def build(self, zones, frame_shape):
+        """Render fills, borders and labels into the cached layer"""
+        height, width = frame_shape[:2]
+        fill_layer = np.zeros((height, width, 3), dtype=np.uint8)
+        fill_mask = np.zeros((height, width), dtype=np.uint8)
+        border_layer = np.zeros((height, width, 3), dtype=np.uint8)
+        border_mask = np.zeros((height, width), dtype=np.uint8)
+
+        rects = []
+        for zone in zones:
+            points = np.array(zone['points'], dtype=np.int32)
+            color = tuple(zone['color'])
+            x, y = zone['points'][0]
+
+            # Fill
+            cv2.fillPoly(fill_layer, [points], color)
+            cv2.fillPoly(fill_mask, [points], 255)
+
+            # Border and name
+            cv2.polylines(border_layer, [points], True, color, BORDER_THICKNESS)
+            cv2.polylines(border_mask, [points], True, 255, BORDER_THICKNESS)
+            cv2.putText(border_layer, zone['name'], (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, color, 3)
+            cv2.putText(border_mask, zone['name'], (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, 255, 3)
+
+            # Region touched by this zone (polygon + border + label)
+            rx, ry, rw, rh = cv2.boundingRect(points)
+            (text_w, text_h), baseline = cv2.getTextSize(
+                zone['name'], cv2.FONT_HERSHEY_SIMPLEX, 1.0, 3
+            )
+            pad = BORDER_THICKNESS
+            x1 = max(min(rx, x) - pad, 0)
+            y1 = max(min(ry, y - 10 - text_h) - pad, 0)
+            x2 = min(max(rx + rw, x + text_w) + pad, width)
+            y2 = min(max(ry + rh, y - 10 + baseline) + pad, height)
+            if x2 > x1 and y2 > y1:
+                rects.append((x1, y1, x2, y2))
+
+        fill_weight = (fill_mask > 0).astype(np.float32) * FILL_OPACITY
+        border_weight = (border_mask > 0).astype(np.float32) * BORDER_OPACITY
+        alpha = fill_weight + border_weight
+
+        premultiplied = (fill_layer * fill_weight[..., None]
+                         + border_layer * border_weight[..., None])
+
+        # 8-bit fixed point: out = (frame * (256 - a) + premultiplied) >> 8
+        self.premultiplied = np.round(premultiplied * 256).astype(np.uint16)
+        self.inverse_alpha = (256 - np.round(alpha * 256)).astype(np.uint16)[..., None]
+        self.rects = merge_rects(rects)
+        self.frame_shape = (height, width)
+
+        logger.info(f"Zone overlay rendered: {len(zones)} zone(s), "
+                    f"{len(self.rects)} blend region(s) at {width}x{height}")
+
+    def apply(self, frame):
+        """Blend the cached overlay into the frame in place (zone rectangles only)"""
+        for x1, y1, x2, y2 in self.rects:
+            roi = frame[y1:y2, x1:x2]
+            blended = roi.astype(np.uint16)
+            blended *= self.inverse_alpha[y1:y2, x1:x2]
+            blended += self.premultiplied[y1:y2, x1:x2]
+            blended >>= 8
+            roi[:] = blended
+
+        return frame